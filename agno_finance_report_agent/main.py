@@ -0,0 +1,79 @@
+import os
+import sys
+from dotenv import load_dotenv
+from pydantic import BaseModel, Field, field_validator
+from logging_config import setup_logging
+
+# The shared MIP-003 server runtime lives at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from masumi_server import AgentServer
+from agent_definition import generate_report
+
+# Configure logging
+logger = setup_logging()
+
+# Load environment variables
+load_dotenv(override=True)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Pydantic Models
+# ─────────────────────────────────────────────────────────────────────────────
+class FinanceReportInput(BaseModel):
+    query_subject: str = Field(..., description="Company or asset to research, e.g. NVIDIA (NVDA)")
+
+    @field_validator('query_subject')
+    def validate_query_subject(cls, v):
+        if not v.strip():
+            raise ValueError('query_subject must be a non-empty string')
+        return v
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Finance Report Task Input
+# ─────────────────────────────────────────────────────────────────────────────
+def prepare_input(input_data: dict) -> dict:
+    """ Converts MIP-003 inputs into the workflow's arguments """
+    return {"query_subject": str(input_data.get("query_subject", "")).strip()}
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Input Schema (MIP-003: /input_schema)
+# ─────────────────────────────────────────────────────────────────────────────
+INPUT_SCHEMA = {
+    "input_data": [
+        {
+            "id": "query_subject",
+            "type": "string",
+            "name": "Report Subject",
+            "data": {
+                "description": "Company or asset to research, ideally with its ticker",
+                "placeholder": "NVIDIA (NVDA)"
+            }
+        }
+    ]
+}
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MIP-003 Server
+# ─────────────────────────────────────────────────────────────────────────────
+server = AgentServer(
+    name="finance_report",
+    workflow=generate_report,
+    input_schema=INPUT_SCHEMA,
+    input_model=FinanceReportInput,
+    prepare_input=prepare_input,
+    example_input={"query_subject": "NVIDIA (NVDA)"}
+)
+app = server.app
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Main Logic if Called as a Script
+# ─────────────────────────────────────────────────────────────────────────────
+def main():
+    print("Running the finance report agent as standalone script is not supported when using payments.")
+    print("Run `python agent_definition.py` for a local report, or start the API using `python main.py api`.")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "api":
+        print("Starting FastAPI server with Masumi integration...")
+        server.run()
+    else:
+        main()
@@ -0,0 +1,20 @@
+import pytest
+
+import agent_definition
+
+SYNTHESIS_AGENTS = [
+    agent_definition.synthesis_agent_part1_market_context,
+    agent_definition.synthesis_agent_part2_company_forensics,
+    agent_definition.synthesis_agent_part3_strategic_assessment,
+    agent_definition.synthesis_agent_part4_valuation_outlook,
+    agent_definition.synthesis_agent_part5_thesis_recommendations,
+    agent_definition.synthesis_agent_part6_appendices,
+]
+
+
+@pytest.mark.parametrize("factory", SYNTHESIS_AGENTS, ids=lambda factory: factory.__name__)
+def test_every_report_gets_its_own_agents(factory, monkeypatch):
+    # Agents keep their run id and run response on the instance, so concurrent reports must not share one
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+    assert factory() is not factory()
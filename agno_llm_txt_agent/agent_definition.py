@@ -1,18 +1,25 @@
 from textwrap import dedent
-from typing import Dict, Any, Iterator, Optional
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional
 import os
 import json
-import time
-import requests
-import boto3
+import queue
+import asyncio
+import hashlib
+import httpx
 from logging_config import get_logger
+from firecrawl_client import shared_runtime, runtime_metrics
+from llms_txt_cache import cache_key, shared_cache
+from url_canonical import canonicalize_url, dedupe_urls
+from combined_llms_txt import CombinedLLMsTxt, create_combined_llms_txt
+from sitemap import shared_sitemap_reader
+from page_manifest import shared_manifests
+from spaces_client import spaces_client, upload_versioned
 from agno.agent import Agent, RunResponse
-from agno.models.openai import OpenAIChat
 from agno.workflow import Workflow
 from agno.utils.log import logger
 from dotenv import load_dotenv
 import logging
-from urllib.parse import urlparse, quote
+from urllib.parse import urlparse
 import re
 
 
@@ -22,6 +29,9 @@ logger = get_logger(__name__)
 logging.basicConfig(level=logging.INFO, 
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
+# RunResponse event used for step-level progress; the final report keeps the default event
+PROGRESS_EVENT = "WorkflowProgress"
+
 class LLMsTxtGeneratorWorkflow(Workflow):
     """Workflow for generating LLMs.txt files from websites and providing download links"""
     
@@ -34,51 +44,62 @@ class LLMsTxtGeneratorWorkflow(Workflow):
         # Support either a single URL string or a list of URLs
         urls = kwargs.get("urls", kwargs.get("url", ""))
         self.urls = [urls] if isinstance(urls, str) and urls else urls if isinstance(urls, list) else []
+        # Requested URL -> URL crawled for it, filled in when the run starts
+        self.url_aliases: Dict[str, str] = {}
         self.max_urls = kwargs.get("max_urls", 15)
         self.show_full_text = kwargs.get("show_full_text", True)
+        # Refresh page by page from the sitemap instead of regenerating whole sites
+        self.incremental = kwargs.get("incremental", False)
         self.api_key = os.environ.get("FIRECRAWL_API_KEY", "")
+        # Event loop and Firecrawl client shared by all generations of this process
+        self.loop, self.firecrawl = shared_runtime()
+        self.cache = shared_cache()
+        self.sitemaps = shared_sitemap_reader()
+        self.manifests = shared_manifests()
         
         # Digital Ocean Spaces credentials
         self.do_key = os.environ.get("DO_SPACES_KEY", "")
         self.do_secret = os.environ.get("DO_SPACES_SECRET", "")
         self.do_region = os.environ.get("DO_SPACES_REGION", "nyc3")
         self.do_bucket = os.environ.get("DO_SPACES_BUCKET", "")
+        # Stored pre-compressed; gzip is decoded by every HTTP client, br needs the brotli package
+        self.content_encoding = os.environ.get("LLMS_TXT_CONTENT_ENCODING", "gzip").lower()
+        self.gzip_link = os.environ.get("LLMS_TXT_GZIP_LINK", "false").lower() == "true"
     
     def _generate_file_name(self, urls: list) -> str:
         """Generate a clean file name based on the website URLs"""
         if not urls:
             return "llm-combined.txt"
         
+        # Name the file after the canonical URL, which carries no www. prefix, port or other noise
+        clean_domain = re.sub(r'[^a-zA-Z0-9]', '-', urlparse(canonicalize_url(urls[0])).hostname or "")
         if len(urls) == 1:
-            # Single URL case
-            parsed_url = urlparse(urls[0])
-            domain = parsed_url.netloc
-            
-            # Remove www. prefix if present
-            if domain.startswith('www.'):
-                domain = domain[4:]
-            
-            # Replace dots and other non-alphanumeric characters with hyphens
-            clean_domain = re.sub(r'[^a-zA-Z0-9]', '-', domain)
             file_name = f"llm-{clean_domain}.txt"
         else:
             # Multiple URLs case - use first domain plus count
-            parsed_url = urlparse(urls[0])
-            main_domain = parsed_url.netloc
-            if main_domain.startswith('www.'):
-                main_domain = main_domain[4:]
-            
-            clean_domain = re.sub(r'[^a-zA-Z0-9]', '-', main_domain)
             file_name = f"llm-{clean_domain}-plus-{len(urls)-1}.txt"
         
         return file_name
 
+    def _describe_url(self, url: str) -> str:
+        """Report line of a URL, naming the requested spellings that were merged into it"""
+        if url not in self.url_aliases.values():
+            return f"{url} (invalid URL)"
+        requested = [original for original, crawled in self.url_aliases.items()
+                     if crawled == url and original != url]
+        return f"{url} (requested as {', '.join(requested)})" if requested else url
+
+    def _progress(self, step: str, **data) -> RunResponse:
+        """Build a progress event for an intermediate workflow step"""
+        return RunResponse(run_id=self.run_id, event=PROGRESS_EVENT, content={"step": step, **data})
+
     def run(self) -> Iterator[RunResponse]:
         """
         Execute the LLMs.txt generation and upload workflow, returning Markdown output.
         
         Returns:
-            Iterator of RunResponse objects with results of each step in Markdown format.
+            Iterator of RunResponse objects: progress events (event=PROGRESS_EVENT) for each
+            step, followed by the final report in Markdown format.
         """
         # Validate input data - Return Markdown errors
         if not self.urls:
@@ -95,62 +116,41 @@ class LLMsTxtGeneratorWorkflow(Workflow):
             error_md = "# LLMs.txt Generation Failed\n\n**Error:** Digital Ocean Spaces credentials are not configured."
             yield RunResponse(run_id=self.run_id, content=error_md)
             return
+
+        # Spellings of the same site (scheme, www., trailing slash, fragments, tracking
+        # parameters) crawl once, using the first one requested: the canonical form only
+        # keys the dedupe, cache and coalescing, as some sites do not answer on it
+        self.urls, self.url_aliases, invalid_urls = dedupe_urls(self.urls)
+        for url in invalid_urls:
+            logger.error(f"Skipping invalid URL: {url}")
             
-        # Process each URL and combine the results
-        combined_content = []
-        processed_urls = []
-        failed_urls = []
-        
-        for url in self.urls:
-            try:
-                # Generate LLMs.txt file
-                logger.info(f"Generating LLMs.txt for URL: {url}")
-                llms_txt_response = self._generate_llms_txt(url)
-                
-                if not llms_txt_response or not isinstance(llms_txt_response, dict) or not llms_txt_response.get("success"):
-                    logger.error(f"Failed to start LLMs.txt generation for {url}: {llms_txt_response}")
-                    failed_urls.append(url)
-                    continue
-                
-                generation_id = llms_txt_response.get("id")
-                logger.info(f"LLMs.txt generation started with ID: {generation_id}")
-                
-                llms_txt_content = self._check_generation_status(generation_id)
-                
-                if not llms_txt_content:
-                    logger.error(f"Failed to retrieve generated LLMs.txt content for {url}")
-                    failed_urls.append(url)
-                    continue
-                
-                combined_content.append(f"\n\n{'='*50}\n# URL: {url}\n{'='*50}\n\n{llms_txt_content}")
-                processed_urls.append(url)
-                
-            except Exception as e:
-                logger.error(f"Error processing URL {url}: {str(e)}")
-                failed_urls.append(url)
-        
-        # --- Format Output as Markdown ---
-        
-        if not processed_urls:
-            failed_urls_md = "\n".join([f"- {url}" for url in failed_urls])
-            error_md = f"# LLMs.txt Generation Failed\n\n**Error:** Failed to process any URLs.\n\n**Failed URLs:**\n{failed_urls_md}"
-            yield RunResponse(run_id=self.run_id, content=error_md)
-            return
-        
-        # Combine all content
-        combined_text = "# Combined LLMs.txt\n" + "\n".join(combined_content)
-        
-        # Upload to Digital Ocean Spaces
-        logger.info("Uploading combined LLMs.txt to Digital Ocean Spaces...")
-        file_name = self._generate_file_name(processed_urls)
-        # Ensure filename is URL-safe for the download link
-        safe_file_name = quote(file_name) 
-        download_url = self._upload_to_do_spaces(combined_text, file_name) # Use original filename for upload
-        
-        if not download_url:
+        # Each site's text is spooled as soon as its pipeline finishes, so the job never
+        # holds all sites in memory at once
+        with create_combined_llms_txt() as combined:
+            processed_urls, failed_urls = yield from self._collect_sections(combined, invalid_urls)
+
+            # --- Format Output as Markdown ---
+
+            if not processed_urls:
+                failed_urls_md = "\n".join([f"- {self._describe_url(url)}" for url in failed_urls])
+                error_md = f"# LLMs.txt Generation Failed\n\n**Error:** Failed to process any URLs.\n\n**Failed URLs:**\n{failed_urls_md}"
+                yield RunResponse(run_id=self.run_id, content=error_md)
+                return
+
+            # Upload to Digital Ocean Spaces, streaming the sections from the spool file
+            logger.info("Uploading combined LLMs.txt to Digital Ocean Spaces...")
+            file_name = self._generate_file_name(processed_urls)
+            yield self._progress("upload_started", file_name=file_name)
+            upload = self._upload_to_do_spaces(combined.chunks(), file_name)
+
+        if not upload:
             error_md = "# LLMs.txt Generation Failed\n\n**Error:** Failed to upload combined LLMs.txt to Digital Ocean Spaces."
             yield RunResponse(run_id=self.run_id, content=error_md)
             return
+        yield self._progress("upload_done", file_name=file_name, download_url=upload["url"],
+                             latest_url=upload["alias_url"], uploaded=upload["uploaded"],
+                             encoding=upload["encoding"], stored_bytes=upload["stored_bytes"],
+                             gz_url=upload.get("gz_url"))
 
         # Construct the success Markdown output
         markdown_output = ["# LLMs.txt Generation Report", ""] 
@@ -159,116 +159,233 @@ class LLMsTxtGeneratorWorkflow(Workflow):
         
         markdown_output.append("**Processed URLs:**")
         for url in processed_urls:
-            markdown_output.append(f"- {url}")
+            markdown_output.append(f"- {self._describe_url(url)}")
         markdown_output.append("")
 
         if failed_urls:
             markdown_output.append("**Failed URLs:**")
             for url in failed_urls:
-                markdown_output.append(f"- {url}")
+                markdown_output.append(f"- {self._describe_url(url)}")
             markdown_output.append("")
             
-        # Use the original filename for display, safe filename for the URL itself
-        markdown_output.append(f"**Download Link:** [{file_name}]({download_url.replace(file_name, safe_file_name)})") 
+        # The download link never changes content; the latest link follows the domain's newest version
+        markdown_output.append(f"**Download Link:** [{file_name}]({upload['url']})")
+        markdown_output.append(f"**Latest Version:** [{file_name}]({upload['alias_url']})")
+        if upload.get("gz_url"):
+            markdown_output.append(f"**Compressed Download:** [{file_name}.gz]({upload['gz_url']})")
         
         final_markdown = "\n".join(markdown_output)
         
         yield RunResponse(run_id=self.run_id, content=final_markdown)
     
-    def _generate_llms_txt(self, url: str) -> Dict[str, Any]:
-        """Call Firecrawl API to start LLMs.txt generation"""
-        api_url = "https://api.firecrawl.dev/v1/llmstxt"
-        
-        payload = {
-            "url": url,
-            "maxUrls": self.max_urls,
-            "showFullText": self.show_full_text
-        }
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
+    def _collect_sections(self, combined: CombinedLLMsTxt, invalid_urls: List[str]):
+        """
+        Run the per-URL pipelines and add each result to combined as soon as it is ready.
+
+        Yields progress events and returns (processed_urls, failed_urls).
+        """
+        # Run the per-URL pipelines on the shared Firecrawl loop, relaying their progress
+        # as it happens
+        events = queue.Queue()
+        futures = []
+        for index, url in enumerate(self.urls):
+            future = self.loop.submit(self._process_url(url, events.put))
+            future.add_done_callback(lambda _, index=index: events.put(index))
+            futures.append(future)
+
+        try:
+            finished = 0
+            while finished < len(futures):
+                event = events.get()
+                if isinstance(event, int):
+                    finished += 1
+                    content = futures[event].result()
+                    if content:
+                        combined.add(event, self.urls[event], content)
+                    # Drop the finished future so its result can be freed
+                    futures[event] = None
+                else:
+                    yield event
+        finally:
+            # Cancels the generations that are still running if the run is abandoned
+            for future in futures:
+                if future is not None:
+                    future.cancel()
+
+        # Report the results in input order
+        processed_urls = [url for index, url in enumerate(self.urls) if index in combined]
+        failed_urls = list(invalid_urls) + [url for url in self.urls if url not in processed_urls]
+        return processed_urls, failed_urls
+
+    async def _process_url(self, url: str, emit: Callable[[RunResponse], None]) -> Optional[str]:
+        """Generate the LLMs.txt content of one URL, passing progress events to emit"""
+        key = cache_key(url, self.max_urls, self.show_full_text, self.incremental)
+        # Serve recent generations of the same site and parameters from the cache. Incremental
+        # runs skip it: they exist to pick up changes, and the page manifest already saves them
+        # from scraping the pages that did not change
+        cached = None if self.incremental else await asyncio.to_thread(self.cache.get, key)
+        if cached:
+            logger.info(f"Using cached LLMs.txt for URL: {url}")
+            emit(self._progress("url_started", url=url))
+            emit(self._progress("url_finished", url=url, success=True, cached=True))
+            return cached
+
+        emit(self._progress("url_started", url=url))
+        try:
+            # Join an identical generation another job already runs, or start one
+            llms_txt_content, shared = await self.firecrawl.flights.run(
+                key,
+                lambda notify: self._generate(url, key, notify),
+                on_event=lambda step, **data: emit(self._progress(step, url=url, **data))
+            )
+            if shared:
+                logger.info(f"Shared an in-flight LLMs.txt generation for URL: {url}")
+
+            if not llms_txt_content:
+                logger.error(f"Failed to retrieve generated LLMs.txt content for {url}")
+                emit(self._progress("url_finished", url=url, success=False))
+                return None
+
+            emit(self._progress("url_finished", url=url, success=True, shared=shared))
+            return llms_txt_content
+
+        except Exception as e:
+            logger.error(f"Error processing URL {url}: {str(e)}")
+            emit(self._progress("url_finished", url=url, success=False))
+            return None
+
+    async def _generate(self, url: str, key: str, notify: Callable[..., None]) -> Optional[str]:
+        """Run one Firecrawl generation for url and cache its content unless it is incremental"""
+        if self.incremental:
+            llms_txt_content = await self._generate_incrementally(url, key, notify)
+            if llms_txt_content:
+                return llms_txt_content
+            logger.info(f"Incremental refresh of {url} not possible, generating the full LLMs.txt")
+
+        # Hold a Firecrawl slot from the start of the generation until its result is in
+        async with self.firecrawl.slots:
+            # Generate LLMs.txt file
+            logger.info(f"Generating LLMs.txt for URL: {url}")
+            llms_txt_response = await self._generate_llms_txt(url)
+
+            if not llms_txt_response or not isinstance(llms_txt_response, dict) or not llms_txt_response.get("success"):
+                logger.error(f"Failed to start LLMs.txt generation for {url}: {llms_txt_response}")
+                return None
+
+            generation_id = llms_txt_response.get("id")
+            logger.info(f"LLMs.txt generation started with ID: {generation_id}")
+            notify("generation_started", generation_id=generation_id)
+
+            llms_txt_content = await self._check_generation_status(generation_id)
+
+        if llms_txt_content and not self.incremental:
+            await asyncio.to_thread(self.cache.put, key, llms_txt_content)
+        return llms_txt_content
+
+    async def _generate_incrementally(self, url: str, key: str, notify: Callable[..., None]) -> Optional[str]:
+        """
+        Build the LLMs.txt of url page by page from its sitemap.
+
+        Pages whose sitemap lastmod is unchanged since the previous run are spliced in from
+        its manifest; only new and changed pages are scraped. Returns None if the site has
+        no usable sitemap or no page could be rendered.
+        """
+        pages = await self.sitemaps.pages(url, self.max_urls)
+        if not pages:
+            return None
+
+        previous = await asyncio.to_thread(self.manifests.load, key)
+        # Pages without a lastmod cannot be vouched for and are always scraped
+        stale = {page_url: lastmod for page_url, lastmod in pages
+                 if not lastmod or previous.get(page_url, {}).get("lastmod") != lastmod}
+        logger.info(f"Incremental refresh of {url}: {len(stale)} of {len(pages)} pages new or changed")
+        notify("incremental_refresh", pages=len(pages), changed=len(stale))
+
+        scraped = await asyncio.gather(*(self._scrape_page(page_url, lastmod) for page_url, lastmod in stale.items()))
+        scraped = {page["url"]: page for page in scraped if page}
+
+        entries = []
+        unchanged = 0
+        for page_url, _ in pages:
+            entry = scraped.get(page_url)
+            if entry and page_url in previous and previous[page_url].get("sha256") == entry["sha256"]:
+                unchanged += 1
+            # A page that could not be scraped keeps its previous section, if any
+            entry = entry or previous.get(page_url)
+            if entry:
+                entries.append(entry)
+        if not entries:
+            return None
+
+        await asyncio.to_thread(self.manifests.save, key, entries)
+        self.manifests.record(reused=len(pages) - len(stale), scraped=len(scraped), unchanged=unchanged)
+
+        if self.show_full_text:
+            return "\n\n".join([f"# {url} llms-full.txt"] + [entry["section"] for entry in entries])
+        return f"# {url} llms.txt\n\n" + "\n".join(entry["section"] for entry in entries)
+
+    async def _scrape_page(self, page_url: str, lastmod: str) -> Optional[Dict[str, Any]]:
+        """Scrape one page and render its LLMs.txt section as a manifest entry"""
+        async with self.firecrawl.slots:
+            try:
+                response = await self.firecrawl.scrape(page_url)
+            except (httpx.HTTPError, ValueError) as e:
+                logger.error(f"Error scraping {page_url}: {str(e)}")
+                return None
+        if not response.get("success"):
+            logger.error(f"Failed to scrape {page_url}: {response.get('error')}")
+            return None
+
+        data = response.get("data") or {}
+        markdown = (data.get("markdown") or "").strip()
+        metadata = data.get("metadata") or {}
+        title = metadata.get("title") or page_url
+        if self.show_full_text:
+            section = f"## {title}\n\nSource: {page_url}\n\n{markdown}"
+        else:
+            description = metadata.get("description")
+            section = f"- [{title}]({page_url})" + (f": {description}" if description else "")
+        return {
+            "url": page_url,
+            "lastmod": lastmod,
+            "sha256": hashlib.sha256(markdown.encode("utf-8")).hexdigest(),
+            "section": section,
         }
-        
+
+    async def _generate_llms_txt(self, url: str) -> Dict[str, Any]:
+        """Call Firecrawl API to start LLMs.txt generation"""
         try:
-            response = requests.post(api_url, json=payload, headers=headers)
-            return response.json()
+            return await self.firecrawl.start(url, self.max_urls, self.show_full_text)
         except Exception as e:
             logger.error(f"Error calling Firecrawl API: {str(e)}")
             return {"success": False, "error": str(e)}
     
-    def _check_generation_status(self, generation_id: str, max_attempts: int = 30) -> Optional[str]:
-        """Check LLMs.txt generation status until complete"""
-        api_url = f"https://api.firecrawl.dev/v1/llmstxt/{generation_id}"
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        # Poll for status with exponential backoff
-        attempts = 0
-        while attempts < max_attempts:
-            try:
-                response = requests.get(api_url, headers=headers)
-                data = response.json()
-                
-                if data.get("status") == "completed":
-                    # Extract content from the correct nested location
-                    # Use llmsfulltxt instead of llmstxt when available
-                    if self.show_full_text and data.get("data", {}).get("llmsfulltxt"):
-                        return data.get("data", {}).get("llmsfulltxt")
-                    return data.get("data", {}).get("llmstxt")
-                elif data.get("status") == "failed":
-                    logger.error(f"LLMs.txt generation failed: {data.get('error')}")
-                    return None
-                
-                # Wait with exponential backoff (starting at 2 seconds)
-                wait_time = min(2 * (2 ** attempts), 60)  # Cap at 60 seconds
-                logger.info(f"Generation in progress, waiting {wait_time} seconds...")
-                time.sleep(wait_time)
-                attempts += 1
-                
-            except Exception as e:
-                logger.error(f"Error checking generation status: {str(e)}")
-                time.sleep(5)
-                attempts += 1
-        
-        logger.error("Max attempts reached while waiting for LLMs.txt generation")
-        return None
+    async def _check_generation_status(self, generation_id: str) -> Optional[str]:
+        """Wait for the LLMs.txt generation to complete and return its content"""
+        return await self.firecrawl.wait(generation_id, self.show_full_text)
     
-    def _upload_to_do_spaces(self, content: str, file_name: str) -> Optional[str]:
-        """Upload content to Digital Ocean Spaces and return download URL"""
+    def _upload_to_do_spaces(self, content: Iterable[bytes], file_name: str) -> Optional[Dict[str, Any]]:
+        """Upload content to Digital Ocean Spaces under its content hash and return the download URLs"""
         try:
-            # Create S3 client
-            s3_client = boto3.client(
-                's3',
-                region_name=self.do_region,
-                endpoint_url=f'https://{self.do_region}.digitaloceanspaces.com',
-                aws_access_key_id=self.do_key,
-                aws_secret_access_key=self.do_secret
-            )
-            
-            # Upload file
-            s3_client.put_object(
-                Bucket=self.do_bucket,
-                Key=file_name,
-                Body=content.encode('utf-8'),
-                ACL='public-read',
-                ContentType='text/plain'
-            )
-            
-            # Generate download URL
-            download_url = f'https://{self.do_bucket}.{self.do_region}.digitaloceanspaces.com/{file_name}'
-            return download_url
+            # Shared, pooled S3 client of this process
+            s3_client = spaces_client(self.do_region, self.do_key, self.do_secret)
+            return upload_versioned(s3_client, self.do_bucket, self.do_region, content, file_name,
+                                    encoding=self.content_encoding, gzip_link=self.gzip_link)
             
         except Exception as e:
             logger.error(f"Error uploading to Digital Ocean Spaces: {str(e)}")
             return None
 
 
+def workflow_metrics() -> Dict[str, Any]:
+    """Firecrawl, llms.txt cache and incremental refresh metrics of this process, reported under /metrics"""
+    return {"firecrawl": runtime_metrics(), "llms_txt_cache": shared_cache().stats(),
+            "incremental": shared_manifests().stats()}
+
+
 # Function to run the workflow with specified parameters
-def run_workflow(urls, max_urls: int = 15, show_full_text: bool = True) -> Iterator[RunResponse]:
+def run_workflow(urls, max_urls: int = 15, show_full_text: bool = True,
+                 incremental: bool = False) -> Iterator[RunResponse]:
     """
     Run the LLMsTxtGeneratorWorkflow with the given parameters.
     
@@ -276,6 +393,7 @@ def run_workflow(urls, max_urls: int = 15, show_full_text: bool = True) -> Itera
         urls: Website URL or list of URLs to generate LLMs.txt from
         max_urls: Maximum number of URLs to analyze per site (default: 15)
         show_full_text: Whether to include full text content (default: True)
+        incremental: Whether to refresh only pages the sitemap reports as changed (default: False)
         
     Returns:
         Iterator of RunResponse objects
@@ -284,11 +402,33 @@ def run_workflow(urls, max_urls: int = 15, show_full_text: bool = True) -> Itera
         debug_mode=True,
         urls=urls,
         max_urls=max_urls,
-        show_full_text=show_full_text
+        show_full_text=show_full_text,
+        incremental=incremental
     )
     return workflow.run()
 
 
+def run_workflow_to_completion(urls, max_urls: int = 15, show_full_text: bool = True,
+                               incremental: bool = False, progress=None) -> Optional[RunResponse]:
+    """
+    Run the workflow synchronously and return only its final response.
+
+    Progress events are forwarded to progress.put() as they are produced
+    instead of being collected. This is the entry point used by the job
+    executor, so it must stay a module-level function that can be pickled
+    for process pools.
+    """
+    final_response = None
+    for response in run_workflow(urls=urls, max_urls=max_urls, show_full_text=show_full_text,
+                                 incremental=incremental):
+        if response.event == PROGRESS_EVENT:
+            if progress is not None:
+                progress.put(response.content)
+        else:
+            final_response = response
+    return final_response
+
+
 # Execute the LLMs.txt generation workflow with the provided input data
 async def execute_agno_task(input_data: Dict[str, Any]) -> Dict[str, Any]:
     """Execute the LLMs.txt generation workflow with the provided input data"""
@@ -298,16 +438,15 @@ async def execute_agno_task(input_data: Dict[str, Any]) -> Dict[str, Any]:
     urls = input_data.get("urls", input_data.get("url", ""))
     max_urls = input_data.get("max_urls", 15)
     show_full_text = input_data.get("show_full_text", True)
+    incremental = input_data.get("incremental", False)
     
-    # Run the workflow with the parameters
-    responses = list(run_workflow(
+    # Run the workflow with the parameters and keep only the final response
+    final_response = run_workflow_to_completion(
         urls=urls,
         max_urls=max_urls,
-        show_full_text=show_full_text
-    ))
-    
-    # Get the final response
-    final_response = responses[-1] if responses else None
+        show_full_text=show_full_text,
+        incremental=incremental
+    )
     
     if final_response and final_response.content:
         try:
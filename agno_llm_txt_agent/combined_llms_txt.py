@@ -0,0 +1,66 @@
+"""
+Spool-to-disk assembly of the combined llms.txt of a job.
+
+Sections arrive in completion order and can be megabytes each. They are
+written to a spooled temporary file as they arrive and read back in input
+order as a stream of chunks, so a job never holds the combined text in memory.
+"""
+import os
+import tempfile
+from typing import Dict, Iterator, Tuple
+
+HEADER = "# Combined LLMs.txt\n"
+SEPARATOR = "=" * 50
+
+
+class CombinedLLMsTxt:
+    """ Sections of a combined llms.txt, indexed by the position of their URL in the request """
+
+    def __init__(self, max_memory: int = 4 * 1024 * 1024, chunk_size: int = 1024 * 1024):
+        self.file = tempfile.SpooledTemporaryFile(max_size=max_memory)
+        self.chunk_size = chunk_size
+        # Index -> (offset, length) of the encoded section in the spool file
+        self._sections: Dict[int, Tuple[int, int]] = {}
+        self._end = 0
+
+    def __enter__(self) -> "CombinedLLMsTxt":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._sections)
+
+    def __contains__(self, index: int) -> bool:
+        return index in self._sections
+
+    def add(self, index: int, url: str, content: str) -> None:
+        """ Appends the section of the URL at index """
+        data = f"\n\n{SEPARATOR}\n# URL: {url}\n{SEPARATOR}\n\n{content}".encode("utf-8")
+        self.file.seek(self._end)
+        self.file.write(data)
+        self._sections[index] = (self._end, len(data))
+        self._end += len(data)
+
+    def chunks(self) -> Iterator[bytes]:
+        """ Yields the combined file: the header, then the sections in index order """
+        yield HEADER.encode("utf-8")
+        for position, index in enumerate(sorted(self._sections)):
+            if position:
+                yield b"\n"
+            offset, remaining = self._sections[index]
+            while remaining:
+                self.file.seek(offset)
+                chunk = self.file.read(min(self.chunk_size, remaining))
+                offset += len(chunk)
+                remaining -= len(chunk)
+                yield chunk
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def create_combined_llms_txt() -> CombinedLLMsTxt:
+    """ Returns an empty assembly with the in-memory budget from LLMS_TXT_SPOOL_MEMORY_MB """
+    return CombinedLLMsTxt(max_memory=int(float(os.getenv("LLMS_TXT_SPOOL_MEMORY_MB", "4")) * 1024 * 1024))
@@ -0,0 +1,268 @@
+"""
+Async client for Firecrawl's llms.txt API.
+
+All generations of a process run on one shared event loop in a background
+thread, so waiting for Firecrawl costs a timer instead of a sleeping thread.
+Status polls use jittered backoff shaped by the completion times observed so
+far and stop at an overall deadline. Identical generations requested by
+concurrent jobs are coalesced into one.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Coroutine, Dict, Hashable, List, Optional, Tuple
+
+import httpx
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+API_URL = "https://api.firecrawl.dev/v1/llmstxt"
+SCRAPE_URL = "https://api.firecrawl.dev/v1/scrape"
+
+# Assumed median generation time until real completions have been observed
+DEFAULT_EXPECTED_SECONDS = 20.0
+
+
+class SharedLoop:
+    """ An event loop running in a daemon thread that any thread can submit coroutines to """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="firecrawl-loop", daemon=True)
+        self.thread.start()
+
+    def submit(self, coro: Coroutine) -> Future:
+        """ Schedules coro on the loop; cancelling the returned future cancels the task """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+
+class CompletionTimes:
+    """ Durations of recently completed generations, used to time the status polls """
+
+    def __init__(self, size: int = 200):
+        self.samples = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def quantile(self, q: float, default: float) -> float:
+        if not self.samples:
+            return default
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _Flight:
+    """ One in-flight call and the callers waiting for it """
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.listeners: List[Callable[..., None]] = []
+        self.events: List[Tuple[str, Dict[str, Any]]] = []
+
+    def notify(self, step: str, **data) -> None:
+        """ Passes an intermediate event to every caller, including ones that join later """
+        self.events.append((step, data))
+        for listener in list(self.listeners):
+            listener(step, **data)
+
+
+class SingleFlight:
+    """
+    Lets concurrent callers with the same key share one in-flight call.
+
+    The call keeps running while any caller still waits for it and is cancelled
+    once all of them have been cancelled. Must be used from a single event loop.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.started = 0
+        self.joined = 0
+
+    async def run(self, key: Hashable, factory: Callable[[Callable[..., None]], Awaitable[Any]],
+                  on_event: Optional[Callable[..., None]] = None) -> Tuple[Any, bool]:
+        """
+        Awaits the call for key, starting factory(notify) if none is in flight.
+
+        Returns (result, shared) where shared tells whether another caller started the call.
+        """
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+            flight.task = asyncio.ensure_future(factory(flight.notify))
+            flight.task.add_done_callback(lambda _: self._flights.pop(key, None) if self._flights.get(key) is flight else None)
+            self.started += 1
+        else:
+            self.joined += 1
+
+        if on_event is not None:
+            for step, data in flight.events:
+                on_event(step, **data)
+            flight.listeners.append(on_event)
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+            if on_event is not None:
+                flight.listeners.remove(on_event)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"in_flight": len(self._flights), "started": self.started, "coalesced": self.joined}
+
+
+class FirecrawlClient:
+    """
+    Starts llms.txt generations and waits for their results.
+
+    Only use it from coroutines running on the shared loop: the HTTP client and the
+    concurrency slots are bound to that loop.
+    """
+
+    def __init__(self, api_key: str, concurrency: int = 4, min_interval: float = 1.0,
+                 max_interval: float = 15.0, deadline: float = 900.0, connect_timeout: float = 5.0,
+                 read_timeout: float = 30.0, max_connections: int = 20):
+        self.api_key = api_key
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_connections = max_connections
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.deadline = deadline
+        # Generations in flight at once across all jobs of this process
+        self.slots = asyncio.Semaphore(concurrency)
+        # Identical generations of concurrent jobs share one Firecrawl generation and poll loop
+        self.flights = SingleFlight()
+        self.completion_times = CompletionTimes()
+        self._http: Optional[httpx.AsyncClient] = None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """ Keep-alive connection pool shared by all generations of this process """
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections,
+                                    keepalive_expiry=60.0),
+                headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+            )
+        return self._http
+
+    async def start(self, url: str, max_urls: int, show_full_text: bool) -> Dict[str, Any]:
+        """ Starts a generation; the response holds `success` and the generation `id` """
+        payload = {"url": url, "maxUrls": max_urls, "showFullText": show_full_text}
+        response = await self.http.post(API_URL, json=payload)
+        return response.json()
+
+    async def status(self, generation_id: str) -> Dict[str, Any]:
+        response = await self.http.get(f"{API_URL}/{generation_id}")
+        return response.json()
+
+    async def scrape(self, url: str) -> Dict[str, Any]:
+        """ Scrapes one page; the response holds `success` and `data` with `markdown` and `metadata` """
+        payload = {"url": url, "formats": ["markdown"], "onlyMainContent": True}
+        response = await self.http.post(SCRAPE_URL, json=payload)
+        return response.json()
+
+    def next_delay(self, previous: float, elapsed: float) -> float:
+        """ Decorrelated jitter, kept short while generations typically complete """
+        tail = self.completion_times.quantile(0.9, DEFAULT_EXPECTED_SECONDS * 3)
+        cap = self.min_interval * 3 if elapsed < tail else self.max_interval
+        return min(cap, random.uniform(self.min_interval, previous * 3))
+
+    async def wait(self, generation_id: str, show_full_text: bool,
+                   deadline: Optional[float] = None) -> Optional[str]:
+        """
+        Polls a generation until it completes, fails or the deadline (seconds) passes.
+
+        Returns the generated text, or None if the generation failed or timed out.
+        Cancelling the calling task stops the polling.
+        """
+        started = time.monotonic()
+        give_up_at = started + (deadline or self.deadline)
+        # Nothing to fetch before about half of the typical completion time
+        expected = self.completion_times.quantile(0.5, DEFAULT_EXPECTED_SECONDS)
+        delay = max(self.min_interval, expected / 2 * random.uniform(0.8, 1.2))
+        polls = 0
+
+        while True:
+            remaining = give_up_at - time.monotonic()
+            if remaining <= 0:
+                logger.error(f"Gave up waiting for LLMs.txt generation {generation_id} after {polls} polls")
+                return None
+            await asyncio.sleep(min(delay, remaining))
+            polls += 1
+
+            try:
+                data = await self.status(generation_id)
+            except (httpx.HTTPError, ValueError) as e:
+                logger.error(f"Error checking generation status: {str(e)}")
+                data = {}
+
+            if data.get("status") == "completed":
+                self.completion_times.record(time.monotonic() - started)
+                # Use llmsfulltxt instead of llmstxt when available
+                content = data.get("data", {})
+                if show_full_text and content.get("llmsfulltxt"):
+                    return content.get("llmsfulltxt")
+                return content.get("llmstxt")
+            if data.get("status") == "failed":
+                logger.error(f"LLMs.txt generation failed: {data.get('error')}")
+                return None
+
+            delay = self.next_delay(delay, time.monotonic() - started)
+            logger.info(f"Generation {generation_id} in progress, next check in {delay:.1f} seconds...")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "completed": len(self.completion_times.samples),
+            "p50_seconds": self.completion_times.quantile(0.5, 0.0),
+            "p90_seconds": self.completion_times.quantile(0.9, 0.0),
+            "generations": self.flights.metrics(),
+        }
+
+
+_shared_loop: Optional[SharedLoop] = None
+_shared_client: Optional[FirecrawlClient] = None
+_owner_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def shared_runtime() -> tuple:
+    """ Returns the process-wide (SharedLoop, FirecrawlClient), created on first use """
+    global _shared_loop, _shared_client, _owner_pid
+    with _lock:
+        # A forked job process does not inherit the loop thread, so it builds its own
+        if _shared_loop is None or _owner_pid != os.getpid():
+            _shared_loop = SharedLoop()
+            _shared_client = FirecrawlClient(
+                api_key=os.environ.get("FIRECRAWL_API_KEY", ""),
+                concurrency=max(1, int(os.getenv("FIRECRAWL_CONCURRENCY", "4"))),
+                min_interval=float(os.getenv("FIRECRAWL_POLL_MIN_INTERVAL", "1")),
+                max_interval=float(os.getenv("FIRECRAWL_POLL_MAX_INTERVAL", "15")),
+                deadline=float(os.getenv("FIRECRAWL_DEADLINE", "900")),
+                connect_timeout=float(os.getenv("FIRECRAWL_CONNECT_TIMEOUT", "5")),
+                read_timeout=float(os.getenv("FIRECRAWL_READ_TIMEOUT", "30")),
+                max_connections=int(os.getenv("FIRECRAWL_MAX_CONNECTIONS", "20")),
+            )
+            _owner_pid = os.getpid()
+        return _shared_loop, _shared_client
+
+
+def runtime_metrics() -> Dict[str, Any]:
+    """ Metrics of the shared client, empty until the first generation of this process """
+    return _shared_client.metrics() if _shared_client is not None else {}
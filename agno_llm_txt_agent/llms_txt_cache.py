@@ -0,0 +1,227 @@
+"""
+Two-tier cache of generated llms.txt content.
+
+Entries are keyed on the canonical URL and the generation parameters. A small
+in-memory LRU, bounded by entry count and total size, answers repeated requests
+without touching the disk; the on-disk
+tier survives restarts, is shared by the workers of a host and is trimmed to a
+size budget by evicting the least recently used files. Its usage is measured
+from the directory on every store, since the other workers write to it too.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from logging_config import get_logger
+from url_canonical import canonicalize_url
+
+logger = get_logger(__name__)
+
+
+def cache_key(url: str, max_urls: int, show_full_text: bool, incremental: bool = False) -> str:
+    """ Key of one generation: the canonical URL plus the parameters that change its output """
+    try:
+        url = canonicalize_url(url)
+    except ValueError:
+        url = url.strip()
+    # Incremental output is assembled page by page and is laid out differently
+    if incremental:
+        return json.dumps([url, int(max_urls), bool(show_full_text), "incremental"])
+    return json.dumps([url, int(max_urls), bool(show_full_text)])
+
+
+class LLMsTxtCache:
+    """
+    In-memory LRU in front of an on-disk store, both expiring entries after ttl seconds.
+
+    The memory tier holds at most memory_entries entries and memory_bytes bytes of
+    content; entries larger than a quarter of memory_bytes are served from disk only.
+    A ttl of 0 disables the cache.
+    """
+
+    def __init__(self, directory: str, ttl: float = 86400, memory_entries: int = 64,
+                 memory_bytes: int = 32 * 1024 * 1024, max_disk_bytes: int = 512 * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.memory_bytes = memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, Tuple[float, str, int]]" = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + ".txt")
+
+    def get(self, key: str) -> Optional[str]:
+        """ Returns the cached content if it is still fresh """
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and now - entry[0] < self.ttl:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return entry[1]
+            self._forget(key)
+
+        # Files run to megabytes, so they are read without holding the lock
+        entry = self._read(key, now)
+        with self._lock:
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            stored_at, content, size = entry
+            current = self._memory.get(key)
+            # A put that raced with the read has the newer content
+            if current is None or current[0] <= stored_at:
+                self._remember(key, stored_at, content, size)
+            self._stats["disk_hits"] += 1
+            return content
+
+    def _read(self, key: str, now: float) -> Optional[Tuple[float, str, int]]:
+        """ Returns (store time, content, size) of the fresh file of key, None if there is none """
+        path = self._path(key)
+        try:
+            stored_at = os.path.getmtime(path)
+            if now - stored_at >= self.ttl:
+                return None
+            with open(path, encoding="utf-8") as f:
+                content = f.read()
+            # atime tracks the last use for eviction; mtime keeps the store time
+            os.utime(path, (now, stored_at))
+            return stored_at, content, os.path.getsize(path)
+        except OSError:
+            return None
+
+    def put(self, key: str, content: str) -> None:
+        """ Stores content in both tiers, evicting old disk entries beyond the size budget """
+        if not self.enabled or not content:
+            return
+        now = time.time()
+        data = content.encode("utf-8")
+        with self._lock:
+            self._remember(key, now, content, len(data))
+            self._stats["stores"] += 1
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+            self._trim()
+        except OSError as e:
+            logger.warning(f"Could not write llms.txt cache entry: {e}")
+
+    def _remember(self, key: str, stored_at: float, content: str, size: int) -> None:
+        self._forget(key)
+        # Full-text results run to megabytes; the largest stay on disk only
+        if size > self.memory_bytes // 4:
+            return
+        self._memory[key] = (stored_at, content, size)
+        self._memory_used += size
+        while len(self._memory) > self.memory_entries or self._memory_used > self.memory_bytes:
+            _, (_, _, evicted_size) = self._memory.popitem(last=False)
+            self._memory_used -= evicted_size
+
+    def _forget(self, key: str) -> None:
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_used -= entry[2]
+
+    def _disk_entries(self):
+        """ Yields (last use, path, size) of every cached file """
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith(".txt"):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield stat.st_atime, path, stat.st_size
+
+    def _trim(self) -> None:
+        """
+        Measures the directory and, beyond the budget, drops expired files and then the
+        least recently used ones down to 90% of it.
+
+        Listing the directory on every store costs far less than the generation that
+        produced the entry, and sees the files of every worker sharing it.
+        """
+        entries = list(self._disk_entries())
+        total = sum(size for _, _, size in entries)
+        evicted = 0
+        if total > self.max_disk_bytes:
+            now = time.time()
+            total = 0
+            live = []
+            for last_used, path, size in entries:
+                try:
+                    if now - os.path.getmtime(path) >= self.ttl:
+                        os.remove(path)
+                        evicted += 1
+                        continue
+                except OSError:
+                    continue
+                live.append((last_used, path, size))
+                total += size
+
+            for last_used, path, size in sorted(live):
+                if total <= self.max_disk_bytes * 0.9:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                evicted += 1
+        with self._lock:
+            self._disk_bytes = total
+            self._stats["evictions"] += evicted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["memory_hits"] + self._stats["disk_hits"] + self._stats["misses"]
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            return {
+                **self._stats,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_used,
+                "disk_bytes": self._disk_bytes,
+            }
+
+
+_shared_cache: Optional[LLMsTxtCache] = None
+_lock = threading.Lock()
+
+
+def shared_cache() -> LLMsTxtCache:
+    """ Returns the process-wide cache configured from the environment """
+    global _shared_cache
+    with _lock:
+        if _shared_cache is None:
+            _shared_cache = LLMsTxtCache(
+                directory=os.getenv("LLMS_TXT_CACHE_DIR", "data/llms_txt_cache"),
+                ttl=float(os.getenv("LLMS_TXT_CACHE_TTL", "86400")),
+                memory_entries=int(os.getenv("LLMS_TXT_CACHE_MEMORY_ENTRIES", "64")),
+                memory_bytes=int(os.getenv("LLMS_TXT_CACHE_MEMORY_BYTES", str(32 * 1024 * 1024))),
+                max_disk_bytes=int(float(os.getenv("LLMS_TXT_CACHE_MAX_MB", "512")) * 1024 * 1024),
+            )
+        return _shared_cache
@@ -0,0 +1,77 @@
+"""
+Per-page manifests of generated llms.txt files.
+
+An incremental refresh keeps, for every page of the previous llms.txt of a
+site, its sitemap `lastmod`, the hash of its scraped content and its rendered
+section. Pages whose `lastmod` did not change are spliced in from here instead
+of being scraped again.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional
+
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class PageManifestStore:
+    """ JSON manifests on disk, one per generation key """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._stats = {"refreshes": 0, "pages_reused": 0, "pages_scraped": 0, "pages_unchanged": 0}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def load(self, key: str) -> Dict[str, Dict[str, Any]]:
+        """ Returns the pages of the previous manifest by URL, empty if there is none """
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return {page["url"]: page for page in json.load(f)["pages"]}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable page manifest: {e}")
+            return {}
+
+    def save(self, key: str, pages: List[Dict[str, Any]]) -> None:
+        """ Replaces the manifest of key; pages hold url, lastmod, sha256 and section """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "pages": pages}, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"Could not write page manifest: {e}")
+
+    def record(self, reused: int, scraped: int, unchanged: int) -> None:
+        """ Counts one refresh; unchanged are scraped pages whose content hash did not change """
+        with self._lock:
+            self._stats["refreshes"] += 1
+            self._stats["pages_reused"] += reused
+            self._stats["pages_scraped"] += scraped
+            self._stats["pages_unchanged"] += unchanged
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+
+_shared_store: Optional[PageManifestStore] = None
+_lock = threading.Lock()
+
+
+def shared_manifests() -> PageManifestStore:
+    """ Returns the process-wide store in LLMS_TXT_MANIFEST_DIR """
+    global _shared_store
+    with _lock:
+        if _shared_store is None:
+            _shared_store = PageManifestStore(os.getenv("LLMS_TXT_MANIFEST_DIR", "data/llms_txt_manifests"))
+        return _shared_store
@@ -0,0 +1,198 @@
+"""
+Sitemap reading for incremental llms.txt refreshes.
+
+A site's sitemap lists its pages with an optional `lastmod` date, which tells
+which pages changed since the previous llms.txt without crawling them.
+
+The site URL comes from the purchaser, so robots.txt and sitemaps are only
+fetched from hosts that resolve to public addresses, checked again on every
+redirect, so the server itself and its private network stay out of reach.
+"""
+import asyncio
+import gzip
+import ipaddress
+import os
+import socket
+import threading
+import xml.etree.ElementTree as ElementTree
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+from logging_config import get_logger
+from url_canonical import canonicalize_url
+
+logger = get_logger(__name__)
+
+# Sitemaps are capped at 50 MB uncompressed by the protocol; indexes rarely need many files
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+MAX_SITEMAP_FILES = 10
+MAX_REDIRECTS = 5
+
+
+def is_public_address(address: str) -> bool:
+    """ Whether an IP address is globally routable: not loopback, private, link-local or reserved """
+    try:
+        ip = ipaddress.ip_address(address.split("%", 1)[0])
+    except ValueError:
+        return False
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+async def _resolve(host: str, port: int) -> List[str]:
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+
+async def is_public_url(url: str) -> bool:
+    """ Whether url is http(s) and every address its host resolves to is public """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return False
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        addresses = await _resolve(parts.hostname, port)
+    except (ValueError, OSError):
+        return False
+    return bool(addresses) and all(is_public_address(address) for address in addresses)
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_sitemap(data: bytes) -> Tuple[List[Tuple[str, str]], List[str]]:
+    """
+    Parses a sitemap or sitemap index.
+
+    Returns the (loc, lastmod) of its pages, lastmod being "" when missing, and
+    the locations of the sitemaps it points to.
+    """
+    if data[:2] == b"\x1f\x8b":  # sitemap.xml.gz
+        data = gzip.decompress(data)
+    root = ElementTree.fromstring(data)
+    pages, sitemaps = [], []
+    for entry in root:
+        fields = {_local_name(child.tag): (child.text or "").strip() for child in entry}
+        if not fields.get("loc"):
+            continue
+        if _local_name(entry.tag) == "sitemap":
+            sitemaps.append(fields["loc"])
+        elif _local_name(entry.tag) == "url":
+            pages.append((fields["loc"], fields.get("lastmod", "")))
+    return pages, sitemaps
+
+
+class SitemapReader:
+    """
+    Finds the pages of a site from its sitemap.
+
+    Only use it from coroutines running on the shared Firecrawl loop: its HTTP
+    client is bound to that loop.
+    """
+
+    def __init__(self, timeout: float = 15.0):
+        self.timeout = timeout
+        self._http: Optional[httpx.AsyncClient] = None
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """ Plain client without the Firecrawl credentials, which must not reach other sites """
+        if self._http is None:
+            # Redirects are followed by _fetch, which checks every hop
+            self._http = httpx.AsyncClient(timeout=self.timeout, follow_redirects=False,
+                                           headers={"User-Agent": "masumi-llms-txt-agent"})
+        return self._http
+
+    async def _fetch(self, url: str) -> Optional[bytes]:
+        try:
+            for _ in range(MAX_REDIRECTS + 1):
+                if not await is_public_url(url):
+                    logger.warning(f"Not fetching {url}: it does not resolve to a public address")
+                    return None
+                async with self.http.stream("GET", url) as response:
+                    if response.next_request is not None:
+                        url = str(response.next_request.url)
+                        continue
+                    if response.status_code != 200:
+                        return None
+                    data = bytearray()
+                    async for chunk in response.aiter_bytes():
+                        data += chunk
+                        if len(data) > MAX_SITEMAP_BYTES:
+                            logger.warning(f"Sitemap {url} is larger than {MAX_SITEMAP_BYTES} bytes, ignoring it")
+                            return None
+                    return bytes(data)
+            logger.info(f"Not fetching {url}: more than {MAX_REDIRECTS} redirects")
+            return None
+        except httpx.HTTPError as e:
+            logger.info(f"Could not fetch {url}: {e}")
+            return None
+
+    async def _sitemap_locations(self, site_url: str) -> List[str]:
+        """ The sitemaps named in robots.txt, or /sitemap.xml """
+        robots = await self._fetch(urljoin(site_url + "/", "/robots.txt"))
+        locations = []
+        if robots:
+            for line in robots.decode("utf-8", "replace").splitlines():
+                name, _, value = line.partition(":")
+                if name.strip().lower() == "sitemap" and value.strip():
+                    locations.append(value.strip())
+        return locations or [urljoin(site_url + "/", "/sitemap.xml")]
+
+    async def pages(self, site_url: str, limit: int) -> List[Tuple[str, str]]:
+        """
+        Returns up to limit (URL, lastmod) pairs of the site's pages in sitemap order.
+
+        Pages are returned as the sitemap lists them and deduplicated by canonical URL;
+        pages of other hosts are skipped. An empty list means the site has no usable sitemap.
+        """
+        host = urlsplit(canonicalize_url(site_url)).netloc
+        pending = await self._sitemap_locations(site_url)
+        seen, pages, listed = set(), [], set()
+        fetched = 0
+        while pending and len(pages) < limit and fetched < MAX_SITEMAP_FILES:
+            location = pending.pop(0)
+            if location in seen:
+                continue
+            seen.add(location)
+            fetched += 1
+            data = await self._fetch(location)
+            if not data:
+                continue
+            try:
+                # Parsing a large sitemap takes long enough to be kept off the event loop
+                entries, children = await asyncio.to_thread(parse_sitemap, data)
+            except (ElementTree.ParseError, OSError, EOFError) as e:
+                logger.info(f"Ignoring malformed sitemap {location}: {e}")
+                continue
+            pending.extend(children)
+            for loc, lastmod in entries:
+                try:
+                    canonical = canonicalize_url(loc)
+                except ValueError:
+                    continue
+                if urlsplit(canonical).netloc == host and canonical not in listed:
+                    listed.add(canonical)
+                    pages.append((loc, lastmod))
+                    if len(pages) >= limit:
+                        break
+        return pages
+
+
+_shared_reader: Optional[SitemapReader] = None
+_owner_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def shared_sitemap_reader() -> SitemapReader:
+    """ Returns the process-wide reader, created on first use """
+    global _shared_reader, _owner_pid
+    with _lock:
+        # Its connections belong to the shared loop, which a forked process rebuilds
+        if _shared_reader is None or _owner_pid != os.getpid():
+            _shared_reader = SitemapReader(timeout=float(os.getenv("SITEMAP_TIMEOUT", "15")))
+            _owner_pid = os.getpid()
+        return _shared_reader
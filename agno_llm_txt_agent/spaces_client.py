@@ -0,0 +1,276 @@
+"""
+Process-wide DigitalOcean Spaces (S3) client and content-addressed uploads.
+
+Building a boto3 client resolves credentials, loads the endpoint model and
+opens fresh TLS connections, so the workflow shares one pooled client per
+process and set of credentials instead of creating one per upload.
+
+Objects are stored under their content hash, so identical output is uploaded
+once and its URL never changes meaning; a per-domain alias is repointed at
+the latest version with a server-side copy. Text is stored pre-compressed with
+a Content-Encoding header, which HTTP clients decode transparently. Content
+is compressed and hashed as it streams into a spooled temporary file and
+large files go up as a multipart upload, so memory use does not grow with
+the size of the output.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import zlib
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+from urllib.parse import quote
+
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_clients: Dict[Tuple[int, str, str, str], Any] = {}
+_lock = threading.Lock()
+
+
+def spaces_client(region: str, key: str, secret: str):
+    """ Returns the shared S3 client for a Spaces region and key pair, created on first use """
+    # boto3 clients are thread-safe but must not cross a fork
+    cache_key = (os.getpid(), region, key, secret)
+    with _lock:
+        client = _clients.get(cache_key)
+        if client is None:
+            import boto3
+            from botocore.config import Config
+
+            client = boto3.client(
+                "s3",
+                region_name=region,
+                endpoint_url=f"https://{region}.digitaloceanspaces.com",
+                aws_access_key_id=key,
+                aws_secret_access_key=secret,
+                config=Config(
+                    connect_timeout=float(os.getenv("SPACES_CONNECT_TIMEOUT", "5")),
+                    read_timeout=float(os.getenv("SPACES_READ_TIMEOUT", "60")),
+                    max_pool_connections=int(os.getenv("SPACES_MAX_CONNECTIONS", "10")),
+                    retries={"max_attempts": 3, "mode": "standard"},
+                    tcp_keepalive=True,
+                    # Only send the checksums an operation requires; Spaces does not accept the
+                    # streaming CRC checksums newer botocore adds to every upload
+                    request_checksum_calculation="when_required",
+                    response_checksum_validation="when_required",
+                ),
+            )
+            _clients[cache_key] = client
+            logger.info(f"Created Spaces client for region {region}")
+        return client
+
+
+# Hashed objects never change; the alias is revalidated often
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+ALIAS_CACHE_CONTROL = "public, max-age=300"
+
+
+# Compressing a few hundred bytes saves less than the extra header costs
+COMPRESS_MIN_BYTES = 1024
+
+
+class _Brotli:
+    """ brotli.Compressor behind the compress/flush interface of zlib """
+
+    def __init__(self):
+        import brotli
+        self._compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=9)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+def _compressor(encoding: str):
+    """ Returns a streaming compressor for encoding, or None to store the data as is """
+    if encoding == "identity":
+        return None
+    if encoding == "br":
+        try:
+            return _Brotli()
+        except ImportError:
+            logger.warning("brotli is not installed, storing gzip instead")
+            encoding = "gzip"
+    if encoding == "gzip":
+        # Header without a timestamp, so identical content gives identical bytes and ETag
+        return zlib.compressobj(6, zlib.DEFLATED, 31)
+    raise ValueError(f"unsupported content encoding '{encoding}'")
+
+
+class EncodedBody:
+    """
+    Content compressed on the fly into a spooled temporary file.
+
+    Only max_memory bytes of the compressed output are kept in memory; the rest
+    rolls over to disk. The first min_bytes of the plain content are kept so that
+    payloads smaller than that can be stored uncompressed.
+    """
+
+    def __init__(self, encoding: str, max_memory: int, min_bytes: int = COMPRESS_MIN_BYTES):
+        self._compressor = _compressor(encoding or "identity")
+        self.min_bytes = min_bytes
+        self.encoding = ("br" if isinstance(self._compressor, _Brotli) else "gzip") if self._compressor else None
+        self.file = tempfile.SpooledTemporaryFile(max_size=max_memory)
+        self.md5 = hashlib.md5()
+        self.size = 0
+        self.plain_size = 0
+        self._head = bytearray()
+
+    def _write(self, data: bytes) -> None:
+        if data:
+            self.file.write(data)
+            self.md5.update(data)
+            self.size += len(data)
+
+    def write(self, chunk: bytes) -> None:
+        self.plain_size += len(chunk)
+        if len(self._head) < self.min_bytes:
+            self._head += chunk[:self.min_bytes - len(self._head)]
+        self._write(self._compressor.compress(chunk) if self._compressor else chunk)
+
+    def finish(self) -> None:
+        """ Flushes the compressor and rewinds the file for reading """
+        if self._compressor:
+            self._write(self._compressor.flush())
+            if self.plain_size < self.min_bytes:
+                self.file.seek(0)
+                self.file.truncate()
+                self.size = 0
+                self.md5 = hashlib.md5()
+                self.encoding = None
+                self._write(bytes(self._head))
+        self.file.seek(0)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def public_url(bucket: str, region: str, key: str) -> str:
+    return f"https://{bucket}.{region}.digitaloceanspaces.com/{quote(key)}"
+
+
+def stored_version(client, bucket: str, key: str) -> Optional[Dict[str, str]]:
+    """ Returns the sha256 metadata and ETag of an object, or None if it does not exist """
+    from botocore.exceptions import ClientError
+
+    try:
+        head = client.head_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+    return {"sha256": head.get("Metadata", {}).get("sha256", ""), "etag": head.get("ETag", "").strip('"')}
+
+
+def is_same_content(version: Optional[Dict[str, str]], sha256: str, md5: str) -> bool:
+    """ Whether a stored object holds the given content, by its sha256 metadata or its plain ETag """
+    return version is not None and (version["sha256"] == sha256 or version["etag"] == md5)
+
+
+def transfer_config():
+    """ Multipart settings of streamed uploads; memory use is about chunk size times concurrency """
+    from boto3.s3.transfer import TransferConfig
+
+    chunk_size = int(float(os.getenv("SPACES_MULTIPART_CHUNK_MB", "8")) * 1024 * 1024)
+    return TransferConfig(
+        multipart_threshold=chunk_size,
+        multipart_chunksize=chunk_size,
+        max_concurrency=int(os.getenv("SPACES_MULTIPART_CONCURRENCY", "4")),
+    )
+
+
+def _upload_body(client, bucket: str, key: str, body: EncodedBody, **extra_args) -> None:
+    """ Streams body to key, in parallel parts once it is larger than the multipart chunk size """
+    client.upload_fileobj(body.file, bucket, key, ExtraArgs={"ACL": "public-read", **extra_args},
+                          Config=transfer_config())
+
+
+def upload_versioned(client, bucket: str, region: str, data: Union[bytes, Iterable[bytes]], file_name: str,
+                     content_type: str = "text/plain; charset=utf-8", prefix: str = "llms",
+                     encoding: Optional[str] = "gzip", gzip_link: bool = False) -> Dict[str, Any]:
+    """
+    Stores data under prefix/<sha256>/file_name unless that object already exists,
+    then points the alias file_name at it. Both are compressed with encoding.
+
+    data is either bytes or an iterable of byte chunks; chunks are compressed and
+    spooled as they are read, so the content is never held in memory as a whole.
+
+    Returns the immutable `url`, the `alias_url`, whether the bytes were `uploaded`,
+    the `encoding` and `stored_bytes` of the object and, with gzip_link, the `gz_url`
+    of a plain .gz download.
+    """
+    max_memory = int(float(os.getenv("LLMS_TXT_SPOOL_MEMORY_MB", "4")) * 1024 * 1024)
+    body = EncodedBody(encoding, max_memory)
+    # The .gz download reuses the body when that ends up gzip; it is always compressed
+    gz_body = EncodedBody("gzip", max_memory, min_bytes=0) if gzip_link and body.encoding != "gzip" else None
+    try:
+        digest = hashlib.sha256()
+        for chunk in ([data] if isinstance(data, bytes) else data):
+            digest.update(chunk)
+            body.write(chunk)
+            if gz_body:
+                gz_body.write(chunk)
+        body.finish()
+        if gzip_link and gz_body is None and body.encoding != "gzip":
+            # Too small to be stored compressed; the plain bytes are at most COMPRESS_MIN_BYTES
+            gz_body = EncodedBody("gzip", max_memory, min_bytes=0)
+            gz_body.write(body.file.read())
+            body.file.seek(0)
+        if gz_body:
+            gz_body.finish()
+
+        sha256 = digest.hexdigest()
+        key = f"{prefix}/{sha256}/{file_name}"
+        # copy_object replaces all headers, so the alias needs the encoding restated
+        encoding_args = {"ContentEncoding": body.encoding} if body.encoding else {}
+
+        uploaded = False
+        if not is_same_content(stored_version(client, bucket, key), sha256, body.md5.hexdigest()):
+            _upload_body(client, bucket, key, body, ContentType=content_type,
+                         CacheControl=IMMUTABLE_CACHE_CONTROL, Metadata={"sha256": sha256}, **encoding_args)
+            uploaded = True
+        else:
+            logger.info(f"Content of {file_name} is unchanged, reusing {key}")
+
+        # Server-side copy, so repointing the alias costs no upload bandwidth
+        if not is_same_content(stored_version(client, bucket, file_name), sha256, body.md5.hexdigest()):
+            client.copy_object(
+                Bucket=bucket,
+                Key=file_name,
+                CopySource={"Bucket": bucket, "Key": key},
+                MetadataDirective="REPLACE",
+                ACL="public-read",
+                ContentType=content_type,
+                CacheControl=ALIAS_CACHE_CONTROL,
+                Metadata={"sha256": sha256},
+                **encoding_args,
+            )
+
+        result = {
+            "url": public_url(bucket, region, key),
+            "alias_url": public_url(bucket, region, file_name),
+            "uploaded": uploaded,
+            "encoding": body.encoding or "identity",
+            "stored_bytes": body.size,
+        }
+
+        if gzip_link:
+            # A .gz file for download managers and tools that do not decode Content-Encoding
+            gz = gz_body or body
+            gz_key = f"{key}.gz"
+            if not is_same_content(stored_version(client, bucket, gz_key), sha256, gz.md5.hexdigest()):
+                gz.file.seek(0)
+                _upload_body(client, bucket, gz_key, gz, ContentType="application/gzip",
+                             ContentDisposition=f'attachment; filename="{file_name}.gz"',
+                             CacheControl=IMMUTABLE_CACHE_CONTROL, Metadata={"sha256": sha256})
+            result["gz_url"] = public_url(bucket, region, gz_key)
+
+        return result
+    finally:
+        body.close()
+        if gz_body:
+            gz_body.close()
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# The agent's modules import each other by their flat module names. Every agent has
+# its own agent_definition, logging_config and main, so the ones another agent's
+# tests imported are dropped before this agent's tests import theirs
+for name in ("agent_definition", "logging_config", "main"):
+    sys.modules.pop(name, None)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
@@ -0,0 +1,39 @@
+from combined_llms_txt import HEADER, SEPARATOR, CombinedLLMsTxt, create_combined_llms_txt
+
+
+def section(url, content):
+    return f"\n\n{SEPARATOR}\n# URL: {url}\n{SEPARATOR}\n\n{content}"
+
+
+def test_sections_are_read_back_in_request_order():
+    with CombinedLLMsTxt() as combined:
+        combined.add(2, "https://c.example", "c")
+        combined.add(0, "https://a.example", "a")
+
+        text = b"".join(combined.chunks()).decode("utf-8")
+
+        assert len(combined) == 2
+        assert 0 in combined and 1 not in combined
+
+    assert text == HEADER + section("https://a.example", "a") + "\n" + section("https://c.example", "c")
+
+
+def test_large_sections_spill_to_disk_and_stream_in_chunks():
+    content = "x" * 5000
+    with CombinedLLMsTxt(max_memory=1024, chunk_size=1000) as combined:
+        combined.add(0, "https://a.example", content)
+
+        assert combined.file._rolled
+        chunks = list(combined.chunks())
+
+    assert max(len(chunk) for chunk in chunks) == 1000
+    assert b"".join(chunks).decode("utf-8") == HEADER + section("https://a.example", content)
+
+
+def test_the_memory_budget_comes_from_the_environment(monkeypatch):
+    monkeypatch.setenv("LLMS_TXT_SPOOL_MEMORY_MB", "0.001")
+
+    with create_combined_llms_txt() as combined:
+        combined.add(0, "https://a.example", "x" * 2000)
+
+        assert combined.file._rolled
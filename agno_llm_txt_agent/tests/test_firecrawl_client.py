@@ -0,0 +1,28 @@
+import firecrawl_client
+from firecrawl_client import FirecrawlClient, shared_runtime
+
+
+def test_the_http_client_is_pooled_and_reused():
+    client = FirecrawlClient("fc-key", connect_timeout=3, read_timeout=20)
+
+    http = client.http
+
+    assert client.http is http
+    assert http.timeout.connect == 3
+    assert http.timeout.read == 20
+    assert http.headers["Authorization"] == "Bearer fc-key"
+
+
+def test_the_runtime_is_shared_until_the_process_forks(monkeypatch):
+    monkeypatch.setenv("FIRECRAWL_CONCURRENCY", "2")
+    for name in ("_shared_loop", "_shared_client", "_owner_pid"):
+        monkeypatch.setattr(firecrawl_client, name, None)
+    loop, client = shared_runtime()
+
+    assert shared_runtime() == (loop, client)
+
+    monkeypatch.setattr(firecrawl_client.os, "getpid", lambda: -1)
+    forked_loop, forked_client = shared_runtime()
+
+    assert forked_loop is not loop
+    assert forked_client is not client
@@ -0,0 +1,117 @@
+import os
+import time
+
+import llms_txt_cache
+from llms_txt_cache import LLMsTxtCache, cache_key
+
+
+def test_cache_key_uses_the_canonical_url_and_generation_parameters():
+    assert cache_key("http://www.masumi.network/", 10, False) == cache_key("masumi.network", 10, False)
+    assert cache_key("masumi.network", 10, False) != cache_key("masumi.network", 20, False)
+    assert cache_key("masumi.network", 10, False) != cache_key("masumi.network", 10, True)
+    assert cache_key("masumi.network", 10, False) != cache_key("masumi.network", 10, False, incremental=True)
+
+
+def test_entries_are_served_from_memory_then_from_disk(tmp_path):
+    cache = LLMsTxtCache(str(tmp_path))
+    cache.put("key", "content")
+
+    assert cache.get("key") == "content"
+    assert cache.stats()["memory_hits"] == 1
+
+    restarted = LLMsTxtCache(str(tmp_path))
+    assert restarted.get("key") == "content"
+    assert restarted.get("key") == "content"
+    assert restarted.stats()["disk_hits"] == 1
+    assert restarted.stats()["memory_hits"] == 1
+    assert restarted.get("missing") is None
+    assert restarted.stats()["misses"] == 1
+
+
+def test_entries_expire_after_the_ttl(tmp_path, monkeypatch):
+    cache = LLMsTxtCache(str(tmp_path), ttl=60)
+    cache.put("key", "content")
+
+    later = time.time() + 61
+    monkeypatch.setattr(llms_txt_cache.time, "time", lambda: later)
+
+    assert cache.get("key") is None
+    assert LLMsTxtCache(str(tmp_path), ttl=60).get("key") is None
+
+
+def test_a_zero_ttl_disables_the_cache(tmp_path):
+    cache = LLMsTxtCache(str(tmp_path), ttl=0)
+    cache.put("key", "content")
+
+    assert cache.get("key") is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_memory_tier_stays_within_its_byte_budget(tmp_path):
+    cache = LLMsTxtCache(str(tmp_path), memory_bytes=400)
+    for key in ("a", "b", "c", "d", "e"):
+        cache.put(key, key * 100)
+
+    stats = cache.stats()
+    assert stats["memory_bytes"] <= 400
+    assert stats["memory_entries"] == 4
+    # The least recently used entry left memory but is still on disk
+    assert cache.get("a") == "a" * 100
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_entries_larger_than_a_quarter_of_the_memory_budget_stay_on_disk(tmp_path):
+    cache = LLMsTxtCache(str(tmp_path), memory_bytes=400)
+    cache.put("small", "s" * 100)
+    cache.put("large", "l" * 101)
+
+    assert cache.stats()["memory_entries"] == 1
+    assert cache.stats()["memory_bytes"] == 100
+    assert cache.get("large") == "l" * 101
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_disk_tier_evicts_the_least_recently_used_files(tmp_path, monkeypatch):
+    # No memory tier, so every read goes to disk and refreshes the file's last use
+    cache = LLMsTxtCache(str(tmp_path), memory_entries=0, max_disk_bytes=250)
+    cache.put("a", "a" * 100)
+    cache.put("b", "b" * 100)
+
+    later = time.time() + 10
+    monkeypatch.setattr(llms_txt_cache.time, "time", lambda: later)
+    assert cache.get("a") == "a" * 100
+    cache.put("c", "c" * 100)
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["disk_bytes"] == 200
+    assert cache.get("b") is None
+    assert cache.get("a") == "a" * 100
+    assert cache.get("c") == "c" * 100
+
+
+def test_workers_sharing_the_directory_stay_within_the_disk_budget(tmp_path):
+    first = LLMsTxtCache(str(tmp_path), memory_entries=0, max_disk_bytes=250)
+    second = LLMsTxtCache(str(tmp_path), memory_entries=0, max_disk_bytes=250)
+    first.put("a", "a" * 100)
+    second.put("b", "b" * 100)
+    first.put("c", "c" * 100)
+
+    on_disk = sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path))
+    assert on_disk <= 250
+    assert first.stats()["evictions"] == 1
+    assert first.stats()["disk_bytes"] == on_disk
+
+
+def test_disk_reads_do_not_hold_the_lock(tmp_path, monkeypatch):
+    LLMsTxtCache(str(tmp_path)).put("key", "content")
+    cache = LLMsTxtCache(str(tmp_path))
+    held = []
+
+    def checked_open(*args, **kwargs):
+        held.append(cache._lock.locked())
+        return open(*args, **kwargs)
+
+    monkeypatch.setattr(llms_txt_cache, "open", checked_open, raising=False)
+
+    assert cache.get("key") == "content"
+    assert held == [False]
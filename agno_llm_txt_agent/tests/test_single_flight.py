@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from firecrawl_client import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    calls = 0
+
+    async def generate(notify):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "llms.txt"
+
+    async def main():
+        return await asyncio.gather(*(flights.run("key", generate) for _ in range(3)))
+
+    assert asyncio.run(main()) == [("llms.txt", False), ("llms.txt", True), ("llms.txt", True)]
+    assert calls == 1
+    assert flights.metrics() == {"in_flight": 0, "started": 1, "coalesced": 2}
+
+
+def test_different_keys_and_later_calls_run_separately():
+    flights = SingleFlight()
+    calls = []
+
+    async def generate(notify):
+        calls.append(True)
+        return "llms.txt"
+
+    async def main():
+        await asyncio.gather(flights.run("a", generate), flights.run("b", generate))
+        await flights.run("a", generate)
+
+    asyncio.run(main())
+
+    assert len(calls) == 3
+
+
+def test_late_callers_receive_the_events_published_before_they_joined():
+    flights = SingleFlight()
+    first_events, late_events = [], []
+
+    async def generate(notify):
+        notify("generation_started", generation_id="g-1")
+        await asyncio.sleep(0.02)
+        notify("progress", pages=2)
+        return "llms.txt"
+
+    async def main():
+        first = asyncio.create_task(flights.run("key", generate, on_event=lambda step, **data: first_events.append(step)))
+        await asyncio.sleep(0.01)
+        late = flights.run("key", generate, on_event=lambda step, **data: late_events.append((step, data)))
+        return await asyncio.gather(first, late)
+
+    asyncio.run(main())
+
+    assert first_events == ["generation_started", "progress"]
+    assert late_events == [("generation_started", {"generation_id": "g-1"}), ("progress", {"pages": 2})]
+
+
+def test_the_call_survives_until_its_last_caller_is_cancelled():
+    flights = SingleFlight()
+    cancelled = []
+
+    async def generate(notify):
+        try:
+            await asyncio.sleep(0.05)
+            return "llms.txt"
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def main():
+        first = asyncio.create_task(flights.run("key", generate))
+        second = asyncio.create_task(flights.run("key", generate))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        result = await second
+
+        third = asyncio.create_task(flights.run("other", generate))
+        await asyncio.sleep(0.01)
+        third.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await third
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(main()) == ("llms.txt", True)
+    assert cancelled == [True]
+
+
+def test_failures_reach_every_caller():
+    flights = SingleFlight()
+
+    async def generate(notify):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("firecrawl unavailable")
+
+    async def main():
+        return await asyncio.gather(flights.run("key", generate), flights.run("key", generate), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(main()))
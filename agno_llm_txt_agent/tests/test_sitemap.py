@@ -0,0 +1,113 @@
+import asyncio
+
+import httpx
+import pytest
+
+import sitemap
+from sitemap import SitemapReader, is_public_address
+
+ADDRESSES = {"example.com": ["93.184.216.34"], "www.example.com": ["93.184.216.34"], "internal.example.com": ["10.0.0.5"]}
+
+SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://example.com/docs</loc><lastmod>2025-01-02</lastmod></url>
+  <url><loc>https://example.com/about</loc></url>
+  <url><loc>https://other.example.org/page</loc></url>
+</urlset>"""
+
+
+@pytest.fixture(autouse=True)
+def fake_dns(monkeypatch):
+    """ Resolves the test hosts without DNS; IP literals resolve to themselves """
+    async def resolve(host, port):
+        if host in ADDRESSES:
+            return ADDRESSES[host]
+        if host.replace(".", "").isdigit() or ":" in host:
+            return [host]
+        raise OSError(f"unknown host {host}")
+
+    monkeypatch.setattr(sitemap, "_resolve", resolve)
+
+
+def reader_for(routes):
+    """ A reader whose requests are answered from routes, recording the URLs it requested """
+    requested = []
+
+    def handler(request):
+        requested.append(str(request.url))
+        return routes.get(str(request.url), httpx.Response(404))
+
+    reader = SitemapReader()
+    reader._http = httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=False)
+    return reader, requested
+
+
+@pytest.mark.parametrize("address", [
+    "127.0.0.1", "10.1.2.3", "172.16.0.1", "192.168.1.1", "169.254.169.254",
+    "100.64.0.1", "0.0.0.0", "::1", "fd00::1", "fe80::1%eth0", "::ffff:127.0.0.1",
+])
+def test_non_public_addresses_are_rejected(address):
+    assert not is_public_address(address)
+
+
+def test_public_addresses_are_accepted():
+    assert is_public_address("93.184.216.34")
+    assert is_public_address("2606:2800:220:1:248:1893:25c8:1946")
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/sitemap.xml",
+    "http://169.254.169.254/latest/meta-data/",
+    "https://internal.example.com/robots.txt",
+    "file:///etc/passwd",
+])
+def test_non_public_urls_are_not_requested(url):
+    reader, requested = reader_for({url: httpx.Response(200, content=SITEMAP)})
+
+    assert asyncio.run(reader._fetch(url)) is None
+    assert requested == []
+
+
+def test_redirects_to_non_public_hosts_are_not_followed():
+    reader, requested = reader_for({
+        "https://example.com/sitemap.xml": httpx.Response(
+            302, headers={"Location": "http://169.254.169.254/latest/meta-data/"}),
+    })
+
+    assert asyncio.run(reader._fetch("https://example.com/sitemap.xml")) is None
+    assert requested == ["https://example.com/sitemap.xml"]
+
+
+def test_redirects_between_public_hosts_are_followed():
+    reader, requested = reader_for({
+        "http://example.com/sitemap.xml": httpx.Response(
+            301, headers={"Location": "https://example.com/sitemap.xml"}),
+        "https://example.com/sitemap.xml": httpx.Response(200, content=SITEMAP),
+    })
+
+    assert asyncio.run(reader._fetch("http://example.com/sitemap.xml")) == SITEMAP
+    assert requested == ["http://example.com/sitemap.xml", "https://example.com/sitemap.xml"]
+
+
+def test_pages_lists_the_pages_of_the_site_from_robots_txt():
+    reader, _ = reader_for({
+        "https://example.com/robots.txt": httpx.Response(
+            200, content=b"User-agent: *\nSitemap: https://example.com/pages.xml\n"),
+        "https://example.com/pages.xml": httpx.Response(200, content=SITEMAP),
+    })
+
+    pages = asyncio.run(reader.pages("https://example.com", limit=10))
+
+    assert pages == [("https://example.com/docs", "2025-01-02"), ("https://example.com/about", "")]
+
+
+def test_pages_keep_the_urls_the_sitemap_lists():
+    listing = b"""<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>http://www.example.com/docs/</loc></url>
+  <url><loc>http://www.example.com/docs</loc></url>
+</urlset>"""
+    reader, _ = reader_for({"http://www.example.com/sitemap.xml": httpx.Response(200, content=listing)})
+
+    pages = asyncio.run(reader.pages("http://www.example.com", limit=10))
+
+    assert pages == [("http://www.example.com/docs/", "")]
@@ -0,0 +1,128 @@
+import gzip
+import hashlib
+
+import pytest
+from botocore.exceptions import ClientError
+
+import spaces_client as spaces
+from spaces_client import COMPRESS_MIN_BYTES, is_same_content, spaces_client, upload_versioned
+
+
+class FakeSpaces:
+    """ The S3 calls upload_versioned makes, against a dict of stored objects """
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = []
+        self.copies = []
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        stored = self.objects[Key]
+        return {"Metadata": stored["args"].get("Metadata", {}), "ETag": f'"{hashlib.md5(stored["body"]).hexdigest()}"'}
+
+    def upload_fileobj(self, fileobj, bucket, key, ExtraArgs=None, Config=None):
+        self.uploads.append(key)
+        self.objects[key] = {"body": fileobj.read(), "args": ExtraArgs or {}}
+
+    def copy_object(self, Bucket, Key, CopySource, **args):
+        self.copies.append(Key)
+        self.objects[Key] = {"body": self.objects[CopySource["Key"]]["body"], "args": args}
+
+
+def upload(spaces, data, **kwargs):
+    return upload_versioned(spaces, "bucket", "ams3", data, "masumi.network-llms.txt", **kwargs)
+
+
+SMALL = b"# masumi.network\n"
+LARGE = b"".join(b"- [Page %d](https://masumi.network/%d): text\n" % (i, i) for i in range(200))
+
+
+@pytest.mark.parametrize("content", [SMALL, LARGE], ids=["small", "large"])
+@pytest.mark.parametrize("encoding", ["gzip", "identity"])
+def test_gz_download_is_always_a_valid_gzip_file(content, encoding):
+    spaces = FakeSpaces()
+
+    result = upload(spaces, content, encoding=encoding, gzip_link=True)
+
+    gz_key = result["gz_url"].split(".digitaloceanspaces.com/")[1]
+    stored = spaces.objects[gz_key]
+    assert stored["args"]["ContentType"] == "application/gzip"
+    assert gzip.decompress(stored["body"]) == content
+
+
+def test_small_content_is_stored_plain():
+    spaces = FakeSpaces()
+
+    result = upload(spaces, SMALL, encoding="gzip")
+
+    assert len(SMALL) < COMPRESS_MIN_BYTES
+    assert result["encoding"] == "identity"
+    stored = spaces.objects[result["url"].split(".digitaloceanspaces.com/")[1]]
+    assert stored["body"] == SMALL
+    assert "ContentEncoding" not in stored["args"]
+
+
+def test_objects_are_addressed_by_the_hash_of_their_content():
+    result = upload(FakeSpaces(), LARGE)
+
+    assert result["url"].endswith(f"/llms/{hashlib.sha256(LARGE).hexdigest()}/masumi.network-llms.txt")
+    assert result["alias_url"].endswith("/masumi.network-llms.txt")
+
+
+def test_unchanged_content_is_not_uploaded_again():
+    spaces = FakeSpaces()
+    first = upload(spaces, LARGE)
+    uploads, copies = list(spaces.uploads), list(spaces.copies)
+
+    second = upload(spaces, iter([LARGE[:100], LARGE[100:]]))
+
+    assert first["uploaded"] and not second["uploaded"]
+    assert second["url"] == first["url"]
+    assert (spaces.uploads, spaces.copies) == (uploads, copies)
+
+
+def test_changed_content_gets_a_new_object_and_moves_the_alias():
+    spaces = FakeSpaces()
+    first = upload(spaces, LARGE)
+
+    second = upload(spaces, LARGE + b"- [New page](https://masumi.network/new)\n")
+
+    assert second["uploaded"]
+    assert second["url"] != first["url"]
+    assert first["url"].split(".digitaloceanspaces.com/")[1] in spaces.objects
+    assert spaces.objects["masumi.network-llms.txt"]["args"]["Metadata"]["sha256"] in second["url"]
+
+
+def test_objects_without_hash_metadata_match_on_their_etag():
+    md5 = hashlib.md5(SMALL).hexdigest()
+
+    assert is_same_content({"sha256": "", "etag": md5}, "new-sha256", md5)
+    assert not is_same_content({"sha256": "", "etag": "other"}, "new-sha256", md5)
+    assert not is_same_content(None, "new-sha256", md5)
+
+
+@pytest.fixture
+def no_clients(monkeypatch):
+    monkeypatch.setattr(spaces, "_clients", {})
+
+
+def test_clients_are_shared_per_region_and_key_pair(no_clients, monkeypatch):
+    monkeypatch.setenv("SPACES_MAX_CONNECTIONS", "12")
+    monkeypatch.setenv("SPACES_READ_TIMEOUT", "45")
+    client = spaces_client("ams3", "key", "secret")
+
+    assert spaces_client("ams3", "key", "secret") is client
+    assert spaces_client("nyc3", "key", "secret") is not client
+    assert spaces_client("ams3", "other-key", "secret") is not client
+    assert client.meta.endpoint_url == "https://ams3.digitaloceanspaces.com"
+    assert client.meta.config.max_pool_connections == 12
+    assert client.meta.config.read_timeout == 45
+
+
+def test_a_forked_process_builds_its_own_client(no_clients, monkeypatch):
+    client = spaces_client("ams3", "key", "secret")
+    monkeypatch.setattr(spaces.os, "getpid", lambda: -1)
+
+    assert spaces_client("ams3", "key", "secret") is not client
@@ -0,0 +1,63 @@
+import pytest
+
+from url_canonical import canonicalize_url, dedupe_urls
+
+
+@pytest.mark.parametrize("url", [
+    "https://masumi.network",
+    "http://www.masumi.network/",
+    "masumi.network/#team",
+    "  HTTPS://Masumi.Network:443  ",
+    "https://masumi.network/?utm_source=x&fbclid=y",
+])
+def test_spellings_of_one_site_share_a_canonical_url(url):
+    assert canonicalize_url(url) == "https://masumi.network"
+
+
+def test_query_parameters_that_can_select_content_are_kept():
+    assert canonicalize_url("https://example.com/?ref=main&source=docs") == "https://example.com?ref=main&source=docs"
+
+
+def test_paths_ports_and_queries_are_kept():
+    assert canonicalize_url("https://masumi.network/docs/") == "https://masumi.network/docs"
+    assert canonicalize_url("http://localhost:8080/a") == "https://localhost:8080/a"
+    assert canonicalize_url("https://example.com/?b=2&a=1&utm_medium=mail") == "https://example.com?a=1&b=2"
+
+
+def test_hosts_are_idna_encoded():
+    assert canonicalize_url("https://Bücher.example") == "https://xn--bcher-kva.example"
+
+
+def test_ipv6_hosts_keep_their_brackets():
+    assert canonicalize_url("http://[::1]:8000/") == "https://[::1]:8000"
+
+
+@pytest.mark.parametrize("url", ["", "   ", "ftp://masumi.network", "https://", "https://masumi.network:99999"])
+def test_uncrawlable_urls_are_rejected(url):
+    with pytest.raises(ValueError):
+        canonicalize_url(url)
+
+
+def test_dedupe_urls_keeps_first_seen_order_and_reports_invalid_urls():
+    canonical, aliases, invalid = dedupe_urls([
+        "https://masumi.network",
+        "example.com",
+        "",
+        "http://www.masumi.network/",
+        "ftp://masumi.network",
+    ])
+
+    assert canonical == ["https://masumi.network", "https://example.com"]
+    assert aliases == {
+        "https://masumi.network": "https://masumi.network",
+        "example.com": "https://example.com",
+        "http://www.masumi.network/": "https://masumi.network",
+    }
+    assert invalid == ["ftp://masumi.network"]
+
+
+def test_dedupe_urls_crawls_the_first_spelling_of_each_site():
+    crawl, aliases, _ = dedupe_urls(["http://www.masumi.network/", "https://masumi.network", "masumi.network/docs"])
+
+    assert crawl == ["http://www.masumi.network/", "https://masumi.network/docs"]
+    assert aliases["https://masumi.network"] == "http://www.masumi.network/"
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+import agent_definition
+from firecrawl_client import SingleFlight
+from llms_txt_cache import LLMsTxtCache, cache_key
+from page_manifest import PageManifestStore
+
+SITE = "https://example.com"
+
+
+class FakeFirecrawl:
+    """ Stands in for the Firecrawl client: scrapes return a fixed page, full generations are counted """
+
+    def __init__(self):
+        self.slots = asyncio.Semaphore(4)
+        self.flights = SingleFlight()
+        self.scraped = []
+        self.generations = 0
+
+    async def scrape(self, url):
+        self.scraped.append(url)
+        return {"success": True, "data": {"markdown": f"text of {url}", "metadata": {"title": url}}}
+
+    async def start(self, url, max_urls, show_full_text):
+        self.generations += 1
+        return {"success": True, "id": "generation-1"}
+
+    async def wait(self, generation_id, show_full_text):
+        return f"# {SITE} llms.txt\n\ngenerated"
+
+
+class FakeSitemaps:
+    def __init__(self, pages):
+        self.listed = 0
+        self._pages = pages
+
+    async def pages(self, url, limit):
+        self.listed += 1
+        return self._pages[:limit]
+
+
+@pytest.fixture
+def workflow(tmp_path):
+    def build(**kwargs):
+        flow = agent_definition.LLMsTxtGeneratorWorkflow(urls=[SITE], max_urls=10, show_full_text=False, **kwargs)
+        flow.firecrawl = FakeFirecrawl()
+        flow.cache = LLMsTxtCache(str(tmp_path / "cache"))
+        flow.manifests = PageManifestStore(str(tmp_path / "manifests"))
+        flow.sitemaps = FakeSitemaps([(f"{SITE}/docs", "2025-01-02"), (f"{SITE}/about", "2025-01-01")])
+        return flow
+
+    return build
+
+
+def process(flow, url=SITE):
+    events = []
+    content = asyncio.run(flow._process_url(url, events.append))
+    return content, [event.content for event in events]
+
+
+def test_full_generations_are_served_from_the_cache(workflow):
+    flow = workflow()
+    flow.cache.put(cache_key(SITE, 10, False), "cached llms.txt")
+
+    content, events = process(flow)
+
+    assert content == "cached llms.txt"
+    assert events[-1]["cached"] is True
+    assert flow.firecrawl.generations == 0
+
+
+def test_incremental_refreshes_read_the_sitemap_despite_a_cached_result(workflow):
+    flow = workflow(incremental=True)
+    key = cache_key(SITE, 10, False, incremental=True)
+    flow.cache.put(key, "stale llms.txt")
+
+    content, events = process(flow)
+
+    assert flow.sitemaps.listed == 1
+    assert content.startswith(f"# {SITE} llms.txt")
+    assert f"[{SITE}/docs]({SITE}/docs)" in content
+    assert not events[-1].get("cached")
+    assert sorted(flow.firecrawl.scraped) == [f"{SITE}/about", f"{SITE}/docs"]
+
+
+def test_incremental_refreshes_scrape_only_changed_pages(workflow):
+    first = workflow(incremental=True)
+    process(first)
+
+    second = workflow(incremental=True)
+    second.manifests = first.manifests
+    second.cache = first.cache
+    second.sitemaps = FakeSitemaps([(f"{SITE}/docs", "2025-02-01"), (f"{SITE}/about", "2025-01-01")])
+    content, _ = process(second)
+
+    assert second.firecrawl.scraped == [f"{SITE}/docs"]
+    assert f"{SITE}/about" in content
+    assert second.cache.get(cache_key(SITE, 10, False, incremental=True)) is None
+
+
+def test_files_are_named_after_the_canonical_host(workflow):
+    flow = workflow()
+
+    assert flow._generate_file_name(["http://www.example.com/"]) == "llm-example-com.txt"
@@ -0,0 +1,86 @@
+"""
+URL canonicalization for crawl requests.
+
+`https://masumi.network`, `http://www.masumi.network/` and
+`masumi.network/#team` all describe the same site. Their canonical URL is the
+key under which they are deduplicated, cached and coalesced, but the spelling
+requested first is what gets crawled: some sites only answer on http or on
+their `www.` host. The other spellings are kept for reporting.
+"""
+from typing import Dict, Iterable, List, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the visitor and never change the page
+TRACKING_PARAMS = {
+    "gclid", "gclsrc", "dclid", "fbclid", "msclkid", "yclid", "twclid", "igshid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "_hsenc", "_hsmi", "ref_src",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "mtm_")
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Returns the canonical form of a website URL.
+
+    The scheme becomes https, the host is lowercased, IDNA-encoded and loses its
+    `www.` prefix and default port, trailing slashes, fragments and tracking
+    parameters are dropped and the remaining query parameters are sorted.
+    Raises ValueError for URLs that cannot be crawled.
+    """
+    raw = url.strip()
+    if not raw:
+        raise ValueError("empty URL")
+    if "://" not in raw:
+        raw = f"https://{raw}"
+
+    parts = urlsplit(raw)
+    if parts.scheme.lower() not in ("http", "https"):
+        raise ValueError(f"unsupported scheme '{parts.scheme}'")
+    host = (parts.hostname or "").rstrip(".")
+    if not host:
+        raise ValueError("missing host")
+    try:
+        host = host.encode("idna").decode("ascii").lower()
+    except UnicodeError as e:
+        raise ValueError(f"invalid host '{host}': {e}")
+    if host.startswith("www."):
+        host = host[4:]
+
+    if ":" in host:
+        host = f"[{host}]"  # IPv6 literal
+
+    port = parts.port  # raises ValueError for an invalid port
+    netloc = f"{host}:{port}" if port and port not in (80, 443) else host
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit(("https", netloc, parts.path.rstrip("/"), urlencode(query), ""))
+
+
+def dedupe_urls(urls: Iterable[str]) -> Tuple[List[str], Dict[str, str], List[str]]:
+    """
+    Collapses urls that share a canonical URL.
+
+    Returns the URLs to crawl, which are the first-seen spelling of each site
+    given an https:// scheme if it has none, the mapping of every valid original
+    URL to the URL crawled for it, and the invalid originals. Blank entries are
+    ignored.
+    """
+    crawl_urls: Dict[str, str] = {}
+    aliases: Dict[str, str] = {}
+    invalid: List[str] = []
+    for original in urls:
+        if not original or not original.strip():
+            continue
+        try:
+            canonical = canonicalize_url(original)
+        except ValueError:
+            invalid.append(original)
+            continue
+        if canonical not in crawl_urls:
+            url = original.strip()
+            crawl_urls[canonical] = url if "://" in url else f"https://{url}"
+        aliases[original] = crawl_urls[canonical]
+    return list(crawl_urls.values()), aliases, invalid
@@ -1,31 +1,46 @@
 from textwrap import dedent
-from typing import Dict, Any, Iterator, Optional
+from typing import Dict, Any, Generator, Iterator, List, Optional
 import os
 import json
-import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from logging_config import get_logger
+from nft_pipeline import (BatchItem, NFTConfigurationError, NFTPipelineError, generate_media, mint_nft,
+                          pipeline_mode, unique_token_name, upload_nft)
+from mint_queue import mint_queue_metrics, shared_mint_queue
+from tools.nmkr_cache import nmkr_cache_metrics
+from tools.nmkr_client import nmkr_client_metrics
 
 from agno.agent import Agent, RunResponse
-from agno.models.openai import OpenAIChat
+from agno.run.response import RunEvent
 from agno.workflow import Workflow
 from agno.utils.log import logger
-from tools.nmkr_toolkit import NMKRToolkit
-from agno.tools.replicate import ReplicateTools
 from dotenv import load_dotenv
 
 # Load environment variables and configure logging
 load_dotenv()
 logger = get_logger(__name__)
 
-class ContentToNFTWorkflow(Workflow):
-    """Workflow for generating content (image/video) and minting it as an NFT"""
-    
-    description: str = (
-        "Generate AI content (image or video) based on user description and mint it as an NFT"
-    )
-    
-    # Image generation agent using Replicate's Luma API
-    image_generator = Agent(
+# RunResponse event used for intermediate workflow progress
+PROGRESS_EVENT = "WorkflowProgress"
+
+# NMKR tool calls of the minting agent that are reported as workflow progress
+MINT_TOOL_STEPS = {
+    "upload_file_and_metadata": "nft_uploaded",
+    "mint_and_send_specific": "mint_submitted",
+}
+
+# Agents and the NMKR toolkit are built on first use, so importing this module does
+# not pull in the OpenAI/Replicate clients. Agents keep per-run state (session, model
+# tools, run response), so every workflow run builds its own; jobs run concurrently.
+# The stateless NMKR toolkit is shared
+def get_image_generator() -> Agent:
+    """Image generation agent using Replicate's Luma API"""
+    from agno.models.openai import OpenAIChat
+    from agno.tools.replicate import ReplicateTools
+    return Agent(
         name="Image Generator",
         model=OpenAIChat(id="gpt-4o"),
         tools=[ReplicateTools(model="luma/photon-flash")],
@@ -41,9 +56,12 @@ class ContentToNFTWorkflow(Workflow):
         debug_mode=True,
         show_tool_calls=True,
     )
-    
-    # Video generation agent using Replicate's Kling API
-    video_generator = Agent(
+
+def get_video_generator() -> Agent:
+    """Video generation agent using Replicate's Kling API"""
+    from agno.models.openai import OpenAIChat
+    from agno.tools.replicate import ReplicateTools
+    return Agent(
         name="Video Generator",
         model=OpenAIChat(id="gpt-4o"),
         tools=[ReplicateTools(model="kwaivgi/kling-v1.6-standard")],
@@ -59,18 +77,23 @@ class ContentToNFTWorkflow(Workflow):
         debug_mode=True,
         show_tool_calls=True,
     )
-    
-    # Create NMKR toolkit 
-    nmkr_toolkit = NMKRToolkit(
+
+@lru_cache(maxsize=None)
+def get_nmkr_toolkit():
+    """NMKR Studio toolkit configured from the environment"""
+    from tools.nmkr_toolkit import NMKRToolkit
+    return NMKRToolkit(
         api_key=os.environ.get("NMKR_API_KEY"),
         environment=os.environ.get("NMKR_ENVIRONMENT")
     )
-    
-    # NFT minting agent using NMKR API
-    nft_minter = Agent(
+
+def get_nft_minter() -> Agent:
+    """NFT minting agent using NMKR API"""
+    from agno.models.openai import OpenAIChat
+    return Agent(
         name="NFT Minter",
         model=OpenAIChat(id="gpt-4o"),
-        tools=[nmkr_toolkit],
+        tools=[get_nmkr_toolkit()],
         description="Mint NFTs from digital content using NMKR Studio",
         instructions=[
             "You are an NFT minting specialist using NMKR Studio.",
@@ -92,7 +115,31 @@ class ContentToNFTWorkflow(Workflow):
         debug_mode=True,
         show_tool_calls=True,
     )
+
+class ContentToNFTWorkflow(Workflow):
+    """Workflow for generating content (image/video) and minting it as an NFT"""
     
+    description: str = (
+        "Generate AI content (image or video) based on user description and mint it as an NFT"
+    )
+    
+    # Agents of this run, in this workflow's session, built on each access
+    @property
+    def image_generator(self) -> Agent:
+        return self._session_agent(get_image_generator())
+
+    @property
+    def video_generator(self) -> Agent:
+        return self._session_agent(get_video_generator())
+
+    @property
+    def nmkr_toolkit(self):
+        return get_nmkr_toolkit()
+
+    @property
+    def nft_minter(self) -> Agent:
+        return self._session_agent(get_nft_minter())
+
     # Store the input parameters as instance variables
     def __init__(self, debug_mode: bool = False, **kwargs):
         super().__init__(debug_mode=debug_mode)
@@ -100,17 +147,53 @@ class ContentToNFTWorkflow(Workflow):
         self.content_type = kwargs.get("content_type", "image")
         self.wallet_address = kwargs.get("wallet_address", "")
         self.display_name = kwargs.get("display_name", "Agno Test NFT")
+        # Batch mode: one NFT per item instead of the single prompt/wallet pair
+        self.items: List[BatchItem] = kwargs.get("items") or []
         self.project_name = kwargs.get("project_name", "Agno NFT Project")
         # Get project UID from environment with fallback to default
         self.project_uid = os.environ.get("NMKR_PROJECT_UID")
     
+    def _session_agent(self, agent: Agent) -> Agent:
+        """Attach an agent built for this run to this workflow's session"""
+        agent.session_id = self.session_id
+        return agent
+
+    def _progress(self, step: str, **data) -> RunResponse:
+        """Build a progress event for an intermediate workflow step"""
+        return RunResponse(run_id=self.run_id, event=PROGRESS_EVENT, content={"step": step, **data})
+
+    def _run_minter(self, mint_prompt: str) -> Generator[RunResponse, None, Optional[RunResponse]]:
+        """
+        Run the minting agent, yielding progress as its NMKR tool calls complete.
+
+        Returns the agent's response to this run.
+        """
+        minter = self.nft_minter
+        for event in minter.run(mint_prompt, stream=True, stream_intermediate_steps=True):
+            if event.event != RunEvent.tool_call_completed.value:
+                continue
+            for tool in event.tools or []:
+                step = MINT_TOOL_STEPS.get(tool.get("tool_name"))
+                if step:
+                    yield self._progress(step)
+        return minter.run_response
+
     def run(self) -> Iterator[RunResponse]:
         """
         Execute the content generation and NFT minting workflow
         
         Returns:
-            Iterator of RunResponse objects with results of each step
+            Iterator of RunResponse objects: progress events (event=PROGRESS_EVENT) for each
+            step, followed by the final result in Markdown format.
         """
+        # Both the direct pipeline and the agents upload to and mint from this project
+        if not self.project_uid:
+            raise NFTConfigurationError("NMKR_PROJECT_UID is not set; configure the NMKR project to mint into")
+
+        if self.items:
+            yield from self._run_batch()
+            return
+
         # Validate input data
         if not self.prompt:
             yield RunResponse(
@@ -126,10 +209,178 @@ class ContentToNFTWorkflow(Workflow):
             )
             return
             
+        if pipeline_mode() == "agent":
+            yield from self._run_agents()
+        else:
+            yield from self._run_direct()
+
+    def _run_direct(self) -> Iterator[RunResponse]:
+        """Generate the media, upload and mint it with direct API calls, without LLM round trips"""
+        token_name = unique_token_name()
+        description = f"AI-generated {self.content_type} NFT with the description: {self.prompt}"
+        step = "media_generation"
+        try:
+            logger.info(f"Generating {self.content_type} content from prompt: {self.prompt[:50]}...")
+            yield self._progress("media_generation_started", content_type=self.content_type)
+            media = generate_media(self.prompt, self.content_type)
+            logger.info(f"{self.content_type.capitalize()} generated successfully: {media.url[:50]}...")
+            yield self._progress("media_generated", content_url=media.url)
+
+            step = "nft_upload"
+            nft = upload_nft(self.nmkr_toolkit, self.project_uid, media, token_name,
+                             self.display_name, description)
+            yield self._progress("nft_uploaded", nft_uid=nft.nft_uid)
+
+            step = "mint"
+            logger.info(f"Minting NFT and sending to wallet: {self.wallet_address[:15]}...")
+            # Mints of a project are serialized across all jobs of this process
+            shared_mint_queue(self.project_uid).submit(
+                lambda: mint_nft(self.nmkr_toolkit, self.project_uid, nft, self.wallet_address)
+            ).result()
+            yield self._progress("mint_submitted", nft_uid=nft.nft_uid)
+
+        except NFTPipelineError as e:
+            logger.error(f"Direct NFT pipeline failed at {e.step}: {str(e)}")
+            # Nothing has been written to NMKR yet, so the agents can safely start over
+            if e.step == "media_generation" and os.getenv("NFT_AGENT_FALLBACK", "false").lower() == "true":
+                logger.info("Falling back to the LLM agents")
+                yield from self._run_agents()
+                return
+            # Raised rather than reported, so the job fails and its payment is not completed
+            raise NFTPipelineError(e.step, f"NFT creation failed at step '{e.step}': {str(e)}") from e
+        except Exception as e:
+            # Replicate, HTTP and NMKR client errors that the pipeline did not wrap
+            logger.error(f"Direct NFT pipeline failed at {step}: {str(e)}", exc_info=True)
+            raise NFTPipelineError(step, f"NFT creation failed at step '{step}': {str(e)}") from e
+
+        ipfs_line = f"\n- **IPFS Hash:** {nft.ipfs_hash}" if nft.ipfs_hash else ""
+        markdown_result = f"""### NFT Creation Status
+
+- **Overall Status:** success
+- **Content Type:** {self.content_type}
+- **Display Name:** {self.display_name}
+- **Target Wallet Address:** {self.wallet_address}
+- **Generated Content URL:** [View Content]({media.url})
+
+---
+#### NFT Details:
+- **Token Name:** {nft.token_name}
+- **NFT UID:** {nft.nft_uid}{ipfs_line}
+- **Mint:** submitted to NMKR, the NFT is sent to the wallet once the transaction confirms
+"""
+        yield RunResponse(run_id=self.run_id, content=markdown_result)
+
+    def _run_batch(self) -> Iterator[RunResponse]:
+        """
+        Mint one NFT per item with the direct pipeline.
+
+        Media generation runs concurrently under NFT_BATCH_GENERATION_CONCURRENCY, each upload
+        starts as soon as its media is ready (NFT_BATCH_UPLOAD_CONCURRENCY at a time), and mints
+        go through the project's serialized mint queue. Progress events carry the item index.
+        """
+        generation_concurrency = max(1, int(os.getenv("NFT_BATCH_GENERATION_CONCURRENCY", "4")))
+        upload_concurrency = max(1, int(os.getenv("NFT_BATCH_UPLOAD_CONCURRENCY", "2")))
+        generation_slots = threading.Semaphore(generation_concurrency)
+        upload_slots = threading.Semaphore(upload_concurrency)
+        mint_queue = shared_mint_queue(self.project_uid)
+        batch_name = unique_token_name()
+        events = queue.Queue()
+        results: List[Dict[str, Any]] = [{} for _ in self.items]
+
+        def process(index: int, item: BatchItem) -> None:
+            emit = lambda step, **data: events.put(self._progress(step, item=index, **data))
+            token_name = f"{batch_name}_{index + 1}"
+            description = f"AI-generated {self.content_type} NFT with the description: {item.prompt}"
+            step = "media_generation"
+            try:
+                with generation_slots:
+                    emit("media_generation_started", content_type=self.content_type)
+                    media = generate_media(item.prompt, self.content_type)
+                emit("media_generated", content_url=media.url)
+                results[index]["content_url"] = media.url
+
+                step = "nft_upload"
+                with upload_slots:
+                    nft = upload_nft(self.nmkr_toolkit, self.project_uid, media, token_name,
+                                     item.display_name, description)
+                emit("nft_uploaded", nft_uid=nft.nft_uid)
+                results[index].update(nft_uid=nft.nft_uid, token_name=token_name)
+
+                step = "mint"
+                mint_queue.submit(lambda: mint_nft(self.nmkr_toolkit, self.project_uid, nft, item.wallet_address)).result()
+                emit("mint_submitted", nft_uid=nft.nft_uid)
+                results[index]["status"] = "success"
+            except NFTPipelineError as e:
+                logger.error(f"Batch item {index} failed at {e.step}: {str(e)}")
+                results[index].update(status="failed", step=e.step, error=str(e))
+            except Exception as e:
+                logger.error(f"Batch item {index} failed at {step}: {str(e)}", exc_info=True)
+                results[index].update(status="failed", step=step, error=str(e))
+
+        logger.info(f"Minting a batch of {len(self.items)} NFTs")
+        yield self._progress("batch_started", items=len(self.items))
+
+        # Items waiting for the mint queue hold a thread, so there are enough threads to
+        # keep generation and uploads busy meanwhile
+        workers = min(len(self.items), generation_concurrency + upload_concurrency + 2)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="nft-batch") as pool:
+            futures = [pool.submit(process, index, item) for index, item in enumerate(self.items)]
+            for future in futures:
+                future.add_done_callback(lambda _: events.put(None))
+            finished = 0
+            while finished < len(futures):
+                event = events.get()
+                if event is None:
+                    finished += 1
+                else:
+                    yield event
+
+        succeeded = sum(1 for result in results if result.get("status") == "success")
+        failures = [(index, result) for index, result in enumerate(results) if result.get("status") != "success"]
+        yield self._progress("batch_finished", minted=succeeded, failed=len(failures))
+        if not succeeded:
+            # Nothing was minted, so the job fails and its payment is not completed
+            index, result = failures[0]
+            raise NFTPipelineError(
+                result.get("step", "media_generation"),
+                f"None of the {len(self.items)} NFTs of the batch was minted; "
+                f"item {index + 1} failed at step '{result.get('step')}': {result.get('error', '')}"
+            )
+
+        rows = []
+        for index, (item, result) in enumerate(zip(self.items, results)):
+            status = result.get("status", "failed")
+            if status == "failed":
+                status = f"failed at {result.get('step')}: {result.get('error', '')[:120]}"
+            content = f"[View]({result['content_url']})" if result.get("content_url") else "-"
+            rows.append(f"| {index + 1} | {item.display_name} | {item.wallet_address[:20]}... | {status} | "
+                        f"{result.get('nft_uid', '-')} | {content} |")
+
+        failed_summary = ""
+        if failures:
+            failed_items = ", ".join(str(index + 1) for index, _ in failures)
+            failed_summary = (f"- **Failed:** {len(failures)} of {len(self.items)} (items {failed_items}); "
+                              f"these were not minted and can be submitted again in a new job\n")
+
+        markdown_result = f"""### NFT Batch Status
+
+- **Overall Status:** {"partial" if failures else "success"}
+- **Content Type:** {self.content_type}
+- **Minted:** {succeeded} of {len(self.items)}
+{failed_summary}
+| # | Display Name | Wallet | Status | NFT UID | Content |
+|---|---|---|---|---|---|
+""" + "\n".join(rows) + "\n"
+        yield RunResponse(run_id=self.run_id, content=markdown_result)
+
+    def _run_agents(self) -> Iterator[RunResponse]:
+        """Generate the media and mint it through the LLM agents and their tools"""
         # Generate content based on type
         logger.info(f"Generating {self.content_type} content from prompt: {self.prompt[:50]}...")
         
         try:
+            yield self._progress("media_generation_started", content_type=self.content_type)
+
             if self.content_type == "image":
                 # Generate image
                 generation_prompt = f"Generate a high-quality image for an NFT with the following description: {self.prompt}"
@@ -144,26 +395,18 @@ class ContentToNFTWorkflow(Workflow):
                 mime_type = "video/mp4"
             
             if not content_response or not content_response.content:
-                yield RunResponse(
-                    run_id=self.run_id, 
-                    content=f"Failed to generate {self.content_type} content."
-                )
-                return
+                raise NFTPipelineError("media_generation", f"Failed to generate {self.content_type} content.")
                 
             # Extract just the URL from the content response
             content_url = self._extract_url(content_response.content)
             if not content_url:
-                yield RunResponse(
-                    run_id=self.run_id, 
-                    content=f"Failed to extract URL from content generation response."
-                )
-                return
+                raise NFTPipelineError("media_generation", "Failed to extract URL from content generation response.")
                 
             logger.info(f"{content_type_display} generated successfully: {content_url[:50]}...")
+            yield self._progress("media_generated", content_url=content_url)
             
             # Create NFT metadata
-            timestamp = int(time.time())
-            nft_name = f"AGNO_{timestamp}"
+            nft_name = unique_token_name()
             
             # Mint NFT with the generated content - use the working approach
             mint_prompt = f"""
@@ -179,14 +422,10 @@ class ContentToNFTWorkflow(Workflow):
             """
             
             logger.info(f"Minting NFT and sending to wallet: {self.wallet_address[:15]}...")
-            mint_response = self.nft_minter.run(mint_prompt)
+            mint_response = yield from self._run_minter(mint_prompt)
             
             if not mint_response or not mint_response.content:
-                yield RunResponse(
-                    run_id=self.run_id, 
-                    content=f"Failed to mint NFT with the generated {self.content_type}."
-                )
-                return
+                raise NFTPipelineError("mint", f"Failed to mint NFT with the generated {self.content_type}.")
                 
             # Return successful result with all details
             result = {
@@ -214,11 +453,9 @@ class ContentToNFTWorkflow(Workflow):
             yield RunResponse(run_id=self.run_id, content=markdown_result)
             
         except Exception as e:
+            # Failures are raised, so the job fails and its payment is not completed
             logger.error(f"Error in ContentToNFTWorkflow: {str(e)}")
-            yield RunResponse(
-                run_id=self.run_id, 
-                content=f"Error: Failed to complete the NFT creation process. {str(e)}"
-            )
+            raise
     
     def _extract_url(self, content: str) -> Optional[str]:
         """Extract a URL from content text that might contain markdown or other formatting"""
@@ -243,7 +480,7 @@ class ContentToNFTWorkflow(Workflow):
 
 # Function to run the workflow with specified parameters
 def run_workflow(prompt: str, content_type: str, wallet_address: str, 
-                display_name: str = "Agno Test NFT") -> Iterator[RunResponse]:
+                display_name: str = "Agno Test NFT", items: Optional[List[BatchItem]] = None) -> Iterator[RunResponse]:
     """
     Run the ContentToNFTWorkflow with the given parameters.
     
@@ -252,6 +489,7 @@ def run_workflow(prompt: str, content_type: str, wallet_address: str,
         content_type: "image" or "video"
         wallet_address: Cardano wallet address to receive the NFT
         display_name: Display name for the NFT (defaults to "Agno Test NFT")
+        items: Batch of prompt, wallet address and display name items; replaces the single NFT
         
     Returns:
         Iterator of RunResponse objects
@@ -261,11 +499,44 @@ def run_workflow(prompt: str, content_type: str, wallet_address: str,
         prompt=prompt,
         content_type=content_type,
         wallet_address=wallet_address,
-        display_name=display_name
+        display_name=display_name,
+        items=items
     )
     return workflow.run()
 
 
+def run_workflow_to_completion(prompt: str, content_type: str, wallet_address: str,
+                               display_name: str = "Agno Test NFT", items: Optional[List[BatchItem]] = None,
+                               progress=None) -> Optional[RunResponse]:
+    """
+    Run the workflow synchronously and return only its final response.
+
+    Progress events are forwarded to progress.put() as they are produced
+    instead of being collected. This is the entry point used by the job
+    executor, so it must stay a module-level function that can be pickled
+    for process pools.
+    """
+    final_response = None
+    for response in run_workflow(
+        prompt=prompt,
+        content_type=content_type,
+        wallet_address=wallet_address,
+        display_name=display_name,
+        items=items
+    ):
+        if response.event == PROGRESS_EVENT:
+            if progress is not None:
+                progress.put(response.content)
+        else:
+            final_response = response
+    return final_response
+
+
+def workflow_metrics() -> Dict[str, Any]:
+    """Mint queue, NMKR client and NMKR cache metrics of this process, reported under /metrics"""
+    return {"mint_queues": mint_queue_metrics(), "nmkr_http": nmkr_client_metrics(), "nmkr_cache": nmkr_cache_metrics()}
+
+
 # Updated execute_agno_task function to use our workflow
 async def execute_agno_task(input_data: Dict[str, str]) -> Dict[str, Any]:
     """Execute the AI content-to-NFT workflow with the provided input data"""
@@ -277,16 +548,13 @@ async def execute_agno_task(input_data: Dict[str, str]) -> Dict[str, Any]:
     wallet_address = input_data.get("wallet_address", "")
     display_name = input_data.get("display_name", "Agno Test NFT")
     
-    # Run the workflow with the parameters
-    responses = list(run_workflow(
+    # Run the workflow with the parameters and keep only the final response
+    final_response = run_workflow_to_completion(
         prompt=prompt,
         content_type=content_type,
         wallet_address=wallet_address,
         display_name=display_name
-    ))
-    
-    # Get the final response
-    final_response = responses[-1] if responses else None
+    )
     
     if final_response and final_response.content:
         # Return the content as markdown
@@ -295,22 +563,25 @@ async def execute_agno_task(input_data: Dict[str, str]) -> Dict[str, Any]:
         return {"error": "No response from workflow"}
 
 
-# Agent definition for API integration
-nft_agent = Agent(
-    name="Content to NFT Agent",
-    model=OpenAIChat(id="gpt-4o"),
-    description="An agent that generates AI content and mints it as an NFT on Cardano",
-    instructions=[
-        "You use AI to generate images or videos and mint them as NFTs on the Cardano blockchain.",
-        "You'll generate content based on a text description, then mint it as an NFT.",
-        "The NFT will be sent to the user's provided wallet address.",
-        f"All operations are performed in the {os.environ.get('NMKR_ENVIRONMENT')} environment.",
-        "Provide clear status updates and transaction details throughout the process.",
-    ],
-    markdown=True,
-    debug_mode=True,
-    show_tool_calls=True,
-)
+# Agent definition for API integration, built on first use
+@lru_cache(maxsize=None)
+def get_nft_agent() -> Agent:
+    from agno.models.openai import OpenAIChat
+    return Agent(
+        name="Content to NFT Agent",
+        model=OpenAIChat(id="gpt-4o"),
+        description="An agent that generates AI content and mints it as an NFT on Cardano",
+        instructions=[
+            "You use AI to generate images or videos and mint them as NFTs on the Cardano blockchain.",
+            "You'll generate content based on a text description, then mint it as an NFT.",
+            "The NFT will be sent to the user's provided wallet address.",
+            f"All operations are performed in the {os.environ.get('NMKR_ENVIRONMENT')} environment.",
+            "Provide clear status updates and transaction details throughout the process.",
+        ],
+        markdown=True,
+        debug_mode=True,
+        show_tool_calls=True,
+    )
 
 
 if __name__ == "__main__":
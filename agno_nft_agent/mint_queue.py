@@ -0,0 +1,82 @@
+"""
+Serialized, rate-limited mint queues, one per NMKR project.
+
+NMKR reserves and mints a project's NFTs one transaction at a time and rate
+limits its API, so concurrent mints of the same project only collide. Every
+mint of a project in this process goes through one FIFO queue that is worked
+off by a single thread, at most one call per interval.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class MintQueue:
+    """ Runs submitted calls one after another, in submission order, spaced by min_interval seconds """
+
+    def __init__(self, project_uid: str, min_interval: float = 1.0):
+        self.project_uid = project_uid
+        self.min_interval = min_interval
+        self._queue: "queue.Queue[Tuple[Callable[[], Any], Future]]" = queue.Queue()
+        self._last_call = 0.0
+        self.completed = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._work, name=f"mint-{project_uid[:8]}", daemon=True)
+        self._thread.start()
+
+    def submit(self, call: Callable[[], Any]) -> Future:
+        """ Queues call; the returned future holds its result or exception """
+        future: Future = Future()
+        self._queue.put((call, future))
+        return future
+
+    def _work(self) -> None:
+        while True:
+            call, future = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            wait = self._last_call + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_call = time.monotonic()
+            try:
+                future.set_result(call())
+                self.completed += 1
+            except BaseException as e:
+                self.failed += 1
+                future.set_exception(e)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"pending": self._queue.qsize(), "completed": self.completed, "failed": self.failed}
+
+
+_queues: Dict[Tuple[int, str], MintQueue] = {}
+_lock = threading.Lock()
+
+
+def shared_mint_queue(project_uid: str) -> MintQueue:
+    """ Returns the process-wide queue of project_uid, spaced by NMKR_MINT_INTERVAL seconds """
+    if not project_uid:
+        raise ValueError("A mint queue needs an NMKR project UID")
+    # The worker thread does not survive a fork, so each process has its own queues
+    key = (os.getpid(), project_uid)
+    with _lock:
+        mint_queue = _queues.get(key)
+        if mint_queue is None:
+            mint_queue = MintQueue(project_uid, min_interval=float(os.getenv("NMKR_MINT_INTERVAL", "1")))
+            _queues[key] = mint_queue
+        return mint_queue
+
+
+def mint_queue_metrics() -> Dict[str, Any]:
+    """ Metrics of this process's queues by project """
+    pid = os.getpid()
+    with _lock:
+        return {project_uid: q.metrics() for (owner, project_uid), q in _queues.items() if owner == pid}
@@ -0,0 +1,225 @@
+"""
+Direct NFT pipeline: Replicate media generation, NMKR upload and mint.
+
+The steps of a mint never change, so they are called programmatically with
+typed inputs and outputs instead of through LLM tool calls. The CIP-25
+metadata is built in code. The LLM agents of the workflow remain available
+as a fallback (NFT_PIPELINE=agent).
+"""
+import json
+import mimetypes
+import os
+import uuid
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from pydantic import BaseModel
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Replicate models used for each content type
+MEDIA_MODELS = {
+    "image": "luma/photon-flash",
+    "video": "kwaivgi/kling-v1.6-standard",
+}
+DEFAULT_MIME_TYPES = {"image": "image/jpeg", "video": "video/mp4"}
+
+# Strings in Cardano transaction metadata are limited to 64 bytes
+METADATA_STRING_BYTES = 64
+
+
+class GeneratedMedia(BaseModel):
+    content_type: str
+    url: str
+    mime_type: str
+
+
+class UploadedNFT(BaseModel):
+    nft_uid: str
+    nft_id: Optional[int] = None
+    token_name: str
+    ipfs_hash: Optional[str] = None
+    asset_id: Optional[str] = None
+
+
+class MintedNFT(BaseModel):
+    nft: UploadedNFT
+    receiver_address: str
+    response: Dict[str, Any]
+
+
+class BatchItem(BaseModel):
+    prompt: str
+    wallet_address: str
+    display_name: str = "Agno Test NFT"
+
+
+class NFTPipelineError(Exception):
+    """ A pipeline step failed; step names it for the report """
+
+    def __init__(self, step: str, message: str):
+        super().__init__(message)
+        self.step = step
+
+
+class NFTConfigurationError(Exception):
+    """ The agent is not configured to mint, e.g. NMKR_PROJECT_UID is missing """
+
+
+def is_cardano_address(address: str) -> bool:
+    return address.startswith(("addr_", "addr1", "stake_", "stake1"))
+
+
+def unique_token_name() -> str:
+    """
+    A token name no other job uses.
+
+    NMKR rejects a token name that already exists in the project, and names built
+    from timestamps collide between jobs started in the same second.
+    """
+    return f"AGNO_{uuid.uuid4().hex[:16]}"
+
+
+def batch_item_limit() -> int:
+    """
+    Most items one job may mint.
+
+    A job is paid with the agent's single registered price, whatever its size, so
+    a batch may not hold more than NFT_ITEMS_PER_PAYMENT items (default 100; the
+    price must cover that many). NFT_BATCH_MAX_ITEMS is the hard upper bound.
+    """
+    per_payment = int(os.getenv("NFT_ITEMS_PER_PAYMENT", "100"))
+    return max(1, min(per_payment, int(os.getenv("NFT_BATCH_MAX_ITEMS", "500"))))
+
+
+def parse_batch_items(value: Any) -> List[BatchItem]:
+    """
+    Parses a batch: a list, or its JSON text, of {prompt, wallet_address, display_name} objects.
+
+    Raises ValueError for malformed items or more of them than one payment covers.
+    """
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError as e:
+            raise ValueError(f"items must be a JSON list: {e}")
+    if not isinstance(value, list) or not value:
+        raise ValueError("items must be a non-empty list")
+    max_items = batch_item_limit()
+    if len(value) > max_items:
+        raise ValueError(f"items may hold at most {max_items} entries per paid job, got {len(value)}")
+
+    items = [BatchItem(**item) if isinstance(item, dict) else None for item in value]
+    for index, item in enumerate(items):
+        if item is None or not item.prompt:
+            raise ValueError(f"items[{index}] needs a prompt")
+        if not is_cardano_address(item.wallet_address):
+            raise ValueError(f"items[{index}].wallet_address must be a valid Cardano address")
+    return items
+
+
+def pipeline_mode() -> str:
+    """ "direct" (default) or "agent", from NFT_PIPELINE """
+    return os.getenv("NFT_PIPELINE", "direct").lower()
+
+
+def _output_url(output: Any) -> Optional[str]:
+    """ URL of a Replicate output: a FileOutput, a URL string or a list of either """
+    if isinstance(output, (list, tuple)):
+        output = output[0] if output else None
+    url = getattr(output, "url", output)
+    return str(url) if url else None
+
+
+def generate_media(prompt: str, content_type: str = "image") -> GeneratedMedia:
+    """ Runs the Replicate model of content_type on prompt and returns the generated file """
+    import replicate
+
+    model = MEDIA_MODELS.get(content_type)
+    if model is None:
+        raise NFTPipelineError("media_generation", f"Unsupported content type '{content_type}'")
+    try:
+        output = replicate.run(model, input={"prompt": prompt})
+    except Exception as e:
+        raise NFTPipelineError("media_generation", f"Replicate {model} failed: {e}")
+
+    url = _output_url(output)
+    if not url or not url.startswith(("http://", "https://")):
+        raise NFTPipelineError("media_generation", f"Replicate {model} returned no file URL")
+    mime_type = mimetypes.guess_type(urlparse(url).path)[0] or DEFAULT_MIME_TYPES[content_type]
+    return GeneratedMedia(content_type=content_type, url=url, mime_type=mime_type)
+
+
+def _metadata_string(text: str) -> Any:
+    """ text, or a list of chunks of at most 64 bytes for longer text (CIP-25) """
+    data = text.encode("utf-8")
+    if len(data) <= METADATA_STRING_BYTES:
+        return text
+    chunks: List[str] = []
+    while data:
+        cut = METADATA_STRING_BYTES
+        # Do not split a multi-byte character
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        chunks.append(data[:cut].decode("utf-8"))
+        data = data[cut:]
+    return chunks
+
+
+def cip25_metadata(token_name: str, display_name: str, description: str, mime_type: str) -> Dict[str, Any]:
+    """
+    CIP-25 (721) metadata of one NFT.
+
+    NMKR fills in the <policy_id>, <ipfs_link> and <mime_type> placeholders when it mints.
+    """
+    return {
+        "721": {
+            "<policy_id>": {
+                token_name: {
+                    "name": display_name,
+                    "image": "<ipfs_link>",
+                    "mediaType": "<mime_type>",
+                    "description": _metadata_string(description),
+                    "files": [{"name": display_name, "mediaType": mime_type, "src": "<ipfs_link>"}],
+                }
+            },
+            "version": "1.0",
+        }
+    }
+
+
+def _check(result: Dict[str, Any], step: str) -> Dict[str, Any]:
+    if not isinstance(result, dict) or result.get("status") == "error":
+        message = result.get("message", "Unknown error") if isinstance(result, dict) else str(result)
+        raise NFTPipelineError(step, message)
+    return result
+
+
+def upload_nft(toolkit, project_uid: str, media: GeneratedMedia, token_name: str,
+               display_name: str, description: str) -> UploadedNFT:
+    """ Uploads media with its CIP-25 metadata to the NMKR project """
+    data = {
+        "tokenname": token_name,
+        "displayname": display_name,
+        "description": description,
+        "previewImageNft": {"mimetype": media.mime_type, "fileFromsUrl": media.url},
+        "metadataOverride": json.dumps(cip25_metadata(token_name, display_name, description, media.mime_type)),
+    }
+    result = _check(toolkit.upload_nft(project_uid, data), "nft_upload")
+    nft_uid = result.get("nftUid")
+    if not nft_uid:
+        raise NFTPipelineError("nft_upload", f"NMKR returned no nftUid: {result}")
+    return UploadedNFT(
+        nft_uid=nft_uid,
+        nft_id=result.get("nftId"),
+        token_name=token_name,
+        ipfs_hash=result.get("ipfsHashMainnft"),
+        asset_id=result.get("assetId"),
+    )
+
+
+def mint_nft(toolkit, project_uid: str, nft: UploadedNFT, receiver_address: str) -> MintedNFT:
+    """ Mints one token of an uploaded NFT and sends it to receiver_address """
+    result = _check(toolkit.mint_and_send(project_uid, nft.nft_uid, 1, receiver_address), "mint")
+    return MintedNFT(nft=nft, receiver_address=receiver_address, response=result)
@@ -0,0 +1,114 @@
+import pytest
+
+import agent_definition
+from agent_definition import run_workflow_to_completion
+from nft_pipeline import BatchItem, GeneratedMedia, MintedNFT, NFTPipelineError, UploadedNFT
+
+ADDRESS = "addr_test1qexample"
+MEDIA = GeneratedMedia(content_type="image", url="https://example.com/cat.jpg", mime_type="image/jpeg")
+
+
+@pytest.fixture(autouse=True)
+def direct_pipeline(monkeypatch):
+    monkeypatch.setenv("NMKR_PROJECT_UID", "project")
+    monkeypatch.setenv("NMKR_MINT_INTERVAL", "0")
+    monkeypatch.setenv("NFT_PIPELINE", "direct")
+    monkeypatch.delenv("NFT_AGENT_FALLBACK", raising=False)
+    monkeypatch.setattr(agent_definition, "get_nmkr_toolkit", lambda: None)
+    monkeypatch.setattr(agent_definition, "generate_media", lambda prompt, content_type: MEDIA)
+    monkeypatch.setattr(agent_definition, "upload_nft", lambda toolkit, project_uid, media, token_name, *args:
+                        UploadedNFT(nft_uid="nft-1", token_name=token_name))
+    monkeypatch.setattr(agent_definition, "mint_nft", lambda toolkit, project_uid, nft, address:
+                        MintedNFT(nft=nft, receiver_address=address, response={}))
+
+
+def run(progress=None, items=None):
+    return run_workflow_to_completion(prompt="a cat", content_type="image", wallet_address=ADDRESS,
+                                      items=items, progress=progress)
+
+
+def batch(*prompts):
+    return [BatchItem(prompt=prompt, wallet_address=ADDRESS) for prompt in prompts]
+
+
+class Progress(list):
+    def put(self, event):
+        self.append(event["step"])
+
+
+def test_a_minted_nft_is_reported_with_its_progress():
+    progress = Progress()
+
+    response = run(progress)
+
+    assert "**NFT UID:** nft-1" in response.content
+    assert progress == ["media_generation_started", "media_generated", "nft_uploaded", "mint_submitted"]
+
+
+def test_a_failed_step_raises_instead_of_returning_an_error_report(monkeypatch):
+    def upload_nft(*args):
+        raise NFTPipelineError("nft_upload", "API Error: 400")
+
+    monkeypatch.setattr(agent_definition, "upload_nft", upload_nft)
+
+    with pytest.raises(NFTPipelineError, match="nft_upload") as raised:
+        run()
+
+    assert raised.value.step == "nft_upload"
+
+
+def test_unexpected_errors_raise_with_the_step_they_happened_in(monkeypatch):
+    def mint_nft(*args):
+        raise ConnectionError("connection reset")
+
+    monkeypatch.setattr(agent_definition, "mint_nft", mint_nft)
+
+    with pytest.raises(NFTPipelineError, match="connection reset") as raised:
+        run()
+
+    assert raised.value.step == "mint"
+
+
+def test_a_batch_with_failed_items_reports_them_as_partial(monkeypatch):
+    def generate_media(prompt, content_type):
+        if prompt == "broken":
+            raise NFTPipelineError("media_generation", "model error")
+        return MEDIA
+
+    monkeypatch.setattr(agent_definition, "generate_media", generate_media)
+
+    response = run(items=batch("a cat", "broken", "a dog"))
+
+    assert "**Overall Status:** partial" in response.content
+    assert "**Minted:** 2 of 3" in response.content
+    assert "**Failed:** 1 of 3 (items 2)" in response.content
+    assert "failed at media_generation: model error" in response.content
+
+
+def test_a_batch_without_any_minted_item_fails(monkeypatch):
+    def mint_nft(*args):
+        raise NFTPipelineError("mint", "Insufficient funds")
+
+    monkeypatch.setattr(agent_definition, "mint_nft", mint_nft)
+
+    with pytest.raises(NFTPipelineError, match="None of the 2 NFTs") as raised:
+        run(items=batch("a cat", "a dog"))
+
+    assert raised.value.step == "mint"
+
+
+def test_token_names_are_unique_across_runs_and_batch_items(monkeypatch):
+    names = []
+
+    def upload_nft(toolkit, project_uid, media, token_name, *args):
+        names.append(token_name)
+        return UploadedNFT(nft_uid=token_name, token_name=token_name)
+
+    monkeypatch.setattr(agent_definition, "upload_nft", upload_nft)
+
+    run()
+    run()
+    run(items=batch("a cat", "a dog"))
+
+    assert len(set(names)) == 4
+    assert all(name.startswith("AGNO_") and len(name.encode()) <= 32 for name in names)
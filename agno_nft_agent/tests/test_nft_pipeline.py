@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from nft_pipeline import (GeneratedMedia, NFTPipelineError, batch_item_limit, mint_nft, parse_batch_items,
+                          upload_nft)
+
+ADDRESS = "addr_test1qexample"
+
+
+def items(count):
+    return [{"prompt": f"prompt {index}", "wallet_address": ADDRESS} for index in range(count)]
+
+
+def test_one_payment_covers_a_drop_of_100_items_by_default(monkeypatch):
+    monkeypatch.delenv("NFT_ITEMS_PER_PAYMENT", raising=False)
+    monkeypatch.delenv("NFT_BATCH_MAX_ITEMS", raising=False)
+
+    assert batch_item_limit() == 100
+    assert len(parse_batch_items(items(100))) == 100
+    with pytest.raises(ValueError, match="at most 100"):
+        parse_batch_items(items(101))
+
+
+def test_single_nft_pricing_limits_batches_to_one_item(monkeypatch):
+    monkeypatch.setenv("NFT_ITEMS_PER_PAYMENT", "1")
+
+    assert len(parse_batch_items(items(1))) == 1
+    with pytest.raises(ValueError, match="at most 1"):
+        parse_batch_items(items(2))
+
+
+def test_items_per_payment_is_capped_by_the_batch_maximum(monkeypatch):
+    monkeypatch.setenv("NFT_ITEMS_PER_PAYMENT", "10")
+    monkeypatch.setenv("NFT_BATCH_MAX_ITEMS", "3")
+
+    assert batch_item_limit() == 3
+    assert len(parse_batch_items(json.dumps(items(3)))) == 3
+    with pytest.raises(ValueError):
+        parse_batch_items(items(4))
+
+
+@pytest.mark.parametrize("value, message", [
+    ("not json", "JSON list"),
+    ([], "non-empty list"),
+    (["prompt"], r"items\[0\] needs a prompt"),
+    ([{"prompt": "", "wallet_address": ADDRESS}], r"items\[0\] needs a prompt"),
+    ([{"prompt": "a cat", "wallet_address": "0xabc"}], "valid Cardano address"),
+])
+def test_malformed_batches_are_rejected(value, message):
+    with pytest.raises(ValueError, match=message):
+        parse_batch_items(value)
+
+
+class FakeToolkit:
+    def __init__(self, upload_result, mint_result=None):
+        self.upload_result = upload_result
+        self.mint_result = mint_result
+        self.uploads = []
+        self.mints = []
+
+    def upload_nft(self, project_uid, data):
+        self.uploads.append((project_uid, data))
+        return self.upload_result
+
+    def mint_and_send(self, project_uid, nft_uid, count, receiver_address):
+        self.mints.append((project_uid, nft_uid, count, receiver_address))
+        return self.mint_result
+
+
+MEDIA = GeneratedMedia(content_type="image", url="https://example.com/cat.jpg", mime_type="image/jpeg")
+
+
+def test_upload_and_mint_report_what_nmkr_returned():
+    toolkit = FakeToolkit({"nftUid": "nft-1", "nftId": 7, "ipfsHashMainnft": "Qm"}, {"mintAndSendId": 1})
+
+    nft = upload_nft(toolkit, "project", MEDIA, "cat1", "Cat", "A cat")
+    minted = mint_nft(toolkit, "project", nft, ADDRESS)
+
+    assert (nft.nft_uid, nft.nft_id, nft.ipfs_hash) == ("nft-1", 7, "Qm")
+    assert json.loads(toolkit.uploads[0][1]["metadataOverride"])
+    assert toolkit.mints == [("project", "nft-1", 1, ADDRESS)]
+    assert minted.response == {"mintAndSendId": 1}
+
+
+@pytest.mark.parametrize("upload_result", [
+    {"status": "error", "message": "API Error: 400"},
+    {"status": "success"},
+])
+def test_a_failed_upload_names_its_step(upload_result):
+    with pytest.raises(NFTPipelineError) as raised:
+        upload_nft(FakeToolkit(upload_result), "project", MEDIA, "cat1", "Cat", "A cat")
+
+    assert raised.value.step == "nft_upload"
+
+
+def test_a_failed_mint_names_its_step():
+    toolkit = FakeToolkit({"nftUid": "nft-1"}, {"status": "error", "message": "Insufficient funds"})
+    nft = upload_nft(toolkit, "project", MEDIA, "cat1", "Cat", "A cat")
+
+    with pytest.raises(NFTPipelineError, match="Insufficient funds") as raised:
+        mint_nft(toolkit, "project", nft, ADDRESS)
+
+    assert raised.value.step == "mint"
@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+import pytest
+
+from tools import nmkr_cache
+from tools.nmkr_cache import GLOBAL_SCOPE, NMKRReadCache
+from tools.nmkr_toolkit import AsyncNMKRToolkit
+
+TTLS = {"project_details": 300, "list_projects": 120, "payment_address": 0}
+
+
+class FakeClient:
+    """ Answers every request with the next version of a project, counting the calls """
+
+    def __init__(self):
+        self.calls = []
+
+    async def request(self, endpoint, method="GET", params=None, data=None, files=None, idempotent=None):
+        self.calls.append(endpoint)
+        if "MintAndSendSpecific" in endpoint:
+            return {"mintAndSendId": 1}
+        return {"uid": "project", "version": len(self.calls)}
+
+
+@pytest.fixture
+def toolkit():
+    toolkit = AsyncNMKRToolkit(api_key="test-key", environment="preprod", base_url="http://nmkr.invalid")
+    toolkit.client = FakeClient()
+    toolkit.cache = NMKRReadCache(TTLS)
+    return toolkit
+
+
+def test_fresh_entries_are_served_until_they_expire(monkeypatch):
+    cache = NMKRReadCache(TTLS)
+    cache.put("project_details", "project", (), {"uid": "project"}, cache.generation("project"))
+
+    assert cache.get("project_details", "project", ()) == {"uid": "project"}
+    assert cache.get("project_details", "project", ("other",)) is None
+
+    later = nmkr_cache.time.monotonic() + 301
+    monkeypatch.setattr(nmkr_cache.time, "monotonic", lambda: later)
+    assert cache.get("project_details", "project", ()) is None
+    assert cache.metrics()["project_details"] == {"hits": 1, "misses": 2, "hit_rate": 0.333}
+
+
+def test_a_read_that_started_before_a_write_is_not_stored():
+    cache = NMKRReadCache(TTLS)
+    generation = cache.generation("project")
+    cache.invalidate("project")
+
+    cache.put("project_details", "project", (), {"uid": "stale"}, generation)
+
+    assert cache.get("project_details", "project", ()) is None
+
+
+def test_writes_drop_the_project_and_list_entries_only():
+    cache = NMKRReadCache(TTLS)
+    cache.put("project_details", "project", (), "project", cache.generation("project"))
+    cache.put("project_details", "other", (), "other", cache.generation("other"))
+    cache.put("list_projects", GLOBAL_SCOPE, (100, 1), ["project"], cache.generation(GLOBAL_SCOPE))
+
+    cache.invalidate("project")
+
+    assert cache.get("project_details", "project", ()) is None
+    assert cache.get("list_projects", GLOBAL_SCOPE, (100, 1)) is None
+    assert cache.get("project_details", "other", ()) == "other"
+
+
+def test_disabled_endpoints_are_not_cached():
+    assert not NMKRReadCache(TTLS).enabled("payment_address")
+    assert NMKRReadCache(TTLS).enabled("project_details")
+
+
+def test_project_details_are_read_through_the_cache_until_a_mint(toolkit):
+    async def main():
+        first = await toolkit.get_project_details("project")
+        second = await toolkit.get_project_details("project")
+        await toolkit.mint_and_send("project", "nft", 1, "addr_test1")
+        third = await toolkit.get_project_details("project")
+        return [json.loads(details)["version"] for details in (first, second, third)]
+
+    assert asyncio.run(main()) == [1, 1, 3]
+    assert toolkit.client.calls.count("/v2/ProjectDetails/project") == 2
+
+
+def test_errors_are_not_cached(toolkit):
+    async def failing(endpoint, **kwargs):
+        toolkit.client.calls.append(endpoint)
+        return {"status": "error", "message": "unavailable"}
+
+    toolkit.client.request = failing
+
+    async def main():
+        await toolkit.get_project_details("project")
+        await toolkit.get_project_details("project")
+
+    asyncio.run(main())
+
+    assert len(toolkit.client.calls) == 2
@@ -0,0 +1,116 @@
+import asyncio
+import email.utils
+import time
+
+import httpx
+import pytest
+
+from tools import nmkr_client
+from tools.nmkr_client import NMKRClient, _retry_after
+
+
+class FakeNMKR:
+    """ Answers requests with the queued responses in turn, recording each request """
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def delays(monkeypatch):
+    """ Records the retry delays instead of sleeping them """
+    slept = []
+
+    async def sleep(seconds):
+        slept.append(seconds)
+
+    monkeypatch.setattr(nmkr_client.asyncio, "sleep", sleep)
+    return slept
+
+
+def client_for(nmkr, **kwargs):
+    client = NMKRClient("test-key", "http://nmkr.invalid", "preprod", loop=None, backoff_base=0.01, **kwargs)
+    client._http = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(nmkr))
+    return client
+
+
+def request(client, *args, **kwargs):
+    return asyncio.run(client._request(*args, **kwargs))
+
+
+def test_reads_are_retried_on_transient_statuses(delays):
+    nmkr = FakeNMKR(httpx.Response(503), httpx.Response(502), httpx.Response(200, json={"uid": "project"}))
+    client = client_for(nmkr)
+
+    result = request(client, "/v2/GetProjectDetails/project", "GET", None, None, None, None)
+
+    assert result == {"uid": "project"}
+    assert len(nmkr.requests) == 3
+    assert len(delays) == 2
+    assert client.metrics() == {"requests": 3, "retries": 2, "errors": 0}
+
+
+def test_retries_wait_at_least_the_retry_after(delays):
+    nmkr = FakeNMKR(httpx.Response(429, headers={"Retry-After": "7"}), httpx.Response(200, json={}))
+    client = client_for(nmkr)
+
+    request(client, "/v2/ListProjects", "GET", None, None, None, None)
+
+    assert delays[0] >= 7
+
+
+def test_retry_after_is_capped(delays):
+    nmkr = FakeNMKR(httpx.Response(429, headers={"Retry-After": "3600"}), httpx.Response(200, json={}))
+    client = client_for(nmkr, max_retry_after=60)
+
+    request(client, "/v2/ListProjects", "GET", None, None, None, None)
+
+    assert delays == [60]
+
+
+def test_mints_are_never_retried(delays):
+    nmkr = FakeNMKR(httpx.Response(503), httpx.Response(200, json={}))
+    client = client_for(nmkr)
+
+    result = request(client, "/v2/MintAndSendSpecific/project", "POST", None, {"count": 1}, None, None)
+
+    assert result["status"] == "error"
+    assert result["details"]["status_code"] == 503
+    assert len(nmkr.requests) == 1
+    assert delays == []
+
+
+def test_posts_marked_idempotent_are_retried(delays):
+    nmkr = FakeNMKR(httpx.ConnectError("refused"), httpx.Response(200, json={"ok": True}))
+    client = client_for(nmkr)
+
+    assert request(client, "/v2/CheckAddress", "POST", None, {}, None, True) == {"ok": True}
+    assert len(nmkr.requests) == 2
+
+
+def test_the_last_failure_is_returned_as_an_error(delays):
+    nmkr = FakeNMKR(*(httpx.ConnectError("refused") for _ in range(3)))
+    client = client_for(nmkr, max_retries=2)
+
+    result = request(client, "/v2/ListProjects", "GET", None, None, None, None)
+
+    assert result["status"] == "error"
+    assert "refused" in result["details"]["exception"]
+    assert client.metrics() == {"requests": 3, "retries": 2, "errors": 1}
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    in_ten_seconds = email.utils.formatdate(time.time() + 10, usegmt=True)
+
+    assert _retry_after(httpx.Response(429, headers={"Retry-After": "5"})) == 5
+    assert 8 <= _retry_after(httpx.Response(429, headers={"Retry-After": in_ten_seconds})) <= 10
+    assert _retry_after(httpx.Response(429, headers={"Retry-After": "soon"})) is None
+    assert _retry_after(httpx.Response(429)) is None
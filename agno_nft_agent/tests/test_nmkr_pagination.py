@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from tools.nmkr_models import NMKRRequestError, NMKRToken
+from tools.nmkr_toolkit import AsyncNMKRToolkit
+
+
+@pytest.fixture
+def toolkit():
+    return AsyncNMKRToolkit(api_key="test-key", environment="preprod", base_url="http://nmkr.invalid")
+
+
+class FakeEndpoint:
+    """ A paginated endpoint serving pages from a dict, recording what was fetched """
+
+    def __init__(self, pages, delays=None):
+        self.pages = pages
+        self.delays = delays or {}
+        self.requested = []
+        self.completed = []
+        self.active = 0
+        self.max_active = 0
+
+    async def fetch_page(self, page):
+        self.requested.append(page)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delays.get(page, 0.01))
+            self.completed.append(page)
+            return self.pages.get(page, [])
+        finally:
+            self.active -= 1
+
+
+def collect(toolkit, endpoint, page_size, window):
+    async def main():
+        return [page async for page in toolkit._iter_pages(endpoint.fetch_page, page_size, window)]
+    return asyncio.run(main())
+
+
+def test_pages_are_yielded_in_order_until_a_short_page(toolkit):
+    endpoint = FakeEndpoint(
+        {1: [{"id": 1}, {"id": 2}], 2: [{"id": 3}, {"id": 4}], 3: [{"id": 5}]},
+        # Later pages answer first; they must still come out in order
+        delays={1: 0.03, 2: 0.02, 3: 0.01, 4: 5},
+    )
+
+    pages = collect(toolkit, endpoint, page_size=2, window=2)
+
+    assert pages == [[{"id": 1}, {"id": 2}], [{"id": 3}, {"id": 4}], [{"id": 5}]]
+    assert endpoint.max_active <= 2
+    assert endpoint.requested == [1, 2, 3, 4]
+    # The page fetched ahead of the last one was cancelled, not awaited
+    assert 4 not in endpoint.completed
+
+
+def test_an_empty_page_after_full_pages_ends_the_iteration(toolkit):
+    endpoint = FakeEndpoint({1: [{"id": 1}], 2: [{"id": 2}]})
+
+    pages = collect(toolkit, endpoint, page_size=1, window=1)
+
+    assert pages == [[{"id": 1}], [{"id": 2}]]
+    assert endpoint.requested == [1, 2, 3]
+
+
+def test_a_failed_page_raises_with_the_error_details(toolkit):
+    error = {"status": "error", "message": "API Error: 500", "details": {"status_code": 500}}
+    endpoint = FakeEndpoint({1: [{"id": 1}], 2: error}, delays={3: 5})
+
+    with pytest.raises(NMKRRequestError) as raised:
+        collect(toolkit, endpoint, page_size=1, window=2)
+
+    assert str(raised.value) == "API Error: 500"
+    assert raised.value.details == {"status_code": 500}
+    assert 3 not in endpoint.completed
+
+
+def test_an_unexpected_response_raises(toolkit):
+    endpoint = FakeEndpoint({1: {"status": "success", "content": "<html>"}})
+
+    with pytest.raises(NMKRRequestError):
+        collect(toolkit, endpoint, page_size=1, window=1)
+
+
+def test_iter_minted_tokens_yields_typed_tokens(toolkit, monkeypatch):
+    responses = {
+        "/v2/GetNfts/project/minted/2/1": [{"uid": "a", "name": "A"}, {"uid": "b", "name": "B"}],
+        "/v2/GetNfts/project/minted/2/2": [{"uid": "c", "name": "C", "detaildata": "kept"}],
+    }
+
+    async def make_request(endpoint, *args, **kwargs):
+        return responses.get(endpoint, [])
+
+    monkeypatch.setattr(toolkit, "_make_request", make_request)
+
+    async def main():
+        return [token async for token in toolkit.iter_minted_tokens("project", page_size=2, window=2)]
+
+    tokens = asyncio.run(main())
+
+    assert all(isinstance(token, NMKRToken) for token in tokens)
+    assert [token.uid for token in tokens] == ["a", "b", "c"]
+    assert tokens[2].detaildata == "kept"
@@ -0,0 +1,100 @@
+"""
+Read-through TTL cache for NMKR read endpoints.
+
+Project details and project lists change rarely but are queried on every
+agent run. Their responses are kept for a per-endpoint time to live and
+dropped as soon as this process uploads to or mints from the project.
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Entries of list endpoints are not tied to one project and are dropped on every write
+GLOBAL_SCOPE = ""
+
+
+class NMKRReadCache:
+    """
+    Successful responses keyed by endpoint, project and call arguments.
+
+    Every write to a project bumps its generation; a response fetched before
+    the write is not stored, so a slow read cannot bring stale data back.
+    """
+
+    def __init__(self, ttls: Dict[str, float]):
+        self.ttls = ttls
+        self._entries: Dict[Tuple[str, str, Hashable], Tuple[float, Any]] = {}
+        self._generations: Dict[str, int] = {}
+        self._stats = {endpoint: {"hits": 0, "misses": 0} for endpoint in ttls}
+        self._lock = threading.Lock()
+
+    def enabled(self, endpoint: str) -> bool:
+        return self.ttls.get(endpoint, 0) > 0
+
+    def generation(self, project_uid: str) -> Tuple[int, int]:
+        with self._lock:
+            return self._generations.get(project_uid, 0), self._generations.get(GLOBAL_SCOPE, 0)
+
+    def get(self, endpoint: str, project_uid: str, args: Hashable) -> Optional[Any]:
+        """ The fresh cached response, or None """
+        key = (endpoint, project_uid, args)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._stats[endpoint]["hits"] += 1
+                return entry[1]
+            self._entries.pop(key, None)
+            self._stats[endpoint]["misses"] += 1
+            return None
+
+    def put(self, endpoint: str, project_uid: str, args: Hashable, value: Any, generation: Tuple[int, int]) -> None:
+        """ Stores value unless the project was written to since generation was taken """
+        with self._lock:
+            current = self._generations.get(project_uid, 0), self._generations.get(GLOBAL_SCOPE, 0)
+            if current == generation:
+                self._entries[(endpoint, project_uid, args)] = (time.monotonic() + self.ttls[endpoint], value)
+
+    def invalidate(self, project_uid: str) -> None:
+        """ Drops the entries of project_uid and of the list endpoints """
+        with self._lock:
+            for scope in {project_uid, GLOBAL_SCOPE}:
+                self._generations[scope] = self._generations.get(scope, 0) + 1
+            for key in [key for key in self._entries if key[1] in (project_uid, GLOBAL_SCOPE)]:
+                del self._entries[key]
+
+    def metrics(self) -> Dict[str, Any]:
+        """ Hits, misses and hit rate per endpoint """
+        with self._lock:
+            metrics = {}
+            for endpoint, stats in self._stats.items():
+                lookups = stats["hits"] + stats["misses"]
+                metrics[endpoint] = {**stats, "hit_rate": round(stats["hits"] / lookups, 3) if lookups else 0.0}
+            metrics["entries"] = len(self._entries)
+            return metrics
+
+
+_caches: Dict[Tuple[int, str, str], NMKRReadCache] = {}
+_lock = threading.Lock()
+
+
+def shared_read_cache(api_key: str, base_url: str) -> NMKRReadCache:
+    """ Returns the process-wide cache for an API key and base URL, created on first use """
+    key = (os.getpid(), base_url, api_key)
+    with _lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = NMKRReadCache({
+                "project_details": float(os.getenv("NMKR_CACHE_PROJECT_DETAILS_TTL", "300")),
+                "list_projects": float(os.getenv("NMKR_CACHE_LIST_PROJECTS_TTL", "120")),
+                "payment_address": float(os.getenv("NMKR_CACHE_PAYMENT_ADDRESS_TTL", "60")),
+            })
+            _caches[key] = cache
+        return cache
+
+
+def nmkr_cache_metrics() -> Dict[str, Dict[str, Any]]:
+    """ Metrics of this process's caches by base URL """
+    pid = os.getpid()
+    with _lock:
+        return {base_url: cache.metrics() for (owner, base_url, _), cache in _caches.items() if owner == pid}
@@ -0,0 +1,272 @@
+"""
+Pooled async HTTP client for the NMKR Studio API.
+
+All NMKR calls of a process share one keep-alive connection pool on one event
+loop running in a background thread, so calls from sync code, agent tools and
+other event loops all reuse warm connections. Every call has explicit
+timeouts. Idempotent calls are retried with jittered exponential backoff that
+honors Retry-After; calls that create or mint something are never retried.
+"""
+import asyncio
+import email.utils
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Coroutine, Dict, Optional, Tuple
+
+import httpx
+from agno.utils.log import logger
+
+# Transient statuses worth another attempt
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SharedLoop:
+    """ An event loop running in a daemon thread that any thread can submit coroutines to """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="nmkr-loop", daemon=True)
+        self.thread.start()
+
+    def submit(self, coro: Coroutine) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """ Seconds requested by a Retry-After header, given as seconds or an HTTP date """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class NMKRClient:
+    """
+    Makes NMKR API calls and turns their responses into dictionaries.
+
+    Errors are returned as {"status": "error", "message": ..., "details": ...}
+    dictionaries rather than raised, as the toolkit has always done.
+    """
+
+    def __init__(self, api_key: str, base_url: str, environment: str, loop: SharedLoop,
+                 connect_timeout: float = 5.0, read_timeout: float = 30.0, max_connections: int = 10,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 10.0,
+                 max_retry_after: float = 60.0):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.environment = environment
+        self.loop = loop
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self._http: Optional[httpx.AsyncClient] = None
+        self._stats = {"requests": 0, "retries": 0, "errors": 0}
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """ Keep-alive connection pool, created on the shared loop """
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections,
+                                    keepalive_expiry=60.0),
+                headers={"Authorization": f"Bearer {self.api_key}"},
+            )
+        return self._http
+
+    async def request(self, endpoint: str, method: str = "GET", params: Dict = None, data: Dict = None,
+                      files: Dict = None, idempotent: Optional[bool] = None) -> Any:
+        """
+        Makes a request from any event loop; it runs on the shared loop.
+
+        idempotent defaults to True for GET requests. Only idempotent requests are retried.
+        """
+        coro = self._request(endpoint, method, params, data, files, idempotent)
+        if asyncio.get_running_loop() is self.loop.loop:
+            return await coro
+        return await asyncio.wrap_future(self.loop.submit(coro))
+
+    def request_sync(self, endpoint: str, method: str = "GET", params: Dict = None, data: Dict = None,
+                     files: Dict = None, idempotent: Optional[bool] = None) -> Any:
+        """ Makes a request from sync code, blocking until the response (or final failure) """
+        return self.loop.submit(self._request(endpoint, method, params, data, files, idempotent)).result()
+
+    def retry_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """ Full-jitter exponential backoff, never shorter than a server's Retry-After """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_retry_after))
+        return delay
+
+    async def _request(self, endpoint: str, method: str, params: Optional[Dict], data: Optional[Dict],
+                       files: Optional[Dict], idempotent: Optional[bool]) -> Any:
+        if idempotent is None:
+            idempotent = method == "GET"
+        attempts = 1 + (self.max_retries if idempotent else 0)
+
+        logger.info(f"Making {method} request to {self.base_url}{endpoint}")
+        if data:
+            logger.debug(f"Request data: {data}")
+
+        for attempt in range(attempts):
+            self._stats["requests"] += 1
+            last_attempt = attempt == attempts - 1
+            try:
+                if method == "GET":
+                    response = await self.http.get(endpoint, params=params)
+                elif files:
+                    # multipart/form-data; httpx sets the Content-Type with its boundary
+                    response = await self.http.post(endpoint, params=params, data=data, files=files)
+                else:
+                    response = await self.http.post(endpoint, params=params, json=data)
+            except httpx.HTTPError as e:
+                if not last_attempt:
+                    self._stats["retries"] += 1
+                    delay = self.retry_delay(attempt)
+                    logger.warning(f"NMKR request to {endpoint} failed ({e}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                self._stats["errors"] += 1
+                error_msg = f"Error making request to NMKR API: {str(e)}"
+                logger.error(error_msg)
+                return {
+                    "status": "error",
+                    "message": error_msg,
+                    "details": {
+                        "environment": self.environment,
+                        "api_url": self.base_url,
+                        "exception": str(e)
+                    }
+                }
+
+            if response.status_code in RETRY_STATUSES and not last_attempt:
+                self._stats["retries"] += 1
+                delay = self.retry_delay(attempt, _retry_after(response))
+                logger.warning(f"NMKR returned {response.status_code} for {endpoint}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            result = self._result(response)
+            if isinstance(result, dict) and result.get("status") == "error":
+                self._stats["errors"] += 1
+            return result
+
+    def _result(self, response: httpx.Response) -> Any:
+        """ The parsed JSON response, or an error dictionary for failed requests """
+        logger.debug(f"Response status code: {response.status_code}")
+        logger.debug(f"Response headers: {response.headers}")
+
+        if response.status_code == 401:
+            error_msg = (
+                f"Authentication failed: Please check your API key and make sure it's valid for the {self.environment} environment. "
+                f"Note that preprod and mainnet environments require different API keys."
+            )
+            logger.error(error_msg)
+            return {
+                "status": "error",
+                "message": error_msg,
+                "details": {
+                    "environment": self.environment,
+                    "api_url": self.base_url,
+                    "status_code": response.status_code
+                }
+            }
+
+        # Try to get more detailed error information for non-200 responses
+        if response.status_code >= 400:
+            try:
+                error_detail = response.json()
+                error_msg = f"API Error: {response.status_code}"
+                if "title" in error_detail:
+                    error_msg += f" - {error_detail.get('title')}"
+                if "detail" in error_detail:
+                    error_msg += f": {error_detail['detail']}"
+                if "errors" in error_detail:
+                    error_msg += f"\nValidation errors: {json.dumps(error_detail['errors'], indent=2)}"
+                logger.error(error_msg)
+                return {
+                    "status": "error",
+                    "message": error_msg,
+                    "details": {
+                        "environment": self.environment,
+                        "api_url": self.base_url,
+                        "status_code": response.status_code,
+                        "response": error_detail
+                    }
+                }
+            except Exception:
+                error_msg = f"API Error: {response.status_code} - {response.text[:200]}"
+                logger.error(error_msg)
+                return {
+                    "status": "error",
+                    "message": error_msg,
+                    "details": {
+                        "environment": self.environment,
+                        "api_url": self.base_url,
+                        "status_code": response.status_code
+                    }
+                }
+
+        try:
+            return response.json()
+        except ValueError:
+            # Return text content if not JSON
+            return {"status": "success", "content": response.text}
+
+    def metrics(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+
+_shared_loop: Optional[SharedLoop] = None
+_clients: Dict[Tuple[int, str, str], NMKRClient] = {}
+_lock = threading.Lock()
+
+
+def shared_nmkr_client(api_key: str, base_url: str, environment: str) -> NMKRClient:
+    """ Returns the process-wide client for an API key and base URL, created on first use """
+    global _shared_loop
+    key = (os.getpid(), base_url, api_key)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            # A forked process does not inherit the loop thread, so it builds its own
+            if _shared_loop is None or not _shared_loop.thread.is_alive():
+                _shared_loop = SharedLoop()
+            client = NMKRClient(
+                api_key=api_key,
+                base_url=base_url,
+                environment=environment,
+                loop=_shared_loop,
+                connect_timeout=float(os.getenv("NMKR_CONNECT_TIMEOUT", "5")),
+                read_timeout=float(os.getenv("NMKR_READ_TIMEOUT", "30")),
+                max_connections=int(os.getenv("NMKR_MAX_CONNECTIONS", "10")),
+                max_retries=int(os.getenv("NMKR_MAX_RETRIES", "3")),
+                backoff_base=float(os.getenv("NMKR_BACKOFF_BASE", "0.5")),
+                backoff_max=float(os.getenv("NMKR_BACKOFF_MAX", "10")),
+            )
+            _clients[key] = client
+        return client
+
+
+def nmkr_client_metrics() -> Dict[str, Dict[str, int]]:
+    """ Request, retry and error counts of this process's clients by base URL """
+    pid = os.getpid()
+    with _lock:
+        return {base_url: client.metrics() for (owner, base_url, _), client in _clients.items() if owner == pid}
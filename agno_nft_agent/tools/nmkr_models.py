@@ -0,0 +1,49 @@
+"""
+Typed records of NMKR list endpoints.
+
+Only the commonly used fields are declared; every other field NMKR returns
+is kept as an extra attribute.
+"""
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class NMKRRequestError(Exception):
+    """ An NMKR request failed while iterating over pages; details holds the error response """
+
+    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.details = details or {}
+
+
+class NMKRToken(BaseModel):
+    """ One NFT of a project, from /v2/GetNfts """
+    model_config = ConfigDict(extra="allow")
+
+    id: Optional[int] = None
+    uid: Optional[str] = None
+    name: Optional[str] = None
+    displayname: Optional[str] = None
+    state: Optional[str] = None
+    minted: Optional[bool] = None
+    policyid: Optional[str] = None
+    assetid: Optional[str] = None
+    fingerprint: Optional[str] = None
+    ipfshash: Optional[str] = None
+    initialminttxhash: Optional[str] = None
+
+
+class NMKRProject(BaseModel):
+    """ One project of the account, from /v2/ListProjects """
+    model_config = ConfigDict(extra="allow")
+
+    id: Optional[int] = None
+    uid: Optional[str] = None
+    projectname: Optional[str] = None
+    state: Optional[str] = None
+    policyId: Optional[str] = None
+    free: Optional[int] = None
+    sold: Optional[int] = None
+    reserved: Optional[int] = None
+    maxTokenSupply: Optional[int] = None
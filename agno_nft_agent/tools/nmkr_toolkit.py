@@ -1,5 +1,7 @@
-import requests
-from typing import Dict, List, Optional, Union
+import asyncio
+import functools
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Union
 import json
 import datetime
 
@@ -7,11 +9,18 @@ from agno.agent import Agent
 from agno.tools import Toolkit
 from agno.utils.log import logger
 
+from tools.nmkr_cache import GLOBAL_SCOPE, shared_read_cache
+from tools.nmkr_client import shared_nmkr_client
+from tools.nmkr_models import NMKRProject, NMKRRequestError, NMKRToken
 
-class NMKRToolkit(Toolkit):
+
+class AsyncNMKRToolkit(Toolkit):
     def __init__(self, api_key: str, environment: str = "mainnet", base_url: str = None):
         """
-        Initialize the NMKR toolkit for interacting with NMKR Studio API.
+        Initialize the async NMKR toolkit for interacting with NMKR Studio API.
+
+        Requests go through the process-wide pooled client of the API key and base URL,
+        and project reads through its read-through cache.
         
         Args:
             api_key (str): Your NMKR Studio API key (Bearer token)
@@ -32,6 +41,8 @@ class NMKRToolkit(Toolkit):
             else:
                 self.base_url = "https://studio-api.nmkr.io"
                 logger.info("Using NMKR Studio mainnet environment")
+        self.client = shared_nmkr_client(self.api_key, self.base_url, self.environment)
+        self.cache = shared_read_cache(self.api_key, self.base_url)
         
         # Register all toolkit functions
         self.register(self.create_project)
@@ -54,10 +65,10 @@ class NMKRToolkit(Toolkit):
         Returns:
             str: Formatted string representation
         """
-        if not isinstance(response, dict):
+        if not isinstance(response, (dict, list)):
             return str(response)
             
-        if "status" in response and response["status"] == "error":
+        if isinstance(response, dict) and response.get("status") == "error":
             return f"Error: {response.get('message', 'Unknown error')}"
             
         # Try to create a readable string from the dictionary
@@ -66,7 +77,7 @@ class NMKRToolkit(Toolkit):
         except Exception:
             return str(response)
     
-    def _make_request(self, endpoint: str, method: str = "GET", params: Dict = None, data: Dict = None, files: Dict = None) -> Dict:
+    async def _make_request(self, endpoint: str, method: str = "GET", params: Dict = None, data: Dict = None, files: Dict = None, idempotent: Optional[bool] = None) -> Dict:
         """
         Makes a request to the NMKR API.
         
@@ -76,106 +87,36 @@ class NMKRToolkit(Toolkit):
             params (Dict): URL parameters
             data (Dict): JSON data for POST requests
             files (Dict): Files to upload
+            idempotent (bool): Whether the request may be retried (default: GET requests only)
             
         Returns:
             Dict: Response from the API or error message
         """
-        headers = {"Authorization": f"Bearer {self.api_key}"}
-        url = f"{self.base_url}{endpoint}"
-        
-        logger.info(f"Making {method} request to {url}")
-        if data:
-            logger.debug(f"Request data: {data}")
-        
-        try:
-            if method == "GET":
-                response = requests.get(url, headers=headers, params=params)
-            elif method == "POST":
-                if files:
-                    # Don't include Content-Type header for multipart/form-data requests
-                    response = requests.post(url, headers=headers, data=data, files=files)
-                else:
-                    headers["Content-Type"] = "application/json"
-                    response = requests.post(url, headers=headers, json=data)
-            
-            # Log response details for debugging
-            logger.debug(f"Response status code: {response.status_code}")
-            logger.debug(f"Response headers: {response.headers}")
-            
-            if response.status_code == 401:
-                env_message = f" for the {self.environment} environment" if hasattr(self, 'environment') else ""
-                error_msg = (
-                    f"Authentication failed: Please check your API key and make sure it's valid{env_message}. "
-                    f"Note that preprod and mainnet environments require different API keys."
-                )
-                logger.error(error_msg)
-                return {
-                    "status": "error",
-                    "message": error_msg,
-                    "details": {
-                        "environment": self.environment,
-                        "api_url": self.base_url,
-                        "status_code": response.status_code
-                    }
-                }
-            
-            # Try to get more detailed error information for non-200 responses
-            if response.status_code >= 400:
-                try:
-                    error_detail = response.json()
-                    error_msg = f"API Error: {response.status_code}"
-                    if "title" in error_detail:
-                        error_msg += f" - {error_detail.get('title')}"
-                    if "detail" in error_detail:
-                        error_msg += f": {error_detail['detail']}"
-                    if "errors" in error_detail:
-                        error_msg += f"\nValidation errors: {json.dumps(error_detail['errors'], indent=2)}"
-                    logger.error(error_msg)
-                    return {
-                        "status": "error",
-                        "message": error_msg,
-                        "details": {
-                            "environment": self.environment,
-                            "api_url": self.base_url,
-                            "status_code": response.status_code,
-                            "response": error_detail
-                        }
-                    }
-                except Exception:
-                    error_msg = f"API Error: {response.status_code} - {response.text[:200]}"
-                    logger.error(error_msg)
-                    return {
-                        "status": "error",
-                        "message": error_msg,
-                        "details": {
-                            "environment": self.environment,
-                            "api_url": self.base_url,
-                            "status_code": response.status_code
-                        }
-                    }
-            
-            response.raise_for_status()
-            
-            try:
-                return response.json()
-            except json.JSONDecodeError:
-                # Return text content if not JSON
-                return {"status": "success", "content": response.text}
-                
-        except requests.exceptions.RequestException as e:
-            error_msg = f"Error making request to NMKR API: {str(e)}"
-            logger.error(error_msg)
-            return {
-                "status": "error",
-                "message": error_msg,
-                "details": {
-                    "environment": self.environment,
-                    "api_url": self.base_url,
-                    "exception": str(e)
-                }
-            }
+        return await self.client.request(endpoint, method=method, params=params, data=data, files=files, idempotent=idempotent)
+
+    async def _cached_request(self, cache_endpoint: str, project_uid: str, args: tuple, endpoint: str) -> Dict:
+        """
+        Makes a GET request through the read cache; only successful responses are cached.
+
+        Args:
+            cache_endpoint (str): Cache endpoint name, which sets the time to live
+            project_uid (str): Project the response belongs to, or GLOBAL_SCOPE
+            args (tuple): Remaining call arguments that identify the response
+            endpoint (str): API endpoint to call on a miss
+        """
+        if not self.cache.enabled(cache_endpoint):
+            return await self._make_request(endpoint)
+        cached = self.cache.get(cache_endpoint, project_uid, args)
+        if cached is not None:
+            logger.debug(f"NMKR cache hit for {endpoint}")
+            return cached
+        generation = self.cache.generation(project_uid)
+        result = await self._make_request(endpoint)
+        if not (isinstance(result, dict) and result.get("status") == "error"):
+            self.cache.put(cache_endpoint, project_uid, args, result, generation)
+        return result
     
-    def test_connection(self) -> str:
+    async def test_connection(self) -> str:
         """
         Tests the connection to the NMKR API and authentication.
         
@@ -186,7 +127,7 @@ class NMKRToolkit(Toolkit):
         endpoint = "/v2/GetAdaRates"
         
         logger.info(f"Testing NMKR API connection to {self.base_url}")
-        result = self._make_request(endpoint)
+        result = await self._make_request(endpoint)
         
         if "status" in result and result["status"] == "error":
             error_message = result.get("message", "Unknown error")
@@ -209,7 +150,7 @@ class NMKRToolkit(Toolkit):
         # Return a string instead of a dictionary to be compatible with the agent framework
         return f"Successfully connected to NMKR API at {self.base_url}. Connection test passed."
     
-    def create_project(self, name: str, description: str, payout_wallet: str, max_token_supply: int, token_prefix: str = "", project_url: str = "", address_expire_time: int = 60, is_nft: bool = True, metadata_standard: str = "CIP25", twitter_handle: str = "", enable_fiat: bool = False, enable_decentral_payments: bool = False, enable_cross_sale: bool = False, activate_payin_address: bool = True, payment_gateway_sale_start: str = None, additional_payout_wallets: List[Dict] = None, sale_conditions: List[Dict] = None, policy_expires: bool = False, pricelist: List[Dict] = None, policy_locks_date_time: str = None) -> str:
+    async def create_project(self, name: str, description: str, payout_wallet: str, max_token_supply: int, token_prefix: str = "", project_url: str = "", address_expire_time: int = 60, is_nft: bool = True, metadata_standard: str = "CIP25", twitter_handle: str = "", enable_fiat: bool = False, enable_decentral_payments: bool = False, enable_cross_sale: bool = False, activate_payin_address: bool = True, payment_gateway_sale_start: str = None, additional_payout_wallets: List[Dict] = None, sale_conditions: List[Dict] = None, policy_expires: bool = False, pricelist: List[Dict] = None, policy_locks_date_time: str = None) -> str:
         """
         Creates a new project in NMKR Studio.
         
@@ -309,10 +250,11 @@ class NMKRToolkit(Toolkit):
         
         logger.info(f"Creating project '{name}' with description '{description}' and max supply of {max_token_supply}")
         logger.info(f"Sending request to {endpoint} with project type: {data.get('projectType', 'standard')}")
-        result = self._make_request(endpoint, method="POST", data=data)
+        result = await self._make_request(endpoint, method="POST", data=data)
+        self.cache.invalidate(GLOBAL_SCOPE)
         return self._format_response(result)
     
-    def upload_file_and_metadata(
+    async def upload_file_and_metadata(
         self, 
         project_uid: str, 
         file_path: Optional[str] = None,
@@ -401,20 +343,36 @@ class NMKRToolkit(Toolkit):
         files = None
         if file_path:
             logger.info(f"Using legacy file upload method with file: {file_path}")
-            files = {"file": open(file_path, "rb")}
+            with open(file_path, "rb") as f:
+                files = {"file": (os.path.basename(file_path), f.read())}
             
         logger.info(f"Uploading NFT to project {project_uid}")
         logger.debug(f"Upload data: {data}")
-        result = self._make_request(
+        result = await self._make_request(
             endpoint, 
             method="POST", 
             data=data, 
             files=files,
             params=params
         )
+        # Also on errors: a request that timed out may still have been carried out
+        self.cache.invalidate(project_uid)
         return self._format_response(result)
+
+    async def upload_nft(self, project_uid: str, data: Dict, upload_source: Optional[str] = None) -> Dict:
+        """
+        Uploads an NFT from a complete request body (tokenname, displayname, previewImageNft,
+        metadataOverride, ...) and returns the API response as a dictionary.
+
+        Not registered as an agent tool; used by the direct pipeline.
+        """
+        params = {"uploadsource": upload_source} if upload_source else {}
+        logger.info(f"Uploading NFT to project {project_uid}")
+        result = await self._make_request(f"/v2/UploadNft/{project_uid}", method="POST", data=data, params=params)
+        self.cache.invalidate(project_uid)
+        return result
     
-    def mint_and_send_specific(self, project_uid: str, nft_uid: str, token_count: int, receiver_address: str, blockchain: str = "Cardano") -> str:
+    async def mint_and_send_specific(self, project_uid: str, nft_uid: str, token_count: int, receiver_address: str, blockchain: str = "Cardano") -> str:
         """
         Mints a specific NFT and sends it to an address.
         
@@ -428,15 +386,26 @@ class NMKRToolkit(Toolkit):
         Returns:
             str: Minting response as a formatted string
         """
+        result = await self.mint_and_send(project_uid, nft_uid, token_count, receiver_address, blockchain)
+        return self._format_response(result)
+
+    async def mint_and_send(self, project_uid: str, nft_uid: str, token_count: int, receiver_address: str, blockchain: str = "Cardano") -> Dict:
+        """
+        Mints a specific NFT, sends it to an address and returns the API response as a dictionary.
+
+        Not registered as an agent tool; used by mint_and_send_specific and the direct pipeline.
+        """
         endpoint = f"/v2/MintAndSendSpecific/{project_uid}/{nft_uid}/{token_count}/{receiver_address}"
         params = {}
         if blockchain and blockchain != "Cardano":
             params["blockchain"] = blockchain
         
-        result = self._make_request(endpoint, method="GET", params=params)
-        return self._format_response(result)
+        # A GET, but it mints: a retry after a lost response could mint twice
+        result = await self._make_request(endpoint, method="GET", params=params, idempotent=False)
+        self.cache.invalidate(project_uid)
+        return result
     
-    def get_project_details(self, project_uid: str) -> str:
+    async def get_project_details(self, project_uid: str) -> str:
         """
         Gets details about a project.
         
@@ -447,10 +416,10 @@ class NMKRToolkit(Toolkit):
             str: Project details as a formatted string
         """
         endpoint = f"/v2/ProjectDetails/{project_uid}"
-        result = self._make_request(endpoint)
+        result = await self._cached_request("project_details", project_uid, (), endpoint)
         return self._format_response(result)
     
-    def get_payment_address(self, project_uid: str, count_nft: int, customer_ip: str = "") -> str:
+    async def get_payment_address(self, project_uid: str, count_nft: int, customer_ip: str = "") -> str:
         """
         Gets a payment address for random NFT sales.
         
@@ -463,39 +432,137 @@ class NMKRToolkit(Toolkit):
             str: Payment address details as a formatted string
         """
         endpoint = f"/v2/GetPaymentAddressForRandomNftSale/{project_uid}/{count_nft}/{customer_ip}"
-        result = self._make_request(endpoint)
+        if customer_ip:
+            # Each call reserves an address, so only a repeated call of the same customer is served from cache
+            result = await self._cached_request("payment_address", project_uid, (count_nft, customer_ip), endpoint)
+        else:
+            result = await self._make_request(endpoint)
         return self._format_response(result)
     
-    def get_minted_tokens(self, project_uid: str) -> str:
+    async def _iter_pages(self, fetch_page: Callable[[int], Awaitable[Any]], page_size: int, window: int) -> AsyncIterator[List[Dict]]:
         """
-        Gets all minted tokens for a project.
+        Yields the pages of a paginated endpoint in order, starting at page 1.
+
+        Up to window pages are fetched at once. A page shorter than page_size is the
+        last one; the pages fetched ahead of it are cancelled.
+
+        Raises:
+            NMKRRequestError: If a page request fails
+        """
+        pending: Dict[int, asyncio.Future] = {}
+        next_page = 1
+
+        def fetch_next():
+            nonlocal next_page
+            pending[next_page] = asyncio.ensure_future(fetch_page(next_page))
+            next_page += 1
+
+        try:
+            for _ in range(max(1, window)):
+                fetch_next()
+            page = 1
+            while True:
+                result = await pending.pop(page)
+                if isinstance(result, dict) and result.get("status") == "error":
+                    raise NMKRRequestError(result.get("message", "Unknown error"), result.get("details"))
+                if not isinstance(result, list):
+                    raise NMKRRequestError(f"Expected a list for page {page}, got {type(result).__name__}")
+                if len(result) < page_size:
+                    if result:
+                        yield result
+                    return
+                fetch_next()
+                yield result
+                page += 1
+        finally:
+            for future in pending.values():
+                future.cancel()
+
+    async def iter_minted_tokens(self, project_uid: str, page_size: int = None, window: int = None) -> AsyncIterator[NMKRToken]:
+        """
+        Yields every minted token of a project, fetching pages ahead in the background.
+
+        Not registered as an agent tool.
+
+        Args:
+            project_uid (str): The project UID
+            page_size (int): Tokens per page (default: NMKR_PAGE_SIZE or 100)
+            window (int): Pages fetched at once (default: NMKR_PAGE_WINDOW or 4)
+        """
+        page_size = page_size or int(os.getenv("NMKR_PAGE_SIZE", "100"))
+        window = window or int(os.getenv("NMKR_PAGE_WINDOW", "4"))
+        def fetch_page(page: int) -> Awaitable[Any]:
+            return self._make_request(f"/v2/GetNfts/{project_uid}/minted/{page_size}/{page}")
+
+        async for records in self._iter_pages(fetch_page, page_size, window):
+            for record in records:
+                yield NMKRToken.model_validate(record)
+
+    async def iter_projects(self, page_size: int = None, window: int = None) -> AsyncIterator[NMKRProject]:
+        """
+        Yields every project of the account, fetching pages ahead in the background.
+
+        Pages go through the read cache of list_projects. Not registered as an agent tool.
+
+        Args:
+            page_size (int): Projects per page (default: NMKR_PAGE_SIZE or 100)
+            window (int): Pages fetched at once (default: NMKR_PAGE_WINDOW or 4)
+        """
+        page_size = page_size or int(os.getenv("NMKR_PAGE_SIZE", "100"))
+        window = window or int(os.getenv("NMKR_PAGE_WINDOW", "4"))
+        def fetch_page(page: int) -> Awaitable[Any]:
+            endpoint = f"/v2/ListProjects/{page_size}/{page}"
+            return self._cached_request("list_projects", GLOBAL_SCOPE, (page_size, page), endpoint)
+
+        async for records in self._iter_pages(fetch_page, page_size, window):
+            for record in records:
+                yield NMKRProject.model_validate(record)
+
+    def _page_response(self, key: str, result: Any, page: int, limit: int) -> str:
+        """
+        Formats one page of a list endpoint as {key: [...], "page": ..., "has_more": ...}.
+
+        A full page may be followed by more; a short page is the last one.
+        """
+        if isinstance(result, dict) and result.get("status") == "error":
+            return self._format_response(result)
+        records = result if isinstance(result, list) else []
+        return self._format_response({key: records, "page": page, "has_more": len(records) >= limit})
+
+    async def get_minted_tokens(self, project_uid: str, page: int = 1, limit: int = 50) -> str:
+        """
+        Gets one page of the minted tokens of a project.
         
         Args:
             project_uid (str): The project UID
+            page (int): Page number, starting at 1 (default: 1)
+            limit (int): Tokens per page, at most 100 (default: 50)
             
         Returns:
-            str: List of minted tokens as a formatted string
+            str: The page's tokens and whether more pages follow (has_more) as a formatted string
         """
-        endpoint = f"/v2/GetNfts/{project_uid}/minted/100/1"
-        result = self._make_request(endpoint)
-        return self._format_response(result)
+        limit = max(1, min(limit, 100))
+        endpoint = f"/v2/GetNfts/{project_uid}/minted/{limit}/{page}"
+        result = await self._make_request(endpoint)
+        return self._page_response("tokens", result, page, limit)
         
-    def list_projects(self, count: int = 100, page: int = 1) -> str:
+    async def list_projects(self, count: int = 100, page: int = 1) -> str:
         """
-        Lists all projects for the user with pagination.
+        Lists the projects of the user with pagination.
         
         Args:
-            count (int): Number of projects per page
-            page (int): Page number
+            count (int): Number of projects per page, at most 100 (default: 100)
+            page (int): Page number, starting at 1 (default: 1)
             
         Returns:
-            str: List of projects as a formatted string
+            str: The page's projects and whether more pages follow (has_more) as a formatted string
         """
+        count = max(1, min(count, 100))
         endpoint = f"/v2/ListProjects/{count}/{page}"
-        result = self._make_request(endpoint)
-        return self._format_response(result)
+        result = await self._cached_request("list_projects", GLOBAL_SCOPE, (count, page), endpoint)
+        return self._page_response("projects", result, page, count)
 
-    def upload_to_ipfs(
+    async def upload_to_ipfs(
         self,
         customer_id: int,
         mimetype: str = "image/jpeg",
@@ -536,5 +603,80 @@ class NMKRToolkit(Toolkit):
         logger.info(f"Uploading file to IPFS for customer {customer_id}")
         logger.debug(f"Upload data: {data}")
         
-        result = self._make_request(endpoint, method="POST", data=data)
-        return self._format_response(result)
\ No newline at end of file
+        result = await self._make_request(endpoint, method="POST", data=data)
+        return self._format_response(result)
+
+
+def _blocking(method):
+    """ Sync twin of an AsyncNMKRToolkit method that waits for it on the shared NMKR loop """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return self.client.loop.submit(method(self.aio, *args, **kwargs)).result()
+    return wrapper
+
+
+async def _next_item(iterator: AsyncIterator) -> tuple:
+    try:
+        return True, await iterator.__anext__()
+    except StopAsyncIteration:
+        return False, None
+
+
+def _blocking_iter(method):
+    """ Sync generator twin of an AsyncNMKRToolkit async generator, stepped on the shared NMKR loop """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        iterator = method(self.aio, *args, **kwargs)
+        try:
+            while True:
+                has_item, item = self.client.loop.submit(_next_item(iterator)).result()
+                if not has_item:
+                    return
+                yield item
+        finally:
+            # Cancels the pages still being fetched when the caller stops early
+            self.client.loop.submit(iterator.aclose()).result()
+    return wrapper
+
+
+class NMKRToolkit(Toolkit):
+    """
+    Sync NMKR toolkit for agents run with agent.run() and for sync code.
+
+    A thin wrapper: each method runs its AsyncNMKRToolkit counterpart and waits for the result;
+    the iter_* methods are sync generators.
+    """
+
+    def __init__(self, api_key: str, environment: str = "mainnet", base_url: str = None):
+        super().__init__(name="nmkr_tools")
+        self.aio = AsyncNMKRToolkit(api_key=api_key, environment=environment, base_url=base_url)
+        self.api_key = self.aio.api_key
+        self.environment = self.aio.environment
+        self.base_url = self.aio.base_url
+        self.client = self.aio.client
+
+        # Register all toolkit functions
+        self.register(self.create_project)
+        self.register(self.upload_file_and_metadata)
+        self.register(self.mint_and_send_specific)
+        self.register(self.get_project_details)
+        self.register(self.get_payment_address)
+        self.register(self.get_minted_tokens)
+        self.register(self.list_projects)
+        self.register(self.test_connection)
+        self.register(self.upload_to_ipfs)
+
+    _make_request = _blocking(AsyncNMKRToolkit._make_request)
+    test_connection = _blocking(AsyncNMKRToolkit.test_connection)
+    create_project = _blocking(AsyncNMKRToolkit.create_project)
+    upload_file_and_metadata = _blocking(AsyncNMKRToolkit.upload_file_and_metadata)
+    upload_nft = _blocking(AsyncNMKRToolkit.upload_nft)
+    mint_and_send_specific = _blocking(AsyncNMKRToolkit.mint_and_send_specific)
+    mint_and_send = _blocking(AsyncNMKRToolkit.mint_and_send)
+    get_project_details = _blocking(AsyncNMKRToolkit.get_project_details)
+    get_payment_address = _blocking(AsyncNMKRToolkit.get_payment_address)
+    get_minted_tokens = _blocking(AsyncNMKRToolkit.get_minted_tokens)
+    list_projects = _blocking(AsyncNMKRToolkit.list_projects)
+    iter_minted_tokens = _blocking_iter(AsyncNMKRToolkit.iter_minted_tokens)
+    iter_projects = _blocking_iter(AsyncNMKRToolkit.iter_projects)
+    upload_to_ipfs = _blocking(AsyncNMKRToolkit.upload_to_ipfs)
@@ -0,0 +1,167 @@
+"""
+Startup benchmark for the agent servers.
+
+For every agent it measures
+  * the cumulative import time of `main` (via `python -X importtime`), and
+  * the time from spawning uvicorn until `/health` first answers,
+taking the best of several runs, and compares both against the budget in
+`startup_budget.json`. The script exits non-zero when an agent exceeds its
+budget by more than the allowed tolerance, so it can gate CI.
+
+Usage:
+    python benchmarks/startup.py                 # check against the budget
+    python benchmarks/startup.py --update        # record the current timings as the new budget
+    python benchmarks/startup.py --agents agno_nft_agent --runs 5
+"""
+import argparse
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+AGENTS = ["agno_llm_txt_agent", "agno_nft_agent", "agno_finance_report_agent"]
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+HEALTH_TIMEOUT = 60
+
+
+def agent_env(data_dir: str) -> dict:
+    """ Environment for starting a server without a payment service """
+    env = dict(os.environ)
+    env.setdefault("PAYMENT_SERVICE_URL", "http://127.0.0.1:9")
+    env.setdefault("PAYMENT_API_KEY", "benchmark")
+    env.setdefault("AGENT_IDENTIFIER", "benchmark")
+    env.setdefault("NETWORK", "Preprod")
+    env["JOB_STORE_URL"] = f"sqlite:///{os.path.join(data_dir, 'jobs.db')}"
+    env["MULTI_WORKER"] = "false"
+    return env
+
+
+def measure_import(agent: str, env: dict) -> tuple:
+    """ Returns the cumulative import time of `main` in ms and its heaviest top-level imports """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=os.path.join(ROOT, agent), env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {agent}/main.py failed:\n{result.stderr[-2000:]}")
+
+    total_us = None
+    top_level = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), match.group(3), match.group(4)
+        # Children are reported before their parent, so the direct imports of `main`
+        # are the second-level entries since the previous top-level one (e.g. `site`)
+        if name == "main":
+            total_us = cumulative
+        elif len(indent) == 1:
+            top_level = []
+        elif len(indent) == 3:
+            top_level.append((cumulative / 1000, name))
+    if total_us is None:
+        raise RuntimeError(f"No importtime entry for {agent}/main.py")
+    return total_us / 1000, sorted(top_level, reverse=True)[:5]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_health(agent: str, env: dict) -> float:
+    """ Returns the time in ms from spawning uvicorn until /health answers """
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.join(ROOT, agent), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    try:
+        while time.perf_counter() - started < HEALTH_TIMEOUT:
+            if process.poll() is not None:
+                raise RuntimeError(f"{agent} server exited during startup:\n{process.stderr.read().decode()[-2000:]}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError(f"{agent} did not answer /health within {HEALTH_TIMEOUT}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def load_budget() -> dict:
+    if not os.path.exists(BUDGET_FILE):
+        return {}
+    with open(BUDGET_FILE) as f:
+        return json.load(f)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure agent server startup and compare it to the budget")
+    parser.add_argument("--agents", nargs="+", default=AGENTS, choices=AGENTS)
+    parser.add_argument("--runs", type=int, default=3, help="Runs per measurement; the fastest one counts")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed fraction above the budget")
+    parser.add_argument("--skip-health", action="store_true", help="Only measure import time")
+    parser.add_argument("--update", action="store_true", help="Write the measured timings as the new budget")
+    args = parser.parse_args()
+
+    budget = load_budget()
+    measured = {}
+    failures = []
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = agent_env(data_dir)
+        for agent in args.agents:
+            import_runs = [measure_import(agent, env) for _ in range(args.runs)]
+            import_ms, heaviest = min(import_runs, key=lambda run: run[0])
+            measured[agent] = {"import_ms": round(import_ms)}
+            if not args.skip_health:
+                measured[agent]["health_ms"] = round(min(measure_health(agent, env) for _ in range(args.runs)))
+
+            print(f"{agent}:")
+            for metric, value in measured[agent].items():
+                limit = budget.get(agent, {}).get(metric)
+                if limit is None:
+                    print(f"  {metric:<10} {value:>7} ms   (no budget)")
+                    continue
+                allowed = limit * (1 + args.tolerance)
+                verdict = "ok" if value <= allowed else "REGRESSION"
+                print(f"  {metric:<10} {value:>7} ms   budget {limit} ms (+{args.tolerance:.0%})   {verdict}")
+                if value > allowed:
+                    failures.append(f"{agent} {metric}: {value} ms > {allowed:.0f} ms")
+            print("  heaviest imports: " + ", ".join(f"{name} {ms:.0f} ms" for ms, name in heaviest))
+
+    if args.update:
+        for agent, values in measured.items():
+            budget.setdefault(agent, {}).update(values)
+        with open(BUDGET_FILE, "w") as f:
+            json.dump(budget, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Budget written to {BUDGET_FILE}")
+        return 0
+
+    if failures:
+        print("\nStartup regressions:\n  " + "\n  ".join(failures))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
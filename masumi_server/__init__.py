@@ -0,0 +1,9 @@
+"""
+Shared MIP-003 server runtime for the Masumi agents in this repository.
+
+Each agent's main.py builds an AgentServer from its workflow and input schema;
+the endpoints, payment handling, job store, executor and metrics live here.
+"""
+from .server import AgentServer
+
+__all__ = ["AgentServer"]
@@ -0,0 +1,125 @@
+import time
+import logging
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Job statuses after which no further events are published
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class JobEventBus:
+    """
+    In-process publish/subscribe bus for job state transitions and progress.
+
+    Subscribers get an asyncio.Queue per job. publish() may be called from the
+    event loop or from worker threads; events are always delivered on the loop
+    the bus was bound to. A short history per job lets late subscribers catch up
+    on progress published before they connected.
+
+    With a relay (see shared_state.py), events are also sent to the other
+    workers of a multi-worker deployment, and their events are delivered here.
+    """
+
+    def __init__(self, history_size: int = 50, queue_size: int = 100, relay=None):
+        self.history_size = history_size
+        self.queue_size = queue_size
+        self.relay = relay
+        self._relay_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._history: Dict[str, Deque[Dict[str, Any]]] = {}
+        self.published = 0
+        self.relayed = 0
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Bind the bus to the server event loop; call once on startup"""
+        self._loop = loop
+        if self.relay is not None and self._relay_task is None:
+            self._relay_task = loop.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                await self.relay.listen(self._deliver_relayed)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event relay failed, reconnecting: {str(e)}", exc_info=True)
+                await asyncio.sleep(1)
+
+    def _deliver_relayed(self, item: Dict[str, Any]) -> None:
+        self.relayed += 1
+        self._deliver(item)
+
+    async def close(self) -> None:
+        if self._relay_task:
+            self._relay_task.cancel()
+            try:
+                await self._relay_task
+            except asyncio.CancelledError:
+                pass
+            self._relay_task = None
+        if self.relay is not None:
+            self.relay.close()
+
+    def publish(self, job_id: str, event: str, data: Optional[Dict[str, Any]] = None) -> None:
+        item = {"event": event, "job_id": job_id, "timestamp": time.time(), "data": data or {}}
+        if self.relay is not None:
+            try:
+                self.relay.send(item)
+            except Exception as e:
+                logger.error(f"Could not relay {event} event for job {job_id}: {str(e)}")
+
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+
+        if self._loop is None or on_loop:
+            self._deliver(item)
+        else:
+            self._loop.call_soon_threadsafe(self._deliver, item)
+
+    def _deliver(self, item: Dict[str, Any]) -> None:
+        job_id = item["job_id"]
+        self.published += 1
+        for queue in self._subscribers.get(job_id, ()):
+            if queue.full():
+                # Slow consumer: drop its oldest event rather than grow without bound
+                queue.get_nowait()
+            queue.put_nowait(item)
+
+        if item["event"] == "status" and item["data"].get("status") in TERMINAL_STATUSES:
+            # Nothing follows a terminal status; late subscribers read the job store instead
+            self._history.pop(job_id, None)
+        else:
+            self._history.setdefault(job_id, deque(maxlen=self.history_size)).append(item)
+
+    def history(self, job_id: str) -> List[Dict[str, Any]]:
+        return list(self._history.get(job_id, ()))
+
+    @contextmanager
+    def subscribe(self, job_id: str) -> Iterator[asyncio.Queue]:
+        """Context manager yielding a queue that receives every event published for job_id"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[job_id]
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "published": self.published,
+            "relayed": self.relayed,
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "jobs_with_history": len(self._history),
+        }
@@ -0,0 +1,229 @@
+import os
+import logging
+import time
+import asyncio
+import functools
+import threading
+import multiprocessing
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the executor queue has no room for another job"""
+
+
+class _CallbackSink:
+    """Progress sink for thread pools: put() calls the callback directly in the worker thread"""
+
+    def __init__(self, callback: Callable[[Any], None]):
+        self.callback = callback
+
+    def put(self, item: Any) -> None:
+        try:
+            self.callback(item)
+        except Exception as e:
+            logger.error(f"Error handling job progress: {str(e)}", exc_info=True)
+
+
+def _pump_progress(queue, callback: Callable[[Any], None]) -> None:
+    """Forward progress from a process pool worker until the stop marker arrives"""
+    sink = _CallbackSink(callback)
+    while True:
+        item = queue.get()
+        if item is None:
+            return
+        sink.put(item)
+
+
+class JobExecutor:
+    """
+    Runs blocking workflow functions off the event loop.
+
+    Jobs are executed on a thread or process pool. A bounded number of jobs may
+    wait for a slot, and each job key (usually the agent name) can be capped to a
+    lower concurrency than the pool size. Queue depth, wait time and run time are
+    tracked so they can be exposed through the API.
+
+    Functions that report progress accept a ``progress`` argument with a put()
+    method. With a process pool, progress travels through a managed queue and is
+    handed to the callback on a pump thread in the server process.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 4,
+        max_queue: int = 100,
+        concurrency_limits: Optional[Dict[str, int]] = None,
+        sample_size: int = 200,
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unsupported executor kind: {kind}")
+
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.concurrency_limits = dict(concurrency_limits or {})
+
+        if kind == "process":
+            self._pool = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-worker")
+
+        self._manager = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._queued = 0
+        self._running: Dict[str, int] = {}
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_times = deque(maxlen=sample_size)
+        self._run_times = deque(maxlen=sample_size)
+
+        logger.info(
+            f"Job executor started: {kind} pool with {max_workers} worker(s), "
+            f"queue size {max_queue}, limits {self.concurrency_limits or 'none'}"
+        )
+
+    @property
+    def saturated(self) -> bool:
+        """True when no further job can be queued"""
+        return self._queued >= self.max_queue
+
+    def _semaphore(self, key: str) -> asyncio.Semaphore:
+        if key not in self._semaphores:
+            limit = min(self.concurrency_limits.get(key, self.max_workers), self.max_workers)
+            self._semaphores[key] = asyncio.Semaphore(max(limit, 1))
+        return self._semaphores[key]
+
+    @contextmanager
+    def _progress_channel(self, on_progress: Optional[Callable[[Any], None]]):
+        if on_progress is None:
+            yield None
+            return
+        if self.kind == "thread":
+            yield _CallbackSink(on_progress)
+            return
+
+        if self._manager is None:
+            self._manager = multiprocessing.Manager()
+        queue = self._manager.Queue()
+        pump = threading.Thread(target=_pump_progress, args=(queue, on_progress), daemon=True)
+        pump.start()
+        try:
+            yield queue
+        finally:
+            queue.put(None)
+            pump.join(timeout=5)
+
+    async def run(self, fn: Callable[..., Any], *args, key: str = "default",
+                  on_progress: Optional[Callable[[Any], None]] = None, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) on the pool and return its result.
+
+        If on_progress is given, fn is called with an extra progress argument and
+        every progress.put(item) ends up in on_progress(item). The callback runs
+        outside the event loop, so it must be thread-safe.
+
+        Raises:
+            QueueFullError: If the queue is already at max_queue
+        """
+        if self.saturated:
+            self._rejected += 1
+            raise QueueFullError(f"Job queue is full ({self.max_queue} waiting)")
+
+        enqueued_at = time.monotonic()
+        self._queued += 1
+        waiting = True
+        try:
+            async with self._semaphore(key):
+                self._queued -= 1
+                waiting = False
+                started_at = time.monotonic()
+                self._wait_times.append(started_at - enqueued_at)
+                self._running[key] = self._running.get(key, 0) + 1
+
+                loop = asyncio.get_running_loop()
+                try:
+                    with self._progress_channel(on_progress) as progress:
+                        if progress is not None:
+                            kwargs["progress"] = progress
+                        result = await loop.run_in_executor(self._pool, functools.partial(fn, *args, **kwargs))
+                    self._completed += 1
+                    return result
+                except Exception:
+                    self._failed += 1
+                    raise
+                finally:
+                    self._running[key] -= 1
+                    self._run_times.append(time.monotonic() - started_at)
+        finally:
+            if waiting:
+                self._queued -= 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Live snapshot of queue depth, wait time and run time"""
+        def summarize(samples: deque) -> Dict[str, Optional[float]]:
+            if not samples:
+                return {"avg": None, "p95": None, "max": None}
+            ordered = sorted(samples)
+            return {
+                "avg": round(sum(ordered) / len(ordered), 3),
+                "p95": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 3),
+                "max": round(ordered[-1], 3),
+            }
+
+        return {
+            "executor": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "queue_depth": self._queued,
+            "running": {key: count for key, count in self._running.items() if count},
+            "concurrency_limits": self.concurrency_limits,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "wait_time_seconds": summarize(self._wait_times),
+            "run_time_seconds": summarize(self._run_times),
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+
+def _parse_limits(value: str) -> Dict[str, int]:
+    """Parse 'llms_txt=2,nft=1' into {'llms_txt': 2, 'nft': 1}"""
+    limits = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        key, limit = item.split("=", 1)
+        try:
+            limits[key.strip()] = int(limit)
+        except ValueError:
+            logger.warning(f"Ignoring invalid concurrency limit: {item}")
+    return limits
+
+
+def create_job_executor() -> JobExecutor:
+    """
+    Create a job executor from the environment:
+        JOB_EXECUTOR: "thread" (default) or "process"
+        JOB_WORKERS: pool size (default: 4)
+        JOB_QUEUE_SIZE: maximum number of waiting jobs (default: 100)
+        JOB_CONCURRENCY_LIMITS: per-agent limits, e.g. "llms_txt=2,nft=1"
+    """
+    return JobExecutor(
+        kind=os.getenv("JOB_EXECUTOR", "thread").lower(),
+        max_workers=int(os.getenv("JOB_WORKERS", "4")),
+        max_queue=int(os.getenv("JOB_QUEUE_SIZE", "100")),
+        concurrency_limits=_parse_limits(os.getenv("JOB_CONCURRENCY_LIMITS", "")),
+    )
@@ -0,0 +1,327 @@
+import os
+import logging
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Any, Iterator, List, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Job statuses that still need payment monitoring or execution
+PENDING_STATUSES = ("awaiting_payment", "running")
+
+# Fields mirrored into indexed columns so lookups never have to decode the JSON blob
+INDEXED_FIELDS = ("status", "payment_status", "payment_id", "identifier_from_purchaser")
+
+
+class JobStore:
+    """
+    Interface for job persistence backends.
+
+    A job is a plain JSON-serializable dict. Every backend must support O(1)
+    lookups by job_id, indexed lookups by payment_id and identifier_from_purchaser,
+    and a bulk scan of jobs that are still pending.
+    """
+
+    def create(self, job_id: str, job: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def update(self, job_id: str, **fields) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def get_by_payment_id(self, payment_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def list_by_purchaser(self, identifier_from_purchaser: str) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def iter_pending(self, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __contains__(self, job_id: str) -> bool:
+        return self.get(job_id) is not None
+
+
+class SQLiteJobStore(JobStore):
+    """Embedded job store backed by a single SQLite database in WAL mode"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                payment_status TEXT,
+                payment_id TEXT,
+                identifier_from_purchaser TEXT,
+                data TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_payment_id ON jobs(payment_id);
+            CREATE INDEX IF NOT EXISTS idx_jobs_purchaser ON jobs(identifier_from_purchaser);
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at);
+            """
+        )
+        logger.info(f"Job store opened at {path}")
+
+    def _row_to_job(self, row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = json.loads(row["data"])
+        job["job_id"] = row["job_id"]
+        job["created_at"] = row["created_at"]
+        job["updated_at"] = row["updated_at"]
+        return job
+
+    def create(self, job_id: str, job: Dict[str, Any]) -> Dict[str, Any]:
+        now = time.time()
+        job = dict(job)
+        job.setdefault("status", "awaiting_payment")
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, status, payment_status, payment_id, identifier_from_purchaser, "
+                "data, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    job["status"],
+                    job.get("payment_status"),
+                    job.get("payment_id"),
+                    job.get("identifier_from_purchaser"),
+                    json.dumps(job),
+                    now,
+                    now,
+                ),
+            )
+        job.update({"job_id": job_id, "created_at": now, "updated_at": now})
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row)
+
+    def update(self, job_id: str, **fields) -> Optional[Dict[str, Any]]:
+        """Merge fields into a job record and return the updated job (None if unknown)"""
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock up front so concurrent processes
+            # sharing the database cannot interleave read-modify-write cycles
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+                if row is None:
+                    self._conn.execute("ROLLBACK")
+                    return None
+
+                job = json.loads(row["data"])
+                job.update(fields)
+                now = time.time()
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, payment_status = ?, payment_id = ?, "
+                    "identifier_from_purchaser = ?, data = ?, updated_at = ? WHERE job_id = ?",
+                    (
+                        job.get("status"),
+                        job.get("payment_status"),
+                        job.get("payment_id"),
+                        job.get("identifier_from_purchaser"),
+                        json.dumps(job),
+                        now,
+                        job_id,
+                    ),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        job.update({"job_id": job_id, "created_at": row["created_at"], "updated_at": now})
+        return job
+
+    def get_by_payment_id(self, payment_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE payment_id = ?", (payment_id,)).fetchone()
+        return self._row_to_job(row)
+
+    def list_by_purchaser(self, identifier_from_purchaser: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE identifier_from_purchaser = ? ORDER BY created_at",
+                (identifier_from_purchaser,),
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def iter_pending(self, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Yield unfinished jobs oldest first, fetching them in batches"""
+        placeholders = ", ".join("?" for _ in PENDING_STATUSES)
+        last_created_at, last_job_id = -1.0, ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT * FROM jobs WHERE status IN ({placeholders}) "
+                    "AND (created_at, job_id) > (?, ?) ORDER BY created_at, job_id LIMIT ?",
+                    (*PENDING_STATUSES, last_created_at, last_job_id, batch_size),
+                ).fetchall()
+            for row in rows:
+                yield self._row_to_job(row)
+            if len(rows) < batch_size:
+                return
+            last_created_at, last_job_id = rows[-1]["created_at"], rows[-1]["job_id"]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisJobStore(JobStore):
+    """
+    Job store on a Redis-compatible server, shared by every worker and node.
+
+    Each job is one JSON string. Secondary indexes are kept next to it: a
+    payment_id -> job_id key, a set of job ids per purchaser and a sorted set
+    of pending jobs scored by creation time. Updates are optimistic
+    WATCH/MULTI transactions.
+    """
+
+    def __init__(self, url: str, prefix: str = "masumi"):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("The Redis job store requires the redis package: pip install redis") from e
+
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._watch_error = redis.WatchError
+        logger.info(f"Job store connected to {urlparse(url).hostname}")
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self.prefix, *parts))
+
+    def _index(self, pipe, job_id: str, job: Dict[str, Any]) -> None:
+        if job.get("payment_id"):
+            pipe.set(self._key("payment", job["payment_id"]), job_id)
+        if job.get("identifier_from_purchaser"):
+            pipe.sadd(self._key("purchaser", job["identifier_from_purchaser"]), job_id)
+        if job.get("status") in PENDING_STATUSES:
+            pipe.zadd(self._key("pending"), {job_id: job["created_at"]})
+        else:
+            pipe.zrem(self._key("pending"), job_id)
+
+    def create(self, job_id: str, job: Dict[str, Any]) -> Dict[str, Any]:
+        now = time.time()
+        job = dict(job)
+        job.setdefault("status", "awaiting_payment")
+        job.update({"job_id": job_id, "created_at": now, "updated_at": now})
+
+        pipe = self._redis.pipeline()
+        pipe.set(self._key("job", job_id), json.dumps(job))
+        self._index(pipe, job_id, job)
+        pipe.execute()
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        data = self._redis.get(self._key("job", job_id))
+        return json.loads(data) if data else None
+
+    def update(self, job_id: str, **fields) -> Optional[Dict[str, Any]]:
+        """Merge fields into a job record and return the updated job (None if unknown)"""
+        key = self._key("job", job_id)
+        with self._redis.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    data = pipe.get(key)
+                    if data is None:
+                        pipe.unwatch()
+                        return None
+
+                    job = json.loads(data)
+                    job.update(fields)
+                    job["updated_at"] = time.time()
+                    pipe.multi()
+                    pipe.set(key, json.dumps(job))
+                    self._index(pipe, job_id, job)
+                    pipe.execute()
+                    return job
+                except self._watch_error:
+                    # Another worker changed the job in between; retry on the new version
+                    continue
+
+    def get_by_payment_id(self, payment_id: str) -> Optional[Dict[str, Any]]:
+        job_id = self._redis.get(self._key("payment", payment_id))
+        return self.get(job_id) if job_id else None
+
+    def list_by_purchaser(self, identifier_from_purchaser: str) -> List[Dict[str, Any]]:
+        job_ids = list(self._redis.smembers(self._key("purchaser", identifier_from_purchaser)))
+        if not job_ids:
+            return []
+        values = self._redis.mget([self._key("job", job_id) for job_id in job_ids])
+        jobs = [json.loads(value) for value in values if value]
+        return sorted(jobs, key=lambda job: job["created_at"])
+
+    def iter_pending(self, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Yield unfinished jobs oldest first, fetching them in batches"""
+        min_score, skip = "-inf", 0
+        while True:
+            entries = self._redis.zrangebyscore(
+                self._key("pending"), min_score, "+inf", start=skip, num=batch_size, withscores=True
+            )
+            if not entries:
+                return
+            values = self._redis.mget([self._key("job", job_id) for job_id, _ in entries])
+            for value in values:
+                if value:
+                    yield json.loads(value)
+            if len(entries) < batch_size:
+                return
+
+            # Continue from the last score, skipping the entries already seen with it
+            last_score = entries[-1][1]
+            seen_with_score = sum(1 for _, score in entries if score == last_score)
+            skip = seen_with_score + (skip if min_score == last_score else 0)
+            min_score = last_score
+
+    def close(self) -> None:
+        self._redis.close()
+
+
+def sqlite_path(url: str, default: str = "data/jobs.db") -> str:
+    """sqlite:///data/jobs.db -> data/jobs.db, sqlite:////var/jobs.db -> /var/jobs.db"""
+    path = url[len("sqlite:///"):] if url.startswith("sqlite:///") else urlparse(url).path
+    return path or default
+
+
+def create_job_store(url: Optional[str] = None) -> JobStore:
+    """
+    Create a job store from a URL (default: JOB_STORE_URL or sqlite:///data/jobs.db).
+
+    Supported schemes:
+        sqlite:///relative/path.db or sqlite:////absolute/path.db
+        redis://host:6379/0 or rediss://... (any Redis-compatible server)
+    """
+    url = url or os.getenv("JOB_STORE_URL", "sqlite:///data/jobs.db")
+    parsed = urlparse(url)
+
+    if parsed.scheme == "sqlite":
+        return SQLiteJobStore(sqlite_path(url))
+    if parsed.scheme in ("redis", "rediss"):
+        return RedisJobStore(url)
+
+    raise ValueError(f"Unsupported job store URL: {url}")
@@ -0,0 +1,307 @@
+import os
+import logging
+import time
+import asyncio
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# A payment is paid and its job can start once it reaches one of these on-chain
+# states or next actions; the same rules as masumi's Payment.start_status_monitoring
+READY_STATES = ("FundsLocked", "Complete")
+READY_ACTIONS = ("PaymentComplete", "None")
+
+# Tolerance between the payment service's createdAt and the time a job registered its payment
+CREATED_AT_SLACK = 300.0
+
+# (maximum job age in seconds, multiplier of the base interval): young jobs are
+# checked often, jobs that have been waiting for hours much less frequently
+DEFAULT_INTERVAL_TIERS = ((300, 1), (3600, 3), (86400, 12), (None, 30))
+
+PaymentCallback = Callable[[str], Awaitable[None]]
+
+
+class PaymentPoller:
+    """
+    Single background poller for every outstanding payment of this server.
+
+    Instead of one Masumi monitoring loop per job, the due
+    blockchainIdentifiers are resolved together from the newest pages of the
+    GET /payment/ listing on one pooled HTTP client. Paging stops once every
+    due payment is found or the listing reaches payments older than all of
+    them, so the traffic follows the pending payments, not the size of the
+    payment history. Payments the listing did not cover are resolved
+    individually. Each payment is re-checked on an interval that grows with
+    its age, and its callback is dispatched once it is paid.
+    """
+
+    def __init__(
+        self,
+        payment_service_url: str,
+        payment_api_key: str,
+        network: str,
+        base_interval: float = 10.0,
+        interval_tiers=DEFAULT_INTERVAL_TIERS,
+        page_size: int = 100,
+        max_pages: int = 5,
+        timeout: float = 15.0,
+        status_cache=None,
+    ):
+        self.payment_service_url = (payment_service_url or "").rstrip("/")
+        self.payment_api_key = payment_api_key
+        self.network = network
+        self.base_interval = base_interval
+        self.interval_tiers = interval_tiers
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.timeout = timeout
+        # Optional PaymentStatusCache that receives every observed state
+        self.status_cache = status_cache
+
+        self._tracked: Dict[str, dict] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._callback_tasks = set()
+        self.requests_sent = 0
+
+    # ── Registration ─────────────────────────────────────────────────────────
+    def register(self, payment_id: str, callback: PaymentCallback, created_at: Optional[float] = None) -> None:
+        """Start tracking a payment; callback(payment_id) runs once it is paid"""
+        now = time.time()
+        self._tracked[payment_id] = {
+            "callback": callback,
+            "created_at": created_at or now,
+            "next_check": now + self.base_interval,
+            "status": None,
+        }
+        self._wakeup.set()
+        logger.info(f"Tracking payment {payment_id} ({len(self._tracked)} outstanding)")
+
+    def unregister(self, payment_id: str) -> None:
+        self._tracked.pop(payment_id, None)
+
+    def __contains__(self, payment_id: str) -> bool:
+        return payment_id in self._tracked
+
+    @property
+    def outstanding(self) -> int:
+        return len(self._tracked)
+
+    def _interval_for(self, created_at: float, now: float) -> float:
+        age = now - created_at
+        for max_age, multiplier in self.interval_tiers:
+            if max_age is None or age < max_age:
+                return self.base_interval * multiplier
+        return self.base_interval
+
+    # ── Lifecycle ────────────────────────────────────────────────────────────
+    async def start(self) -> None:
+        if self._task:
+            return
+        self._client = httpx.AsyncClient(
+            headers={"token": self.payment_api_key, "Content-Type": "application/json"},
+            timeout=httpx.Timeout(self.timeout, connect=5.0),
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+        )
+        self._task = asyncio.create_task(self._run())
+        logger.info("Payment poller started")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+        logger.info("Payment poller stopped")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error during payment polling: {str(e)}", exc_info=True)
+
+            # Sleep until the next payment is due, or until a new one is registered
+            now = time.time()
+            next_due = min((entry["next_check"] for entry in self._tracked.values()), default=now + self.base_interval)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(next_due - now, 0.5))
+            except asyncio.TimeoutError:
+                pass
+
+    # ── Polling ──────────────────────────────────────────────────────────────
+    async def poll_once(self) -> Dict[str, Optional[str]]:
+        """Check every payment that is due and dispatch callbacks; returns the observed states"""
+        now = time.time()
+        due = [payment_id for payment_id, entry in self._tracked.items() if entry["next_check"] <= now]
+        if not due:
+            return {}
+
+        try:
+            payments = await self.fetch_payments(due)
+        except Exception:
+            # Back off instead of hammering the payment service while it is failing
+            retry_at = time.time() + self.base_interval
+            for payment_id in due:
+                if payment_id in self._tracked:
+                    self._tracked[payment_id]["next_check"] = retry_at
+            raise
+
+        now = time.time()
+        states = {payment_id: on_chain_state(payment) for payment_id, payment in payments.items()}
+        for payment_id in due:
+            entry = self._tracked.get(payment_id)
+            if entry is None:
+                continue
+            state = states.get(payment_id)
+            entry["status"] = state
+            if self.status_cache is not None:
+                self.status_cache.set(payment_id, state)
+            entry["next_check"] = now + self._interval_for(entry["created_at"], now)
+
+            if payment_ready(payments.get(payment_id)):
+                logger.info(f"Payment {payment_id} is paid ({state}, next action {next_action(payments[payment_id])}), "
+                            f"dispatching callback")
+                self.unregister(payment_id)
+                task = asyncio.create_task(entry["callback"](payment_id))
+                self._callback_tasks.add(task)
+                task.add_done_callback(self._callback_tasks.discard)
+
+        logger.info(f"Checked {len(due)} payment(s), {self.outstanding} still outstanding")
+        return states
+
+    async def fetch_statuses(self, payment_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Resolve the on-chain state of many payments at once; see fetch_payments"""
+        payments = await self.fetch_payments(payment_ids)
+        return {payment_id: on_chain_state(payment) for payment_id, payment in payments.items()}
+
+    async def fetch_payments(self, payment_ids: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """
+        Resolve the payment records of many payments at once.
+
+        A single payment is resolved directly. Otherwise GET /payment/ is paged,
+        newest first, until every id is found, a page reaches payments created
+        before the oldest tracked id, a short page is returned or max_pages is
+        reached. Ids the listing did not cover are resolved one by one. Ids that
+        cannot be resolved map to None.
+        """
+        if self._client is None:
+            raise RuntimeError("Payment poller is not started")
+
+        wanted = set(payment_ids)
+        if len(wanted) == 1:
+            payment_id = next(iter(wanted))
+            return {payment_id: await self._resolve_single(payment_id)}
+
+        # Payments of untracked ids may be of any age, so only tracked ones bound the listing
+        registered = [self._tracked[payment_id]["created_at"] for payment_id in wanted if payment_id in self._tracked]
+        oldest = min(registered) - CREATED_AT_SLACK if len(registered) == len(wanted) else None
+
+        payments: Dict[str, Optional[dict]] = {}
+        cursor_id = None
+        exhausted = False
+
+        for _ in range(self.max_pages):
+            params = {"network": self.network, "limit": self.page_size}
+            if cursor_id:
+                params["cursorId"] = cursor_id
+            response = await self._client.get(f"{self.payment_service_url}/payment/", params=params)
+            self.requests_sent += 1
+            response.raise_for_status()
+
+            data = response.json().get("data", {}) or {}
+            page = data.get("Payments", []) or []
+            for payment in page:
+                payment_id = payment.get("blockchainIdentifier")
+                if payment_id in wanted:
+                    payments[payment_id] = payment
+
+            if wanted.issubset(payments):
+                break
+            cursor_id = data.get("cursorId") or (page[-1].get("id") if page else None)
+            if len(page) < self.page_size or not cursor_id:
+                exhausted = True
+                break
+            # Older pages cannot hold the remaining ids; resolve those individually
+            last_created = _created_at(page[-1])
+            if oldest is not None and last_created is not None and last_created < oldest:
+                break
+
+        # Payments missing from a complete listing simply do not exist yet; only
+        # resolve the ones that may sit beyond the pages we scanned
+        for payment_id in wanted - set(payments):
+            payments[payment_id] = None if exhausted else await self._resolve_single(payment_id)
+        return payments
+
+    async def _resolve_single(self, payment_id: str) -> Optional[dict]:
+        try:
+            response = await self._client.post(
+                f"{self.payment_service_url}/payment/resolve-blockchain-identifier",
+                json={"network": self.network, "blockchainIdentifier": payment_id, "includeHistory": "false"},
+            )
+            self.requests_sent += 1
+            if response.status_code != 200:
+                return None
+            return response.json().get("data") or None
+        except httpx.HTTPError as e:
+            logger.warning(f"Could not resolve payment {payment_id}: {str(e)}")
+            return None
+
+    def metrics(self) -> Dict[str, object]:
+        return {
+            "outstanding_payments": self.outstanding,
+            "requests_sent": self.requests_sent,
+        }
+
+
+def on_chain_state(payment: Optional[dict]) -> Optional[str]:
+    return (payment or {}).get("onChainState")
+
+
+def next_action(payment: Optional[dict]) -> Optional[str]:
+    return ((payment or {}).get("NextAction") or {}).get("requestedAction")
+
+
+def payment_ready(payment: Optional[dict]) -> bool:
+    """Whether a payment record shows the purchaser paid, so its job can start"""
+    if not payment:
+        return False
+    return on_chain_state(payment) in READY_STATES or next_action(payment) in READY_ACTIONS
+
+
+def _created_at(payment: dict) -> Optional[float]:
+    """The createdAt of a listed payment as a timestamp, or None if it is missing or malformed"""
+    try:
+        return datetime.fromisoformat(payment["createdAt"].replace("Z", "+00:00")).timestamp()
+    except (KeyError, AttributeError, ValueError):
+        return None
+
+
+def create_payment_poller(payment_service_url: str, payment_api_key: str, network: str,
+                          status_cache=None) -> PaymentPoller:
+    """
+    Create the payment poller from the environment:
+        PAYMENT_POLL_INTERVAL: base interval in seconds for new payments (default: 10)
+        PAYMENT_POLL_PAGE_SIZE: payments fetched per listing page (default: 100)
+        PAYMENT_POLL_MAX_PAGES: listing pages scanned per poll (default: 5)
+    """
+    return PaymentPoller(
+        payment_service_url=payment_service_url,
+        payment_api_key=payment_api_key,
+        network=network,
+        base_interval=float(os.getenv("PAYMENT_POLL_INTERVAL", "10")),
+        page_size=int(os.getenv("PAYMENT_POLL_PAGE_SIZE", "100")),
+        max_pages=int(os.getenv("PAYMENT_POLL_MAX_PAGES", "5")),
+        status_cache=status_cache,
+    )
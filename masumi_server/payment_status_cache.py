@@ -0,0 +1,94 @@
+import os
+import logging
+import time
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentStatusCache:
+    """
+    Per-payment TTL cache of on-chain payment states.
+
+    The payment poller writes every state it observes, so /status is normally
+    served from memory. When an entry is older than the TTL, concurrent readers
+    share a single upstream check instead of each issuing their own.
+    """
+
+    def __init__(self, ttl: float = 15.0):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[Optional[str], float]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def set(self, payment_id: str, status: Optional[str]) -> None:
+        self._entries[payment_id] = (status, time.monotonic())
+
+    def discard(self, payment_id: str) -> None:
+        self._entries.pop(payment_id, None)
+
+    def peek(self, payment_id: str) -> Tuple[Optional[str], Optional[float]]:
+        """Return (status, age in seconds) without triggering a check; age is None if unknown"""
+        if payment_id not in self._entries:
+            return None, None
+        status, stored_at = self._entries[payment_id]
+        return status, time.monotonic() - stored_at
+
+    async def get(self, payment_id: str, loader: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        """Return a status no older than the TTL, loading it through loader() at most once at a time"""
+        status, age = self.peek(payment_id)
+        if age is not None and age <= self.ttl:
+            self.hits += 1
+            return status
+
+        if payment_id in self._inflight:
+            self.coalesced += 1
+            shared = self._inflight[payment_id]
+            try:
+                return await asyncio.shield(shared)
+            except asyncio.CancelledError:
+                # The reader that was loading got cancelled, not this one: load again
+                if shared.cancelled() and not asyncio.current_task().cancelling():
+                    return await self.get(payment_id, loader)
+                raise
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[payment_id] = future
+        try:
+            status = await loader()
+            self.set(payment_id, status)
+            future.set_result(status)
+            return status
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieve the exception so an unawaited future does not log a warning
+            future.exception()
+            raise
+        except BaseException:
+            # Cancellation escapes "except Exception"; waiters must not hang on the future
+            future.cancel()
+            raise
+        finally:
+            if self._inflight.get(payment_id) is future:
+                del self._inflight[payment_id]
+
+    def metrics(self) -> Dict[str, object]:
+        return {
+            "entries": len(self._entries),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+
+def create_payment_status_cache() -> PaymentStatusCache:
+    """
+    Create the payment status cache from the environment:
+        PAYMENT_STATUS_TTL: maximum staleness of /status payment data in seconds (default: 15)
+    """
+    return PaymentStatusCache(ttl=float(os.getenv("PAYMENT_STATUS_TTL", "15")))
@@ -0,0 +1,607 @@
+import os
+import json
+import uuid
+import asyncio
+import inspect
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+import uvicorn
+from fastapi import FastAPI, Query, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from masumi.config import Config
+from masumi.payment import Payment, Amount
+from .job_store import create_job_store, PENDING_STATUSES
+from .job_executor import create_job_executor
+from .payment_poller import create_payment_poller
+from .payment_status_cache import create_payment_status_cache
+from .event_bus import JobEventBus, TERMINAL_STATUSES
+from .shared_state import create_event_relay, create_lease_keeper, default_worker_id, multi_worker_enabled
+
+logger = logging.getLogger(__name__)
+
+MAX_STATUS_WAIT = 60
+MAX_PROGRESS_EVENTS = 20
+SSE_HEARTBEAT_SECONDS = 15
+
+
+class AgentServer:
+    """
+    MIP-003 server runtime shared by all agents.
+
+    An agent provides its workflow, a function that runs one job to completion
+    and returns its final RunResponse (or plain result), together with its input
+    schema. The server adds everything else: Masumi payment requests, one
+    multiplexed payment poller, the persistent job store, the bounded job
+    executor, status long-polling and streaming, payment leases for multi-worker
+    deployments and /metrics.
+
+    Workflows that accept a ``progress`` argument get a sink whose put(event)
+    calls are stored on the job and streamed to clients. An optional ``metrics``
+    callable adds agent-specific figures (caches, clients) to /metrics.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        workflow: Callable[..., Any],
+        input_schema: Dict[str, Any],
+        input_model: Optional[Type[BaseModel]] = None,
+        prepare_input: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+        example_input: Optional[Dict[str, str]] = None,
+        metrics: Optional[Callable[[], Dict[str, Any]]] = None,
+        title: str = "API following the Masumi API Standard",
+        description: str = "API for running Agentic Services tasks with Masumi payment integration",
+    ):
+        self.name = name
+        self.workflow = workflow
+        self.input_schema = input_schema
+        self.input_model = input_model
+        self.prepare_input = prepare_input or dict
+        self.example_input = example_input or {}
+        self.agent_metrics = metrics
+        self.reports_progress = "progress" in inspect.signature(workflow).parameters
+
+        # /start_jobs: payment requests created in parallel per batch, and the batch size limit
+        self.batch_concurrency = int(os.getenv("START_JOBS_CONCURRENCY", "8"))
+        self.max_batch_size = int(os.getenv("START_JOBS_MAX_BATCH", "100"))
+
+        self.payment_service_url = os.getenv("PAYMENT_SERVICE_URL")
+        self.payment_api_key = os.getenv("PAYMENT_API_KEY")
+        self.network = os.getenv("NETWORK")
+        self.config = Config(
+            payment_service_url=self.payment_service_url,
+            payment_api_key=self.payment_api_key
+        )
+        logger.info(f"Starting {name} server with PAYMENT_SERVICE_URL: {self.payment_service_url}")
+
+        # Persistent job store; payment instances are live objects rebuilt from it
+        self.jobs = create_job_store()
+        self.payment_instances: Dict[str, Payment] = {}
+
+        # Each outstanding payment is monitored by the worker that holds its lease
+        self.worker_id = default_worker_id()
+        self.lease_keeper = create_lease_keeper(self.worker_id)
+
+        # Workflows run on a worker pool so they never block the event loop
+        self.executor = create_job_executor()
+
+        # One poller checks every outstanding payment and feeds the status cache
+        self.payment_status_cache = create_payment_status_cache()
+        self.payment_poller = create_payment_poller(
+            self.payment_service_url, self.payment_api_key, self.network, self.payment_status_cache
+        )
+
+        # Pushes job transitions and progress to waiting clients (and other workers)
+        self.event_bus = JobEventBus(relay=create_event_relay(self.worker_id))
+
+        self.app = FastAPI(title=title, description=description, version="1.0.0")
+        self.app.router.on_startup.append(self.startup)
+        self.app.router.on_shutdown.append(self.shutdown)
+        self._register_routes()
+
+    # ── Task execution ───────────────────────────────────────────────────────
+    async def execute_task(self, input_data: dict, on_progress=None) -> Any:
+        """ Runs the workflow on the job executor, reporting progress to on_progress """
+        logger.info(f"Starting {self.name} task with input: {input_data}")
+        result = await self.executor.run(
+            self.workflow,
+            key=self.name,
+            on_progress=on_progress if self.reports_progress else None,
+            **self.prepare_input(input_data)
+        )
+
+        content = getattr(result, "content", result)
+        if not content:
+            logger.error("No response from workflow")
+            raise Exception(f"Failed to get response from {self.name} workflow")
+        logger.info(f"{self.name} task completed successfully: {str(content)[:100]}...")
+        return result
+
+    # ── Payment helpers ──────────────────────────────────────────────────────
+    def create_payment(self, identifier_from_purchaser: str, input_data: dict) -> Payment:
+        """ Builds a Masumi payment instance for a job """
+        return Payment(
+            agent_identifier=os.getenv("AGENT_IDENTIFIER"),
+            config=self.config,
+            identifier_from_purchaser=identifier_from_purchaser,
+            input_data=input_data,
+            network=self.network
+        )
+
+    async def start_payment_monitoring(self, job_id: str, payment: Payment, created_at: float = None) -> None:
+        """ Registers the payment instance and its payments with the shared poller """
+        async def payment_callback(payment_id: str):
+            await self.handle_payment_status(job_id, payment_id)
+
+        self.payment_instances[job_id] = payment
+        logger.info(f"Starting payment status monitoring for job {job_id}")
+        for payment_id in payment.payment_ids:
+            self.payment_poller.register(payment_id, payment_callback, created_at=created_at)
+
+    def stop_payment_monitoring(self, job_id: str) -> None:
+        """ Stops monitoring and drops the payment instance of a job """
+        payment = self.payment_instances.pop(job_id, None)
+        if payment:
+            for payment_id in payment.payment_ids:
+                self.payment_poller.unregister(payment_id)
+                self.payment_status_cache.discard(payment_id)
+                self.lease_keeper.release(payment_id)
+
+    def update_job(self, job_id: str, **fields) -> dict:
+        """ Updates a job in the store and publishes status changes on the event bus """
+        job = self.jobs.update(job_id, **fields)
+        if job and ("status" in fields or "payment_status" in fields):
+            self.event_bus.publish(job_id, "status", {
+                "status": job["status"],
+                "payment_status": job["payment_status"]
+            })
+        return job
+
+    def record_progress(self, job_id: str, event: dict) -> None:
+        """ Appends a workflow progress event to the job and publishes it (runs in worker threads) """
+        job = self.jobs.get(job_id)
+        if job is None:
+            return
+        progress = (job.get("progress") or [])[-(MAX_PROGRESS_EVENTS - 1):] + [event]
+        self.jobs.update(job_id, progress=progress)
+        self.event_bus.publish(job_id, "progress", event)
+
+    async def fetch_payment_status(self, payment_id: str):
+        """ Fetches the on-chain state of a single payment from the payment service """
+        states = await self.payment_poller.fetch_statuses([payment_id])
+        return states.get(payment_id)
+
+    async def claim_pending_jobs(self) -> int:
+        """ Takes over payment monitoring for unfinished jobs whose payment no worker holds a lease on """
+        candidates = [job for job in self.jobs.iter_pending() if job["job_id"] not in self.payment_instances]
+        if not candidates:
+            return 0
+
+        held_elsewhere = self.lease_keeper.store.active(job["payment_id"] for job in candidates)
+        claimed = 0
+        for job in candidates:
+            if job["payment_id"] in held_elsewhere or not self.lease_keeper.acquire(job["payment_id"]):
+                continue
+            job_id = job["job_id"]
+            if job["status"] == "running":
+                # The task was interrupted before completing the payment, so the funds are
+                # still locked and the job runs again once monitoring reports them
+                self.update_job(job_id, status="awaiting_payment")
+            payment = self.create_payment(job["identifier_from_purchaser"], job["input_data"])
+            payment.payment_ids.add(job["payment_id"])
+            await self.start_payment_monitoring(job_id, payment, created_at=job["created_at"])
+            claimed += 1
+
+        if claimed:
+            logger.info(f"Worker {self.worker_id} took over payment monitoring for {claimed} pending job(s)")
+        return claimed
+
+    async def handle_lost_lease(self, payment_id: str) -> None:
+        """ Stops monitoring a payment whose lease was taken over by another worker """
+        job = self.jobs.get_by_payment_id(payment_id)
+        if job and job["job_id"] in self.payment_instances and job["status"] != "running":
+            self.stop_payment_monitoring(job["job_id"])
+
+    async def startup(self) -> None:
+        """ Starts the payment poller and claims jobs that were unfinished when their worker stopped """
+        self.event_bus.bind_loop(asyncio.get_running_loop())
+        await self.payment_poller.start()
+        await self.lease_keeper.start(on_lost=self.handle_lost_lease, claim=self.claim_pending_jobs)
+
+    async def shutdown(self) -> None:
+        """ Stops the payment poller and the job executor, releases leases and closes the job store """
+        for job_id in list(self.payment_instances):
+            self.stop_payment_monitoring(job_id)
+        await self.lease_keeper.stop()
+        await self.payment_poller.stop()
+        await self.event_bus.close()
+        self.executor.shutdown()
+        self.jobs.close()
+
+    # ── Job lifecycle ────────────────────────────────────────────────────────
+    async def start_job(self, identifier_from_purchaser: str, input_data: Dict[str, str]) -> dict:
+        """ Validates the input, creates the payment request and stores the job """
+        if self.input_model is not None:
+            self.input_model(**input_data)
+
+        job_id = str(uuid.uuid4())
+        agent_identifier = os.getenv("AGENT_IDENTIFIER")
+        truncated_input = str(input_data)[:100] + "..." if len(str(input_data)) > 100 else str(input_data)
+        logger.info(f"Received job request with input: '{truncated_input}'")
+        logger.info(f"Starting job {job_id} with agent {agent_identifier}")
+
+        # Define payment amounts
+        payment_amount = os.getenv("PAYMENT_AMOUNT", "10000000")  # Default 10 ADA
+        payment_unit = os.getenv("PAYMENT_UNIT", "lovelace")  # Default lovelace
+        amounts = [Amount(amount=payment_amount, unit=payment_unit)]
+        logger.info(f"Using payment amount: {payment_amount} {payment_unit}")
+
+        # Create a payment request using Masumi
+        payment = self.create_payment(identifier_from_purchaser, input_data)
+        logger.info("Creating payment request...")
+        payment_request = await payment.create_payment_request()
+        payment_id = payment_request["data"]["blockchainIdentifier"]
+        payment.payment_ids.add(payment_id)
+        logger.info(f"Created payment request with ID: {payment_id}")
+
+        # Take the lease before the job becomes visible so no other worker claims it
+        leased = self.lease_keeper.acquire(payment_id)
+
+        self.jobs.create(job_id, {
+            "status": "awaiting_payment",
+            "payment_status": "pending",
+            "payment_id": payment_id,
+            "input_data": input_data,
+            "result": None,
+            "identifier_from_purchaser": identifier_from_purchaser
+        })
+        if leased:
+            await self.start_payment_monitoring(job_id, payment)
+        else:
+            # Another worker holds the lease; it (or whoever claims the job later) drives the payment
+            logger.warning(f"Payment {payment_id} of job {job_id} is leased by another worker, leaving its monitoring to the lease holder")
+
+        return {
+            "status": "success",
+            "job_id": job_id,
+            "blockchainIdentifier": payment_id,
+            "submitResultTime": payment_request["data"]["submitResultTime"],
+            "unlockTime": payment_request["data"]["unlockTime"],
+            "externalDisputeUnlockTime": payment_request["data"]["externalDisputeUnlockTime"],
+            "agentIdentifier": agent_identifier,
+            "sellerVkey": os.getenv("SELLER_VKEY"),
+            "identifierFromPurchaser": identifier_from_purchaser,
+            "amounts": amounts,
+            "input_hash": payment.input_hash
+        }
+
+    async def start_jobs(self, items: List[Tuple[str, Dict[str, str]]]) -> List[dict]:
+        """
+        Starts several jobs, creating their payment requests concurrently.
+
+        At most batch_concurrency payment requests are in flight at once. Results
+        are returned in input order; an item that fails gets an error entry
+        instead of failing the whole batch.
+        """
+        semaphore = asyncio.Semaphore(max(self.batch_concurrency, 1))
+
+        async def start_one(index: int, identifier_from_purchaser: str, input_data: Dict[str, str]) -> dict:
+            async with semaphore:
+                try:
+                    return {"index": index, **await self.start_job(identifier_from_purchaser, input_data)}
+                except ValidationError as e:
+                    errors = "; ".join(error["msg"] for error in e.errors())
+                    return {"index": index, "status": "error", "error": f"Invalid input_data: {errors}"}
+                except Exception as e:
+                    logger.error(f"Error starting batch item {index}: {str(e)}", exc_info=True)
+                    return {"index": index, "status": "error", "error": f"Could not create payment request: {str(e)}"}
+
+        return await asyncio.gather(*(
+            start_one(index, identifier_from_purchaser, input_data)
+            for index, (identifier_from_purchaser, input_data) in enumerate(items)
+        ))
+
+    async def handle_payment_status(self, job_id: str, payment_id: str) -> None:
+        """ Executes the task after payment confirmation and completes the payment """
+        try:
+            logger.info(f"Payment {payment_id} completed for job {job_id}, executing task...")
+            job = self.update_job(job_id, status="running")
+            logger.info(f"Input data: {job['input_data']}")
+
+            # Execute the AI task, storing its progress on the job as it runs
+            result = await self.execute_task(
+                job["input_data"],
+                on_progress=lambda event: self.record_progress(job_id, event)
+            )
+
+            # Handle the result correctly - if it's a RunResponse object
+            if hasattr(result, 'content'):
+                result_content = result.content
+                # Try to parse as JSON if it's a string
+                if isinstance(result_content, str):
+                    try:
+                        result_dict = json.loads(result_content)
+                    except json.JSONDecodeError:
+                        result_dict = {"result": result_content}
+                else:
+                    result_dict = {"result": str(result_content)}
+            else:
+                # If result is already a dict
+                result_dict = result if isinstance(result, dict) else {"result": str(result)}
+
+            logger.info(f"{self.name} task completed for job {job_id}")
+
+            # Mark payment as completed on Masumi
+            await self.payment_instances[job_id].complete_payment(payment_id, result_dict)
+            logger.info(f"Payment completed for job {job_id}")
+
+            self.update_job(
+                job_id,
+                status="completed",
+                payment_status="completed",
+                result=result_content if hasattr(result, 'content') else str(result)
+            )
+            self.stop_payment_monitoring(job_id)
+        except Exception as e:
+            logger.error(f"Error processing payment {payment_id} for job {job_id}: {str(e)}", exc_info=True)
+            self.update_job(job_id, status="failed", error=str(e))
+
+            # Still stop monitoring to prevent repeated failures
+            self.stop_payment_monitoring(job_id)
+
+    # ── Status ───────────────────────────────────────────────────────────────
+    @staticmethod
+    def format_status(job: dict, include_result: bool = True) -> dict:
+        """ Builds the MIP-003 status payload of a job """
+        result_data = job.get("result") if include_result else None
+
+        # If result_data is a RunResponse object or has a 'raw' attribute, extract the content
+        if result_data:
+            if hasattr(result_data, 'raw'):
+                result = result_data.raw
+            elif hasattr(result_data, 'content'):
+                result = result_data.content
+            else:
+                result = result_data
+        else:
+            result = None
+
+        return {
+            "job_id": job["job_id"],
+            "status": job["status"],
+            "payment_status": job["payment_status"],
+            "progress": (job.get("progress") or [None])[-1],
+            "result": result
+        }
+
+    async def refresh_payment_status(self, job: dict) -> dict:
+        """ Updates the job's payment status from the cache while the job is unfinished """
+        job_id = job["job_id"]
+
+        # On the worker monitoring the payment the poller keeps the cache fresh;
+        # elsewhere stale entries are refreshed by one shared upstream check
+        if job["status"] in PENDING_STATUSES:
+            payment_id = job["payment_id"]
+            try:
+                payment_status = await self.payment_status_cache.get(
+                    payment_id, lambda: self.fetch_payment_status(payment_id)
+                ) or job["payment_status"]
+            except ValueError as e:
+                logger.warning(f"Error checking payment status: {str(e)}")
+                payment_status = "unknown"
+            except Exception as e:
+                logger.error(f"Error checking payment status: {str(e)}", exc_info=True)
+                payment_status = "error"
+            if payment_status != job["payment_status"]:
+                job["payment_status"] = payment_status
+                self.update_job(job_id, payment_status=payment_status)
+                logger.info(f"Updated payment status for job {job_id}: {payment_status}")
+        return job
+
+    async def get_status(self, job_id: str, wait: float = 0) -> dict:
+        """ Returns the status of a job, waiting up to wait seconds for its next event """
+        logger.info(f"Checking status for job {job_id}")
+        job = self.jobs.get(job_id)
+        if job is None:
+            logger.warning(f"Job {job_id} not found")
+            raise HTTPException(status_code=404, detail="Job not found")
+
+        if wait > 0 and job["status"] not in TERMINAL_STATUSES:
+            with self.event_bus.subscribe(job_id) as queue:
+                # Re-read after subscribing so a transition in between is not missed
+                job = self.jobs.get(job_id)
+                if job["status"] not in TERMINAL_STATUSES:
+                    try:
+                        await asyncio.wait_for(queue.get(), timeout=min(wait, MAX_STATUS_WAIT))
+                    except asyncio.TimeoutError:
+                        pass
+                    job = self.jobs.get(job_id)
+
+        job = await self.refresh_payment_status(job)
+        return self.format_status(job)
+
+    async def stream_status(self, job_id: str, request: Request):
+        """ Yields Server-Sent Events for a job until it reaches a terminal status """
+        with self.event_bus.subscribe(job_id) as queue:
+            job = await self.refresh_payment_status(self.jobs.get(job_id))
+            if job["status"] in TERMINAL_STATUSES:
+                yield format_sse("status", self.format_status(job))
+                return
+
+            yield format_sse("status", self.format_status(job, include_result=False))
+            for item in self.event_bus.history(job_id):
+                if item["event"] != "status":
+                    yield format_sse(item["event"], item["data"])
+
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+
+                if item["event"] != "status":
+                    yield format_sse(item["event"], item["data"])
+                elif item["data"].get("status") in TERMINAL_STATUSES:
+                    yield format_sse("status", self.format_status(self.jobs.get(job_id)))
+                    return
+                else:
+                    yield format_sse("status", self.format_status(self.jobs.get(job_id), include_result=False))
+
+    def metrics(self) -> dict:
+        metrics = {
+            "executor": self.executor.metrics(),
+            "payments": self.payment_poller.metrics(),
+            "payment_status_cache": self.payment_status_cache.metrics(),
+            "events": self.event_bus.metrics(),
+            "leases": self.lease_keeper.metrics()
+        }
+        if self.agent_metrics is not None:
+            metrics["agent"] = self.agent_metrics()
+        return metrics
+
+    # ── Routes ───────────────────────────────────────────────────────────────
+    def _register_routes(self) -> None:
+        app = self.app
+        example_input = self.example_input
+
+        class StartJobRequest(BaseModel):
+            identifier_from_purchaser: str
+            input_data: dict[str, str]
+
+            model_config = {
+                "json_schema_extra": {
+                    "example": {
+                        "identifier_from_purchaser": "example_purchaser_123",
+                        "input_data": example_input
+                    }
+                }
+            }
+
+        # 1) Start Job (MIP-003: /start_job)
+        @app.post("/start_job")
+        async def start_job(data: StartJobRequest):
+            """ Initiates a job and creates a payment request """
+            if self.executor.saturated:
+                logger.warning("Rejecting job request: job queue is full")
+                raise HTTPException(status_code=503, detail="Server is busy, please retry later.")
+            try:
+                return await self.start_job(data.identifier_from_purchaser, data.input_data)
+            except (KeyError, ValidationError) as e:
+                logger.error(f"Missing or invalid field in request: {str(e)}", exc_info=True)
+                raise HTTPException(
+                    status_code=400,
+                    detail="Bad Request: If input_data or identifier_from_purchaser is missing, invalid, or does not adhere to the schema."
+                )
+            except Exception as e:
+                logger.error(f"Error in start_job: {str(e)}", exc_info=True)
+                raise HTTPException(
+                    status_code=400,
+                    detail="Input_data or identifier_from_purchaser is missing, invalid, or does not adhere to the schema."
+                )
+
+        class StartJobsRequest(BaseModel):
+            jobs: List[StartJobRequest]
+
+        # 1b) Start a batch of jobs in one request
+        @app.post("/start_jobs")
+        async def start_jobs(data: StartJobsRequest):
+            """
+            Initiates several jobs at once. Payment requests are created concurrently
+            and each item reports its own job id and payment data, or its error.
+            """
+            if not data.jobs:
+                raise HTTPException(status_code=400, detail="Bad Request: jobs must contain at least one item.")
+            if len(data.jobs) > self.max_batch_size:
+                raise HTTPException(status_code=400, detail=f"Bad Request: at most {self.max_batch_size} jobs per batch.")
+            if self.executor.saturated:
+                logger.warning("Rejecting batch job request: job queue is full")
+                raise HTTPException(status_code=503, detail="Server is busy, please retry later.")
+
+            logger.info(f"Starting batch of {len(data.jobs)} job(s)")
+            results = await self.start_jobs([(job.identifier_from_purchaser, job.input_data) for job in data.jobs])
+            failed = sum(1 for result in results if result["status"] != "success")
+            return {
+                "status": "success" if not failed else ("failed" if failed == len(results) else "partial"),
+                "succeeded": len(results) - failed,
+                "failed": failed,
+                "jobs": results
+            }
+
+        # 2) Check Job and Payment Status (MIP-003: /status)
+        @app.get("/status")
+        async def get_status(job_id: str, wait: float = Query(default=0, ge=0, description="Seconds to wait for the next job event (long-poll)")):
+            """
+            Retrieves the current status of a specific job.
+            With wait > 0 the request is held until the job changes or the wait expires.
+            """
+            return await self.get_status(job_id, wait)
+
+        @app.get("/status/stream")
+        async def stream_status(job_id: str, request: Request):
+            """
+            Streams job state transitions and workflow progress as Server-Sent Events.
+            The stream ends with a final status event that carries the result.
+            """
+            if self.jobs.get(job_id) is None:
+                logger.warning(f"Job {job_id} not found")
+                raise HTTPException(status_code=404, detail="Job not found")
+            return StreamingResponse(
+                self.stream_status(job_id, request),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+
+        # 3) Check Server Availability (MIP-003: /availability)
+        @app.get("/availability")
+        async def check_availability():
+            """ Checks if the server is operational """
+            return {
+                "status": "available",
+                "type": "masumi-agent",
+                "agentIdentifier": os.getenv("AGENT_IDENTIFIER"),
+                "message": "The server is running smoothly."
+            }
+
+        # 4) Retrieve Input Schema (MIP-003: /input_schema)
+        @app.get("/input_schema")
+        async def input_schema():
+            """
+            Returns the expected input schema for the /start_job endpoint.
+            Fulfills MIP-003 /input_schema endpoint.
+            """
+            return self.input_schema
+
+        # 5) Health Check
+        @app.get("/health")
+        async def health():
+            """ Returns the health of the server. """
+            return {"status": "healthy"}
+
+        # 6) Metrics
+        @app.get("/metrics")
+        async def metrics():
+            """
+            Returns live job executor metrics (queue depth, wait time and run time),
+            payment poller, payment status cache, event bus and payment lease metrics,
+            plus the agent's own metrics if it provides them.
+            """
+            return self.metrics()
+
+    def run(self, import_string: str = "main:app", host: str = "0.0.0.0", port: int = 8000) -> None:
+        """ Serves the app; API_WORKERS > 1 starts several worker processes from import_string """
+        workers = int(os.getenv("API_WORKERS", "1"))
+        if workers > 1:
+            if not multi_worker_enabled():
+                logger.warning("API_WORKERS > 1 without MULTI_WORKER=true: workers will not share leases or events")
+            uvicorn.run(import_string, host=host, port=port, workers=workers)
+        else:
+            uvicorn.run(self.app, host=host, port=port)
+
+
+def format_sse(event: str, data: dict) -> str:
+    """ Encodes one Server-Sent Event """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
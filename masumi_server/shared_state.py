@@ -0,0 +1,399 @@
+import os
+import logging
+import json
+import time
+import socket
+import sqlite3
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set
+from urllib.parse import urlparse
+from .job_store import sqlite_path
+
+logger = logging.getLogger(__name__)
+
+
+def multi_worker_enabled() -> bool:
+    """True when MULTI_WORKER is set, i.e. several workers or replicas share one backend"""
+    return os.getenv("MULTI_WORKER", "false").lower() in ("1", "true", "yes")
+
+
+def shared_state_url() -> str:
+    """Backend for leases and events: SHARED_STATE_URL, falling back to JOB_STORE_URL"""
+    return os.getenv("SHARED_STATE_URL") or os.getenv("JOB_STORE_URL", "sqlite:///data/jobs.db")
+
+
+def default_worker_id() -> str:
+    return os.getenv("WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _redis_client(url: str):
+    try:
+        import redis
+    except ImportError as e:
+        raise ImportError("The Redis shared state backend requires the redis package: pip install redis") from e
+    return redis.Redis.from_url(url, decode_responses=True)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Lease stores
+# ─────────────────────────────────────────────────────────────────────────────
+class LeaseStore:
+    """
+    Interface for time-limited exclusive ownership of keys.
+
+    acquire() grants a lease if the key is free, expired or already held by the
+    same owner (which renews it), so one call covers both claiming and renewing.
+    """
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        raise NotImplementedError
+
+    def release(self, key: str, owner: str) -> None:
+        raise NotImplementedError
+
+    def active(self, keys: Iterable[str]) -> Set[str]:
+        """Subset of keys that currently have a live lease, whoever holds it"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class LocalLeaseStore(LeaseStore):
+    """In-process leases for single-worker deployments"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._leases: Dict[str, tuple] = {}
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            current = self._leases.get(key)
+            if current and current[0] != owner and current[1] > now:
+                return False
+            self._leases[key] = (owner, now + ttl)
+            return True
+
+    def release(self, key: str, owner: str) -> None:
+        with self._lock:
+            if self._leases.get(key, (None,))[0] == owner:
+                del self._leases[key]
+
+    def active(self, keys: Iterable[str]) -> Set[str]:
+        now = time.time()
+        with self._lock:
+            return {key for key in keys if key in self._leases and self._leases[key][1] > now}
+
+
+class SQLiteLeaseStore(LeaseStore):
+    """Leases in a SQLite table, shared by worker processes on one host"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            # A single upsert is atomic: it only takes over a lease that is ours or expired
+            cursor = self._conn.execute(
+                "INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.owner = excluded.owner OR leases.expires_at < ?",
+                (key, owner, now + ttl, now),
+            )
+        return cursor.rowcount > 0
+
+    def release(self, key: str, owner: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+
+    def active(self, keys: Iterable[str]) -> Set[str]:
+        keys = list(keys)
+        found = set()
+        now = time.time()
+        # Stay below SQLite's bound parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT key FROM leases WHERE key IN ({placeholders}) AND expires_at >= ?",
+                    (*chunk, now),
+                ).fetchall()
+            found.update(row[0] for row in rows)
+        return found
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisLeaseStore(LeaseStore):
+    """Leases as expiring keys on a Redis-compatible server, shared across nodes"""
+
+    ACQUIRE_SCRIPT = """
+    local current = redis.call('GET', KEYS[1])
+    if current == false or current == ARGV[1] then
+        redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+        return 1
+    end
+    return 0
+    """
+
+    RELEASE_SCRIPT = """
+    if redis.call('GET', KEYS[1]) == ARGV[1] then
+        return redis.call('DEL', KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, url: str, prefix: str = "masumi"):
+        self.prefix = prefix
+        self._redis = _redis_client(url)
+        self._acquire = self._redis.register_script(self.ACQUIRE_SCRIPT)
+        self._release = self._redis.register_script(self.RELEASE_SCRIPT)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:lease:{key}"
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        return bool(self._acquire(keys=[self._key(key)], args=[owner, int(ttl * 1000)]))
+
+    def release(self, key: str, owner: str) -> None:
+        self._release(keys=[self._key(key)], args=[owner])
+
+    def active(self, keys: Iterable[str]) -> Set[str]:
+        keys = list(keys)
+        if not keys:
+            return set()
+        owners = self._redis.mget([self._key(key) for key in keys])
+        return {key for key, owner in zip(keys, owners) if owner}
+
+    def close(self) -> None:
+        self._redis.close()
+
+
+def create_lease_store(url: str) -> LeaseStore:
+    """Create a lease store from a URL: memory://, sqlite:///path.db or redis://host:6379/0"""
+    scheme = urlparse(url).scheme
+    if scheme == "memory":
+        return LocalLeaseStore()
+    if scheme == "sqlite":
+        return SQLiteLeaseStore(sqlite_path(url))
+    if scheme in ("redis", "rediss"):
+        return RedisLeaseStore(url)
+    raise ValueError(f"Unsupported shared state URL: {url}")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Lease keeper
+# ─────────────────────────────────────────────────────────────────────────────
+class LeaseKeeper:
+    """
+    Keeps the payment leases of this worker alive.
+
+    Each outstanding payment is monitored only by the worker holding its lease.
+    On every tick the keeper renews the leases it holds, reports the ones it has
+    lost and then runs claim(), which takes over payments nobody holds: new ones,
+    or ones left behind by a worker that stopped.
+    """
+
+    def __init__(self, store: LeaseStore, worker_id: str, ttl: float = 30.0):
+        self.store = store
+        self.worker_id = worker_id
+        self.ttl = ttl
+        self.renew_interval = ttl / 3
+        self._held: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.acquired = 0
+        self.lost = 0
+
+    def acquire(self, key: str) -> bool:
+        if not self.store.acquire(key, self.worker_id, self.ttl):
+            return False
+        if key not in self._held:
+            self._held.add(key)
+            self.acquired += 1
+        return True
+
+    def release(self, key: str) -> None:
+        self._held.discard(key)
+        self.store.release(key, self.worker_id)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._held
+
+    async def start(self, on_lost: Callable[[str], Awaitable[None]], claim: Callable[[], Awaitable[Any]]) -> None:
+        """Claim unowned payments right away, then keep renewing and claiming in the background"""
+        if self._task:
+            return
+        await claim()
+        self._task = asyncio.create_task(self._run(on_lost, claim))
+        logger.info(f"Lease keeper started for worker {self.worker_id} (ttl {self.ttl}s)")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Hand our payments over to the remaining workers right away
+        for key in list(self._held):
+            self.release(key)
+        self.store.close()
+
+    async def _run(self, on_lost: Callable[[str], Awaitable[None]], claim: Callable[[], Awaitable[Any]]) -> None:
+        while True:
+            await asyncio.sleep(self.renew_interval)
+            try:
+                await self.tick(on_lost, claim)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error renewing payment leases: {str(e)}", exc_info=True)
+
+    async def tick(self, on_lost: Callable[[str], Awaitable[None]], claim: Callable[[], Awaitable[Any]]) -> None:
+        for key in list(self._held):
+            if key in self._held and not self.store.acquire(key, self.worker_id, self.ttl):
+                self._held.discard(key)
+                self.lost += 1
+                logger.warning(f"Worker {self.worker_id} lost the lease on {key}")
+                await on_lost(key)
+        await claim()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "held": len(self._held),
+            "acquired": self.acquired,
+            "lost": self.lost,
+            "ttl_seconds": self.ttl,
+        }
+
+
+def create_lease_keeper(worker_id: str) -> LeaseKeeper:
+    """
+    Create the payment lease keeper from the environment:
+        MULTI_WORKER: share leases through SHARED_STATE_URL instead of process memory
+        SHARED_STATE_URL: sqlite:///... or redis://... (default: JOB_STORE_URL)
+        PAYMENT_LEASE_TTL: seconds before a stopped worker's payments are taken over (default: 30)
+    """
+    url = shared_state_url() if multi_worker_enabled() else "memory://"
+    return LeaseKeeper(create_lease_store(url), worker_id, ttl=float(os.getenv("PAYMENT_LEASE_TTL", "30")))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Event relays
+# ─────────────────────────────────────────────────────────────────────────────
+class SQLiteEventRelay:
+    """
+    Shares job events between worker processes on one host through an
+    append-only table. Each worker tails the table and delivers the events
+    other workers published; old rows are pruned after retention seconds.
+    """
+
+    def __init__(self, path: str, origin: str, poll_interval: float = 0.5, retention: float = 600.0):
+        self.origin = origin
+        self.poll_interval = poll_interval
+        self.retention = retention
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_events (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "origin TEXT NOT NULL, payload TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+
+    def send(self, item: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO job_events (origin, payload, created_at) VALUES (?, ?, ?)",
+                (self.origin, json.dumps(item), time.time()),
+            )
+
+    async def listen(self, deliver: Callable[[Dict[str, Any]], None]) -> None:
+        with self._lock:
+            last_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM job_events").fetchone()[0]
+        next_prune = time.time() + self.retention
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, origin, payload FROM job_events WHERE id > ? ORDER BY id", (last_id,)
+                ).fetchall()
+            for row_id, origin, payload in rows:
+                last_id = row_id
+                if origin != self.origin:
+                    deliver(json.loads(payload))
+
+            if time.time() >= next_prune:
+                with self._lock:
+                    self._conn.execute("DELETE FROM job_events WHERE created_at < ?", (time.time() - self.retention,))
+                next_prune = time.time() + self.retention
+            await asyncio.sleep(self.poll_interval)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisEventRelay:
+    """Shares job events between workers and nodes over a Redis pub/sub channel"""
+
+    def __init__(self, url: str, origin: str, channel: str = "masumi:job_events"):
+        self.url = url
+        self.origin = origin
+        self.channel = channel
+        self._redis = _redis_client(url)
+
+    def send(self, item: Dict[str, Any]) -> None:
+        self._redis.publish(self.channel, json.dumps({"origin": self.origin, "item": item}))
+
+    async def listen(self, deliver: Callable[[Dict[str, Any]], None]) -> None:
+        import redis.asyncio
+
+        client = redis.asyncio.Redis.from_url(self.url, decode_responses=True)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(self.channel)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                envelope = json.loads(message["data"])
+                if envelope.get("origin") != self.origin:
+                    deliver(envelope["item"])
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+
+    def close(self) -> None:
+        self._redis.close()
+
+
+def create_event_relay(worker_id: str):
+    """Event relay for MULTI_WORKER deployments (None when running a single worker)"""
+    if not multi_worker_enabled():
+        return None
+    url = shared_state_url()
+    scheme = urlparse(url).scheme
+    if scheme == "sqlite":
+        return SQLiteEventRelay(sqlite_path(url), worker_id)
+    if scheme in ("redis", "rediss"):
+        return RedisEventRelay(url, worker_id)
+    raise ValueError(f"Unsupported shared state URL: {url}")
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+
+from masumi_server import AgentServer
+
+PAYMENT_ID = "payment-1"
+# The agents import masumi_server from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+
+@pytest.fixture
+def server_env(tmp_path, monkeypatch):
+    """ Environment of a single worker with its job store and leases in a temporary SQLite file """
+    monkeypatch.setenv("PAYMENT_SERVICE_URL", "http://127.0.0.1:9/api/v1")
+    monkeypatch.setenv("PAYMENT_API_KEY", "test-key")
+    monkeypatch.setenv("NETWORK", "Preprod")
+    monkeypatch.setenv("AGENT_IDENTIFIER", "test-agent")
+    monkeypatch.setenv("JOB_STORE_URL", f"sqlite:///{tmp_path / 'jobs.db'}")
+    monkeypatch.delenv("SHARED_STATE_URL", raising=False)
+    monkeypatch.delenv("MULTI_WORKER", raising=False)
+    monkeypatch.setenv("WORKER_ID", "test-worker")
+    return tmp_path
+
+
+class FakePayment:
+    """ Stands in for masumi's Payment: no payment service, records completed payments """
+
+    def __init__(self):
+        self.payment_ids = set()
+        self.input_hash = "input-hash"
+        self.completed = []
+
+    async def create_payment_request(self):
+        return {"data": {
+            "blockchainIdentifier": PAYMENT_ID,
+            "submitResultTime": "1",
+            "unlockTime": "2",
+            "externalDisputeUnlockTime": "3",
+        }}
+
+    async def complete_payment(self, payment_id, result):
+        self.completed.append((payment_id, result))
+
+
+@pytest.fixture
+def build_server(server_env, monkeypatch):
+    """ Returns a factory of servers for a workflow, whose payment requests go to a FakePayment """
+    def build(workflow, input_schema=None):
+        server = AgentServer(name="test", workflow=workflow, input_schema=input_schema or {"input_data": []})
+        payment = FakePayment()
+        monkeypatch.setattr(server, "create_payment", lambda identifier, input_data: payment)
+        return server, payment
+
+    return build
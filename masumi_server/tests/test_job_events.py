@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+from masumi_server.event_bus import JobEventBus
+from masumi_server.server import format_sse
+
+PAYMENT_ID = "payment-1"
+
+
+class ConnectedRequest:
+    """ The request of a client that stays connected """
+
+    async def is_disconnected(self):
+        return False
+
+
+def parse_sse(message):
+    event, data = message.strip().split("\n")
+    return event[len("event: "):], json.loads(data[len("data: "):])
+
+
+def test_format_sse_encodes_one_event():
+    assert format_sse("status", {"status": "running"}) == 'event: status\ndata: {"status": "running"}\n\n'
+
+
+def test_late_subscribers_see_the_history_until_a_terminal_status():
+    async def main():
+        bus = JobEventBus()
+        bus.bind_loop(asyncio.get_running_loop())
+        bus.publish("job-1", "progress", {"step": "crawl"})
+        history = [item["event"] for item in bus.history("job-1")]
+        bus.publish("job-1", "status", {"status": "completed"})
+        return history, bus.history("job-1")
+
+    assert asyncio.run(main()) == (["progress"], [])
+
+
+def test_long_poll_returns_on_the_next_job_event(build_server):
+    server, _ = build_server(lambda text: text)
+
+    async def main():
+        server.event_bus.bind_loop(asyncio.get_running_loop())
+        job_id = (await server.start_job("purchaser-1", {"text": "hello"}))["job_id"]
+        server.payment_status_cache.set(PAYMENT_ID, "FundsLocked")
+
+        waiting = asyncio.create_task(server.get_status(job_id, wait=30))
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+        server.update_job(job_id, status="running")
+        return await asyncio.wait_for(waiting, timeout=1)
+
+    try:
+        status = asyncio.run(main())
+    finally:
+        asyncio.run(server.shutdown())
+
+    assert status["status"] == "running"
+    assert status["payment_status"] == "FundsLocked"
+
+
+def test_long_poll_returns_the_unchanged_status_after_the_wait(build_server):
+    server, _ = build_server(lambda text: text)
+
+    async def main():
+        server.event_bus.bind_loop(asyncio.get_running_loop())
+        job_id = (await server.start_job("purchaser-1", {"text": "hello"}))["job_id"]
+        server.payment_status_cache.set(PAYMENT_ID, "FundsRequested")
+        return await server.get_status(job_id, wait=0.05)
+
+    try:
+        assert asyncio.run(main())["status"] == "awaiting_payment"
+    finally:
+        asyncio.run(server.shutdown())
+
+
+def test_stream_sends_progress_and_ends_with_the_result(build_server):
+    def workflow(text, progress):
+        progress.put({"step": "halfway"})
+        return f"echo: {text}"
+
+    server, _ = build_server(workflow)
+
+    async def main():
+        server.event_bus.bind_loop(asyncio.get_running_loop())
+        job_id = (await server.start_job("purchaser-1", {"text": "hello"}))["job_id"]
+        server.payment_status_cache.set(PAYMENT_ID, "FundsRequested")
+
+        stream = server.stream_status(job_id, ConnectedRequest())
+        messages = [await stream.__anext__()]
+
+        async def read_rest():
+            async for message in stream:
+                messages.append(message)
+
+        reader = asyncio.create_task(read_rest())
+        await server.handle_payment_status(job_id, PAYMENT_ID)
+        await asyncio.wait_for(reader, timeout=1)
+        return [parse_sse(message) for message in messages]
+
+    try:
+        events = asyncio.run(main())
+    finally:
+        asyncio.run(server.shutdown())
+
+    assert events[0] == ("status", {**events[0][1], "status": "awaiting_payment", "result": None})
+    assert ("progress", {"step": "halfway"}) in events
+    # Status events before the last leave the result out
+    assert all(data["result"] is None for event, data in events[:-1] if event == "status")
+    assert events[-1][0] == "status"
+    assert events[-1][1]["status"] == "completed"
+    assert events[-1][1]["result"] == "echo: hello"
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+
+import pytest
+
+from masumi_server.job_executor import JobExecutor, QueueFullError, create_job_executor
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_jobs_run_off_the_event_loop_and_are_counted():
+    executor = JobExecutor(max_workers=2)
+    threads = []
+
+    def job(value):
+        threads.append(threading.current_thread().name)
+        return value * 2
+
+    try:
+        assert run(executor.run(job, 21)) == 42
+    finally:
+        executor.shutdown()
+
+    assert threads[0].startswith("job-worker")
+    metrics = executor.metrics()
+    assert metrics["completed"] == 1
+    assert metrics["queue_depth"] == 0
+    assert metrics["run_time_seconds"]["max"] is not None
+
+
+def test_failed_jobs_raise_and_are_counted():
+    executor = JobExecutor()
+
+    def job():
+        raise RuntimeError("boom")
+
+    try:
+        with pytest.raises(RuntimeError):
+            run(executor.run(job))
+    finally:
+        executor.shutdown()
+
+    assert executor.metrics()["failed"] == 1
+
+
+def test_progress_reaches_the_callback():
+    executor = JobExecutor()
+    received = []
+
+    def job(progress):
+        progress.put("halfway")
+        return "done"
+
+    try:
+        assert run(executor.run(job, on_progress=received.append)) == "done"
+    finally:
+        executor.shutdown()
+
+    assert received == ["halfway"]
+
+
+def test_a_full_queue_rejects_jobs():
+    executor = JobExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def main():
+        running = asyncio.create_task(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        waiting = asyncio.create_task(executor.run(lambda: "second"))
+        await asyncio.sleep(0)
+        assert executor.saturated
+        with pytest.raises(QueueFullError):
+            await executor.run(lambda: "third")
+        release.set()
+        return await asyncio.gather(running, waiting)
+
+    try:
+        assert run(main()) == [True, "second"]
+    finally:
+        release.set()
+        executor.shutdown()
+
+    assert executor.metrics()["rejected"] == 1
+
+
+def test_per_key_limits_cap_concurrency_below_the_pool_size():
+    executor = JobExecutor(max_workers=4, concurrency_limits={"nft": 1})
+    lock = threading.Lock()
+    active = peak = 0
+
+    def job():
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        threading.Event().wait(0.02)
+        with lock:
+            active -= 1
+
+    async def main():
+        await asyncio.gather(*(executor.run(job, key="nft") for _ in range(3)))
+
+    try:
+        run(main())
+    finally:
+        executor.shutdown()
+
+    assert peak == 1
+
+
+def test_create_job_executor_reads_the_environment(monkeypatch):
+    monkeypatch.setenv("JOB_EXECUTOR", "thread")
+    monkeypatch.setenv("JOB_WORKERS", "3")
+    monkeypatch.setenv("JOB_QUEUE_SIZE", "7")
+    monkeypatch.setenv("JOB_CONCURRENCY_LIMITS", "llms_txt=2, nft=1, bad")
+
+    executor = create_job_executor()
+    try:
+        assert (executor.max_workers, executor.max_queue) == (3, 7)
+        assert executor.concurrency_limits == {"llms_txt": 2, "nft": 1}
+    finally:
+        executor.shutdown()
@@ -0,0 +1,138 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+from masumi_server.payment_poller import PaymentPoller, payment_ready
+
+NOW = time.time()
+
+
+def listed(index, **fields):
+    """ The index-th newest payment of the node, created index minutes ago """
+    created = datetime.fromtimestamp(NOW - 60 * index, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+    return {"id": f"row-{index}", "blockchainIdentifier": f"payment-{index}", "createdAt": created,
+            "onChainState": None, "NextAction": {"requestedAction": "WaitingForExternalAction"}, **fields}
+
+
+class FakePaymentService:
+    """ GET /payment/ over a newest-first history, and the single payment resolve endpoint """
+
+    def __init__(self, history, resolvable=None):
+        self.history = history
+        self.resolvable = resolvable or {}
+        self.listings = 0
+        self.resolved = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            self.listings += 1
+            limit = int(request.url.params["limit"])
+            cursor = request.url.params.get("cursorId")
+            start = next(i + 1 for i, row in enumerate(self.history) if row["id"] == cursor) if cursor else 0
+            return httpx.Response(200, json={"data": {"Payments": self.history[start:start + limit]}})
+        payment_id = json.loads(request.content)["blockchainIdentifier"]
+        self.resolved.append(payment_id)
+        if payment_id not in self.resolvable:
+            return httpx.Response(404, json={})
+        return httpx.Response(200, json={"data": self.resolvable[payment_id]})
+
+
+def poller_for(service, **kwargs):
+    poller = PaymentPoller("http://payments.invalid/api/v1", "key", "Preprod", page_size=100, max_pages=5, **kwargs)
+    poller._client = httpx.AsyncClient(transport=httpx.MockTransport(service.handle))
+    return poller
+
+
+async def noop(payment_id):
+    pass
+
+
+def register(poller, *payment_ids, age=0.0, callback=noop):
+    for payment_id in payment_ids:
+        poller.register(payment_id, callback, created_at=NOW - age)
+        poller._tracked[payment_id]["next_check"] = 0
+
+
+def test_recent_pending_payments_need_one_listing_page_whatever_the_history():
+    service = FakePaymentService([listed(index) for index in range(5000)])
+    poller = poller_for(service)
+    register(poller, "payment-3", "payment-42")
+
+    states = asyncio.run(poller.poll_once())
+
+    assert set(states) == {"payment-3", "payment-42"}
+    assert service.listings == 1
+    assert service.resolved == []
+
+
+def test_listing_stops_at_payments_older_than_the_pending_ones():
+    # payment-missing is not in the listing; pages past its creation time cannot hold it
+    service = FakePaymentService([listed(index) for index in range(5000)],
+                                 resolvable={"payment-missing": {"onChainState": "FundsLocked"}})
+    poller = poller_for(service)
+    register(poller, "payment-1", "payment-missing", age=60)
+
+    states = asyncio.run(poller.poll_once())
+
+    assert states == {"payment-1": None, "payment-missing": "FundsLocked"}
+    assert service.listings == 1
+    assert service.resolved == ["payment-missing"]
+
+
+def test_payments_beyond_max_pages_are_resolved_individually():
+    service = FakePaymentService([listed(index) for index in range(5000)],
+                                 resolvable={"payment-4000": {"onChainState": None}})
+    poller = poller_for(service)
+    register(poller, "payment-1", "payment-4000", age=60 * 4000)
+
+    asyncio.run(poller.poll_once())
+
+    assert service.listings == 5
+    assert service.resolved == ["payment-4000"]
+
+
+def test_a_single_payment_is_resolved_without_listing():
+    service = FakePaymentService([listed(index) for index in range(500)],
+                                 resolvable={"payment-7": {"onChainState": "FundsLocked"}})
+    poller = poller_for(service)
+
+    states = asyncio.run(poller.fetch_statuses(["payment-7"]))
+
+    assert states == {"payment-7": "FundsLocked"}
+    assert service.listings == 0
+
+
+def test_paid_states_and_next_actions_match_masumi_monitoring():
+    assert payment_ready({"onChainState": "FundsLocked"})
+    assert payment_ready({"onChainState": "Complete"})
+    assert payment_ready({"onChainState": "ResultSubmitted", "NextAction": {"requestedAction": "PaymentComplete"}})
+    assert payment_ready({"onChainState": None, "NextAction": {"requestedAction": "None"}})
+    assert not payment_ready({"onChainState": None, "NextAction": {"requestedAction": "WaitingForExternalAction"}})
+    assert not payment_ready(None)
+
+
+def test_callbacks_run_for_payments_that_moved_past_funds_locked():
+    service = FakePaymentService([
+        listed(0, onChainState="Complete"),
+        listed(1, onChainState="ResultSubmitted", NextAction={"requestedAction": "PaymentComplete"}),
+        listed(2),
+    ])
+    poller = poller_for(service)
+    paid = []
+
+    async def callback(payment_id):
+        paid.append(payment_id)
+
+    async def main():
+        register(poller, "payment-0", "payment-1", "payment-2", callback=callback)
+        await poller.poll_once()
+        await asyncio.gather(*poller._callback_tasks)
+
+    asyncio.run(main())
+
+    assert sorted(paid) == ["payment-0", "payment-1"]
+    assert "payment-2" in poller
+    assert "payment-0" not in poller
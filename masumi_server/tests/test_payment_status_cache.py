@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from masumi_server.payment_status_cache import PaymentStatusCache, create_payment_status_cache
+
+PAYMENT_ID = "payment-1"
+
+
+def test_fresh_entries_are_served_without_loading():
+    cache = PaymentStatusCache(ttl=60)
+    cache.set(PAYMENT_ID, "FundsLocked")
+
+    async def loader():
+        raise AssertionError("a fresh entry must not be reloaded")
+
+    assert asyncio.run(cache.get(PAYMENT_ID, loader)) == "FundsLocked"
+    assert cache.metrics()["hits"] == 1
+
+
+def test_stale_entries_are_reloaded():
+    cache = PaymentStatusCache(ttl=0)
+    cache.set(PAYMENT_ID, "FundsRequested")
+
+    async def loader():
+        return "FundsLocked"
+
+    assert asyncio.run(cache.get(PAYMENT_ID, loader)) == "FundsLocked"
+    assert cache.metrics()["misses"] == 1
+
+
+def test_failed_loads_reach_every_reader_and_are_not_cached():
+    cache = PaymentStatusCache(ttl=60)
+
+    async def loader():
+        await asyncio.sleep(0.01)
+        raise ValueError("payment service unavailable")
+
+    async def main():
+        return await asyncio.gather(*(cache.get(PAYMENT_ID, loader) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(main()))
+    assert cache.peek(PAYMENT_ID) == (None, None)
+
+
+def test_payment_status_cache_coalesces_concurrent_loads():
+    cache = PaymentStatusCache(ttl=60)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "FundsLocked"
+
+    async def main():
+        return await asyncio.gather(*(cache.get(PAYMENT_ID, loader) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["FundsLocked"] * 5
+    assert calls == 1
+    assert cache.metrics()["coalesced"] == 4
+    assert cache.peek(PAYMENT_ID)[0] == "FundsLocked"
+
+
+def test_waiters_reload_when_the_loading_reader_is_cancelled():
+    cache = PaymentStatusCache(ttl=60)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05 if calls == 1 else 0)
+        return "FundsLocked"
+
+    async def main():
+        first = asyncio.create_task(cache.get(PAYMENT_ID, loader))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get(PAYMENT_ID, loader))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await asyncio.wait_for(waiter, timeout=1)
+
+    assert asyncio.run(main()) == "FundsLocked"
+    assert calls == 2
+
+
+def test_create_payment_status_cache_reads_the_ttl(monkeypatch):
+    monkeypatch.setenv("PAYMENT_STATUS_TTL", "5")
+
+    assert create_payment_status_cache().ttl == 5.0
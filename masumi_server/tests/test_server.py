@@ -0,0 +1,55 @@
+import asyncio
+
+PAYMENT_ID = "payment-1"
+
+
+def run_job(server, input_data):
+    """ Starts a job and confirms its payment the way the payment poller would """
+    async def flow():
+        started = await server.start_job("purchaser-1", input_data)
+        monitored = PAYMENT_ID in server.payment_poller
+        if monitored:
+            await server.handle_payment_status(started["job_id"], PAYMENT_ID)
+        return started, monitored, server.jobs.get(started["job_id"])
+
+    try:
+        return asyncio.run(flow())
+    finally:
+        asyncio.run(server.shutdown())
+
+
+def test_paid_job_runs_the_workflow_and_completes_the_payment(build_server):
+    server, payment = build_server(lambda text: f"echo: {text}")
+
+    started, monitored, job = run_job(server, {"text": "hello"})
+
+    assert started["status"] == "success"
+    assert started["blockchainIdentifier"] == PAYMENT_ID
+    assert monitored
+    assert job["status"] == "completed"
+    assert job["payment_status"] == "completed"
+    assert job["result"] == "echo: hello"
+    assert payment.completed == [(PAYMENT_ID, {"result": "echo: hello"})]
+
+
+def test_failed_workflow_fails_the_job_without_completing_the_payment(build_server):
+    def workflow(text):
+        raise RuntimeError("model unavailable")
+
+    server, payment = build_server(workflow)
+
+    started, _, job = run_job(server, {"text": "hello"})
+
+    assert job["status"] == "failed"
+    assert "model unavailable" in job["error"]
+    assert payment.completed == []
+    assert PAYMENT_ID not in server.payment_poller
+
+
+def test_empty_workflow_result_fails_the_job(build_server):
+    server, payment = build_server(lambda text: "")
+
+    started, _, job = run_job(server, {"text": "hello"})
+
+    assert job["status"] == "failed"
+    assert payment.completed == []
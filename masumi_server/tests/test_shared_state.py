@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+from masumi_server.shared_state import (
+    LeaseKeeper,
+    LocalLeaseStore,
+    SQLiteEventRelay,
+    SQLiteLeaseStore,
+    create_lease_keeper,
+)
+
+PAYMENT_ID = "payment-1"
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def lease_store(request, tmp_path):
+    store = LocalLeaseStore() if request.param == "memory" else SQLiteLeaseStore(str(tmp_path / "leases.db"))
+    yield store
+    store.close()
+
+
+def test_a_lease_is_exclusive_until_released(lease_store):
+    assert lease_store.acquire(PAYMENT_ID, "worker-a", ttl=30)
+    assert lease_store.acquire(PAYMENT_ID, "worker-a", ttl=30)  # renewal
+    assert not lease_store.acquire(PAYMENT_ID, "worker-b", ttl=30)
+    assert lease_store.active([PAYMENT_ID, "payment-2"]) == {PAYMENT_ID}
+
+    lease_store.release(PAYMENT_ID, "worker-b")  # not the holder: no effect
+    assert not lease_store.acquire(PAYMENT_ID, "worker-b", ttl=30)
+    lease_store.release(PAYMENT_ID, "worker-a")
+    assert lease_store.acquire(PAYMENT_ID, "worker-b", ttl=30)
+
+
+def test_expired_leases_can_be_taken_over(lease_store):
+    assert lease_store.acquire(PAYMENT_ID, "worker-a", ttl=-1)
+
+    assert lease_store.active([PAYMENT_ID]) == set()
+    assert lease_store.acquire(PAYMENT_ID, "worker-b", ttl=30)
+
+
+def test_the_keeper_reports_leases_taken_over_by_another_worker():
+    store = LocalLeaseStore()
+    keeper = LeaseKeeper(store, "worker-a", ttl=30)
+    assert keeper.acquire(PAYMENT_ID)
+    store.release(PAYMENT_ID, "worker-a")
+    assert store.acquire(PAYMENT_ID, "worker-b", ttl=30)
+    lost, claims = [], []
+
+    async def on_lost(key):
+        lost.append(key)
+
+    async def claim():
+        claims.append(True)
+
+    asyncio.run(keeper.tick(on_lost, claim))
+
+    assert lost == [PAYMENT_ID]
+    assert PAYMENT_ID not in keeper
+    assert claims == [True]
+    assert keeper.metrics()["lost"] == 1
+
+
+def test_job_leased_by_another_worker_is_stored_but_not_monitored(build_server, monkeypatch):
+    monkeypatch.setenv("MULTI_WORKER", "true")
+    other_worker = create_lease_keeper("other-worker")
+    assert other_worker.acquire(PAYMENT_ID)
+    server, payment = build_server(lambda text: text)
+
+    async def flow():
+        started = await server.start_job("purchaser-1", {"text": "hello"})
+        return PAYMENT_ID in server.payment_poller, server.jobs.get(started["job_id"])
+
+    try:
+        monitored, job = asyncio.run(flow())
+    finally:
+        asyncio.run(server.shutdown())
+        other_worker.store.close()
+
+    assert not monitored
+    assert job["status"] == "awaiting_payment"
+    assert job["payment_id"] == PAYMENT_ID
+    assert payment.completed == []
+
+
+def test_a_stopped_workers_jobs_are_claimed_by_another_worker(build_server, monkeypatch):
+    monkeypatch.setenv("MULTI_WORKER", "true")
+    stopped, _ = build_server(lambda text: text)
+    monkeypatch.setenv("WORKER_ID", "other-worker")
+    remaining, _ = build_server(lambda text: text)
+
+    async def flow():
+        job_id = (await stopped.start_job("purchaser-1", {"text": "hello"}))["job_id"]
+        assert await remaining.claim_pending_jobs() == 0
+        await stopped.shutdown()
+        claimed = await remaining.claim_pending_jobs()
+        return job_id, claimed, PAYMENT_ID in remaining.payment_poller
+
+    try:
+        job_id, claimed, monitored = asyncio.run(flow())
+    finally:
+        asyncio.run(remaining.shutdown())
+
+    assert claimed == 1
+    assert monitored
+
+
+def test_sqlite_relay_delivers_the_events_of_other_workers(tmp_path):
+    path = str(tmp_path / "events.db")
+    sender = SQLiteEventRelay(path, "worker-a")
+    receiver = SQLiteEventRelay(path, "worker-b", poll_interval=0.01)
+    delivered = []
+
+    async def main():
+        listening = asyncio.create_task(receiver.listen(delivered.append))
+        await asyncio.sleep(0.02)
+        sender.send({"event": "status", "job_id": "job-1"})
+        receiver.send({"event": "status", "job_id": "job-2"})
+        for _ in range(100):
+            if delivered:
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        listening.cancel()
+
+    try:
+        asyncio.run(main())
+    finally:
+        sender.close()
+        receiver.close()
+
+    assert delivered == [{"event": "status", "job_id": "job-1"}]
@@ -0,0 +1,113 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+
+class ItemPayment:
+    """ Payment of one batch item: its id comes from the input, "fail" makes the request fail """
+
+    in_flight = 0
+    peak = 0
+
+    def __init__(self, input_data):
+        self.input_data = input_data
+        self.payment_ids = set()
+        self.input_hash = "input-hash"
+
+    async def create_payment_request(self):
+        ItemPayment.in_flight += 1
+        ItemPayment.peak = max(ItemPayment.peak, ItemPayment.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if self.input_data["text"] == "fail":
+                raise RuntimeError("payment service unavailable")
+            return {"data": {
+                "blockchainIdentifier": f"payment-{self.input_data['text']}",
+                "submitResultTime": "1",
+                "unlockTime": "2",
+                "externalDisputeUnlockTime": "3",
+            }}
+        finally:
+            ItemPayment.in_flight -= 1
+
+
+def batch_server(build_server, monkeypatch):
+    server, _ = build_server(lambda text: text)
+    monkeypatch.setattr(server, "create_payment", lambda identifier, input_data: ItemPayment(input_data))
+    ItemPayment.in_flight = ItemPayment.peak = 0
+    return server
+
+
+def items(*texts):
+    return [("purchaser-1", {"text": text}) for text in texts]
+
+
+def test_start_jobs_keeps_the_input_order_and_reports_failed_items(build_server, monkeypatch):
+    server = batch_server(build_server, monkeypatch)
+
+    try:
+        results = asyncio.run(server.start_jobs(items("a", "fail", "c")))
+    finally:
+        asyncio.run(server.shutdown())
+
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert [result["status"] for result in results] == ["success", "error", "success"]
+    assert [results[0]["blockchainIdentifier"], results[2]["blockchainIdentifier"]] == ["payment-a", "payment-c"]
+    assert "payment service unavailable" in results[1]["error"]
+    assert results[0]["job_id"] != results[2]["job_id"]
+
+
+def test_start_jobs_bounds_concurrent_payment_requests(build_server, monkeypatch):
+    monkeypatch.setenv("START_JOBS_CONCURRENCY", "2")
+    server = batch_server(build_server, monkeypatch)
+
+    try:
+        results = asyncio.run(server.start_jobs(items(*"abcdef")))
+    finally:
+        asyncio.run(server.shutdown())
+
+    assert all(result["status"] == "success" for result in results)
+    assert ItemPayment.peak == 2
+
+
+def test_invalid_items_get_an_error_entry(build_server, monkeypatch):
+    class Input(BaseModel):
+        text: str
+        count: int
+
+    server = batch_server(build_server, monkeypatch)
+    server.input_model = Input
+
+    try:
+        results = asyncio.run(server.start_jobs([("purchaser-1", {"text": "a", "count": "many"})]))
+    finally:
+        asyncio.run(server.shutdown())
+
+    assert results[0]["status"] == "error"
+    assert results[0]["error"].startswith("Invalid input_data")
+
+
+def test_start_jobs_endpoint_summarizes_the_batch(build_server, monkeypatch):
+    monkeypatch.setenv("START_JOBS_MAX_BATCH", "3")
+    server = batch_server(build_server, monkeypatch)
+    client = TestClient(server.app)
+
+    def post(*texts):
+        return client.post("/start_jobs", json={"jobs": [
+            {"identifier_from_purchaser": "purchaser-1", "input_data": {"text": text}} for text in texts
+        ]})
+
+    try:
+        partial = post("a", "fail")
+        empty = post()
+        too_large = post("a", "b", "c", "d")
+    finally:
+        asyncio.run(server.shutdown())
+
+    assert partial.status_code == 200
+    assert {key: partial.json()[key] for key in ("status", "succeeded", "failed")} == {
+        "status": "partial", "succeeded": 1, "failed": 1,
+    }
+    assert empty.status_code == 400
+    assert too_large.status_code == 400